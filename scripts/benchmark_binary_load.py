@@ -0,0 +1,48 @@
+import os
+import tempfile
+import time
+
+from GraphAlgo import GraphAlgo
+from scripts.produce_expected_json import COMP_DIR
+
+BENCH_GRAPH = 'G_10000_80000_0.json'
+REPEATS = 5
+
+
+def time_load(load) -> float:
+    '''
+    :return: Best load time in ms over REPEATS runs.
+    '''
+    best = float('inf')
+    for _ in range(REPEATS):
+        algo = GraphAlgo()
+        start = time.perf_counter()
+        assert load(algo)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def benchmark_binary_load():
+    json_file = '{}{}'.format(COMP_DIR, BENCH_GRAPH)
+    fd, bin_file = tempfile.mkstemp(suffix='.bin')
+    os.close(fd)
+
+    try:
+        algo = GraphAlgo()
+        algo.load_from_json(json_file)
+        algo.save_to_binary(bin_file)
+
+        json_ms = time_load(lambda a: a.load_from_json(json_file))
+        bin_ms = time_load(lambda a: a.load_from_binary(bin_file))
+        frozen_ms = time_load(lambda a: a.load_from_binary(bin_file, frozen=True))
+
+        print("{}: json {} KB, binary {} KB".format(
+            BENCH_GRAPH, os.path.getsize(json_file) // 1024, os.path.getsize(bin_file) // 1024))
+        print("json {:.1f} ms, binary {:.1f} ms (x{:.1f}), binary frozen {:.1f} ms (x{:.1f})".format(
+            json_ms, bin_ms, json_ms / bin_ms, frozen_ms, json_ms / frozen_ms))
+    finally:
+        os.remove(bin_file)
+
+
+if __name__ == "__main__":
+    benchmark_binary_load()
@@ -0,0 +1,71 @@
+import random
+import time
+import tracemalloc
+
+from ContractionHierarchy import ContractionHierarchy
+from GraphAlgo import GraphAlgo
+from GraphInterface import GraphInterface
+from scripts.benchmark_shortest_path import road_grid
+from scripts.produce_expected_json import COMP_DIR
+
+BENCH_GRAPHS = ['G_1000_8000_0.json', 'G_10000_80000_0.json']
+NUM_QUERIES = 200
+SEED = 1234
+# Side of the road like grid graph, see benchmark_shortest_path.road_grid.
+ROAD_GRID_SIDE = 100
+STRATEGIES = [GraphAlgo.SHORTEST_PATH_DIJKSTRA, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL, GraphAlgo.SHORTEST_PATH_CH]
+
+
+def measure_memory(g: GraphInterface) -> (float, float):
+    '''
+    :return: Peak traced memory of the preprocessing and memory still held by the hierarchy, in MB.
+    '''
+    tracemalloc.start()
+    ch = ContractionHierarchy.build(g)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert ch.mc == g.get_mc()
+    return peak / 2 ** 20, current / 2 ** 20
+
+
+def benchmark_contraction_hierarchy():
+    graphs = []
+    for name in BENCH_GRAPHS:
+        algo = GraphAlgo()
+        algo.load_from_json('{}{}'.format(COMP_DIR, name))
+        graphs.append((name, algo.get_graph()))
+    graphs.append(('road grid {0}x{0}'.format(ROAD_GRID_SIDE), road_grid(ROAD_GRID_SIDE, SEED)))
+
+    for name, g in graphs:
+        algo = GraphAlgo(g)
+        rnd = random.Random(SEED)
+        keys = list(g.get_all_v().keys())
+        queries = [(rnd.choice(keys), rnd.choice(keys)) for _ in range(NUM_QUERIES)]
+
+        print("{}: {} nodes, {} edges, {} queries".format(name, g.v_size(), g.e_size(), NUM_QUERIES))
+        start = time.perf_counter()
+        shortcuts = algo.preprocess_contraction_hierarchy()
+        print("  preprocessing {:.0f} ms, {} shortcuts".format((time.perf_counter() - start) * 1000, shortcuts))
+        peak, retained = measure_memory(g)
+        print("  preprocessing peak {:.1f} MB, hierarchy {:.1f} MB".format(peak, retained))
+
+        expected = None
+        for strategy in STRATEGIES:
+            stats = {}
+            settled = 0
+            distances = []
+            start = time.perf_counter()
+            for src, dest in queries:
+                distances.append(algo.shortest_path(src, dest, strategy, stats)[0])
+                settled += stats['settled']
+            run_ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+
+            if expected is None:
+                expected = distances
+            assert all(abs(a - b) < 1e-9 or a == b for a, b in zip(expected, distances))
+            print("  {:<14} {:.3f} ms/query, {:.0f} settled/query".format(strategy, run_ms, settled / NUM_QUERIES))
+
+
+if __name__ == "__main__":
+    benchmark_contraction_hierarchy()
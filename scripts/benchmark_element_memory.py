@@ -0,0 +1,38 @@
+import gc
+import tracemalloc
+
+from Edge import Edge
+from Node import Node
+from location.GeoLocation import GeoLocation
+
+COUNT = 100000
+
+
+def bytes_per_element(factory) -> float:
+    '''
+    :param factory: Builds one element from its index.
+    :return: Traced bytes held per element, for COUNT live elements.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    elements = [factory(i) for i in range(COUNT)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The list holding them is not part of an element.
+    list_size = len(elements) * 8
+    return (after - before - list_size) / COUNT
+
+
+def benchmark_element_memory():
+    node = bytes_per_element(lambda i: Node(i))
+    geo_node = bytes_per_element(lambda i: Node(i, GeoLocation(i, i + 0.5, 0)))
+    edge = bytes_per_element(lambda i: Edge(src=i, dest=i + 1, weight=i + 0.5))
+
+    print("{} elements each".format(COUNT))
+    print("node: {:.0f} bytes, node with position: {:.0f} bytes, edge: {:.0f} bytes".format(node, geo_node, edge))
+
+
+if __name__ == "__main__":
+    benchmark_element_memory()
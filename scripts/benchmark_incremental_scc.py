@@ -0,0 +1,62 @@
+import time
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from IncrementalSCC import IncrementalSCC
+from scripts.produce_expected_json import COMP_DIR
+
+BENCH_GRAPHS = ['G_10_80_0.json', 'G_100_800_0.json', 'G_1000_8000_0.json']
+
+
+def stream_edges(file_name: str) -> (list, list):
+    '''
+    :return: Node ids and (src, dest, weight) edges of a graph file, in file order.
+    '''
+    algo = GraphAlgo()
+    algo.load_from_json('{}{}'.format(COMP_DIR, file_name))
+    g = algo.get_graph()
+
+    nodes = list(g.get_all_v().keys())
+    edges = [(src, dest, w) for src in nodes for dest, w in g.out_neighbours(src)]
+    return nodes, edges
+
+
+def run(nodes: list, edges: list, incremental: bool) -> (float, list):
+    '''
+    Inserts the edges one by one and asks after every insertion whether its endpoints are strongly connected.
+    :return: Run time in ms, answers.
+    '''
+    g = DiGraph()
+    for n in nodes:
+        g.add_node(n)
+
+    algo = GraphAlgo(g)
+    inc = IncrementalSCC(g) if incremental else None
+    answers = []
+
+    start = time.perf_counter()
+    for src, dest, w in edges:
+        g.add_edge(src, dest, w)
+        if incremental:
+            answers.append(inc.is_strongly_connected(src, dest))
+        else:
+            answers.append(algo.is_strongly_connected(src, dest))
+    run_time = (time.perf_counter() - start) * 1000
+
+    return run_time, answers
+
+
+def benchmark_incremental_scc():
+    for file_name in BENCH_GRAPHS:
+        nodes, edges = stream_edges(file_name)
+
+        full_ms, full_answers = run(nodes, edges, incremental=False)
+        inc_ms, inc_answers = run(nodes, edges, incremental=True)
+        assert full_answers == inc_answers
+
+        print("{}: {} inserts, recompute {:.1f} ms, incremental {:.1f} ms, speedup x{:.1f}".format(
+            file_name, len(edges), full_ms, inc_ms, full_ms / inc_ms))
+
+
+if __name__ == "__main__":
+    benchmark_incremental_scc()
@@ -0,0 +1,39 @@
+import time
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from scripts.produce_expected_json import COMP_DIR
+
+BENCH_GRAPHS = ['G_10_80_0.json', 'G_100_800_0.json', 'G_1000_8000_0.json', 'G_10000_80000_0.json']
+
+
+def load_without_positions(file_name: str) -> DiGraph:
+    '''
+    :return: The graph of a comparison file with every node position dropped.
+    '''
+    algo = GraphAlgo()
+    algo.load_from_json('{}{}'.format(COMP_DIR, file_name))
+    src = algo.get_graph()
+
+    g = DiGraph()
+    g.add_nodes_from((node_id, None) for node_id in src.get_all_v())
+    g.add_edges_from((node_id, other_node_id, w) for node_id in src.get_all_v()
+                     for other_node_id, w in src.out_neighbours(node_id))
+    return g
+
+
+def benchmark_layout():
+    for file_name in BENCH_GRAPHS:
+        for layout in (GraphAlgo.LAYOUT_SPIRAL, GraphAlgo.LAYOUT_FORCE_DIRECTED):
+            g = load_without_positions(file_name)
+
+            start = time.perf_counter()
+            GraphAlgo(g).set_missing_positions(layout)
+            run_time = (time.perf_counter() - start) * 1000
+
+            assert all(n.geo_location is not None for n in g.get_all_v().values())
+            print("{}: set_missing_positions({}) {:.1f} ms".format(file_name, layout, run_time))
+
+
+if __name__ == "__main__":
+    benchmark_layout()
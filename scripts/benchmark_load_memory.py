@@ -0,0 +1,51 @@
+import json
+import time
+import tracemalloc
+
+from DiGraph import DiGraph
+from JsonGraphReader import JsonGraphReader
+from scripts.produce_expected_json import COMP_DIR
+
+BENCH_GRAPH = 'G_10000_80000_0.json'
+
+
+def load_whole_document(file_name: str) -> DiGraph:
+    '''
+    The previous loader: whole file as a string, then the whole dict tree, then the graph.
+    '''
+    with open(file_name, 'r') as f:
+        data = json.loads(f.read())
+    return DiGraph.from_dict(data)
+
+
+def load_streaming(file_name: str) -> DiGraph:
+    with open(file_name, 'r') as f:
+        return DiGraph.from_elements(JsonGraphReader(f))
+
+
+def measure(loader, file_name: str) -> (float, float, float):
+    '''
+    :return: Load time in ms, peak traced memory in MB and memory still held by the graph in MB.
+    '''
+    tracemalloc.start()
+    start = time.perf_counter()
+    g = loader(file_name)
+    run_time = (time.perf_counter() - start) * 1000
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert g.v_size() > 0
+    return run_time, peak / 2 ** 20, current / 2 ** 20
+
+
+def benchmark_load_memory():
+    file_name = '{}{}'.format(COMP_DIR, BENCH_GRAPH)
+
+    for name, loader in (('whole document', load_whole_document), ('streaming', load_streaming)):
+        run_time, peak, graph_size = measure(loader, file_name)
+        print("{} {}: {:.0f} ms, peak {:.1f} MB, final graph {:.1f} MB, peak/graph {:.2f}".format(
+            BENCH_GRAPH, name, run_time, peak, graph_size, peak / graph_size))
+
+
+if __name__ == "__main__":
+    benchmark_load_memory()
@@ -0,0 +1,95 @@
+import gc
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from GraphPlotter import GraphPlotter
+from scripts.produce_expected_json import COMP_DIR
+
+BENCH_GRAPHS = ['G_10_80_0.json', 'G_100_800_0.json', 'G_1000_8000_0.json', 'G_10000_80000_0.json']
+# Larger graphs take minutes in the detailed mode.
+MAX_DETAILED_EDGES = 8000
+SNAPSHOT_GRAPH = 'G_1000_8000_0.json'
+SNAPSHOTS = 100
+SNAPSHOT_NODES = 50
+
+
+def render(g, mode: str) -> (float, float):
+    '''
+    Draws and rasterizes the graph off screen.
+    :return: Render time in ms, peak traced memory in MB.
+    '''
+    fig, ax = plt.subplots(figsize=(12, 12))
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    GraphPlotter(g, mode).draw(ax)
+    fig.canvas.draw()
+
+    run_time = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    plt.close(fig)
+    return run_time, peak / 2 ** 20
+
+
+def benchmark_render():
+    for file_name in BENCH_GRAPHS:
+        algo = GraphAlgo()
+        algo.load_from_json('{}{}'.format(COMP_DIR, file_name))
+        # The comparison graphs come without positions.
+        algo.set_missing_positions(GraphAlgo.LAYOUT_FORCE_DIRECTED)
+        g = algo.get_graph()
+
+        for mode in (GraphPlotter.RENDER_DETAILED, GraphPlotter.RENDER_BATCHED):
+            if mode == GraphPlotter.RENDER_DETAILED and g.e_size() > MAX_DETAILED_EDGES:
+                print("{}: {} skipped".format(file_name, mode))
+                continue
+
+            run_time, peak = render(g, mode)
+            print("{}: {} {:.0f} ms, peak {:.1f} MB".format(file_name, mode, run_time, peak))
+
+
+def benchmark_snapshots():
+    '''
+    Renders many small subgraphs to PNG bytes off screen, as a batch worker would.
+    '''
+    algo = GraphAlgo()
+    algo.load_from_json('{}{}'.format(COMP_DIR, SNAPSHOT_GRAPH))
+    algo.set_missing_positions(GraphAlgo.LAYOUT_FORCE_DIRECTED)
+    g = algo.get_graph()
+    nodes = g.get_all_v()
+    keys = list(nodes.keys())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(SNAPSHOTS):
+        sub = DiGraph()
+        window = [keys[(i + j) % len(keys)] for j in range(SNAPSHOT_NODES)]
+        sub.add_nodes_from((key, (nodes[key].geo_location.x, nodes[key].geo_location.y, 0))
+                          for key in window)
+        sub.add_edges_from((key, other_node_id, w) for key in window for other_node_id, w in g.out_neighbours(key))
+
+        GraphPlotter(sub).render(figsize=(4, 4), dpi=80)
+        if i == 9:
+            gc.collect()
+            warm, _ = tracemalloc.get_traced_memory()
+
+    run_time = (time.perf_counter() - start) * 1000
+    gc.collect()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{} snapshots: {:.1f} ms per render, memory after 10 {:.1f} MB, after {} {:.1f} MB".format(
+        SNAPSHOTS, run_time / SNAPSHOTS, warm / 2 ** 20, SNAPSHOTS, end / 2 ** 20))
+
+
+if __name__ == "__main__":
+    benchmark_render()
+    benchmark_snapshots()
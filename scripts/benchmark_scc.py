@@ -0,0 +1,41 @@
+import sys
+import time
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+
+PATH_GRAPH_NODES = 1000000
+
+
+def build_path_graph(num_nodes: int, closed: bool = False) -> DiGraph:
+    g = DiGraph()
+    for n in range(num_nodes):
+        g.add_node(n)
+    for n in range(num_nodes - 1):
+        g.add_edge(n, n + 1, 1)
+    if closed:
+        g.add_edge(num_nodes - 1, 0, 1)
+    return g
+
+
+def benchmark_path_graph():
+    '''
+    Runs connected_components() on a 1M nodes path graph (and the same path closed into a cycle)
+    under the default recursion limit.
+    '''
+    print("recursion limit {}".format(sys.getrecursionlimit()))
+
+    for closed in (False, True):
+        g = build_path_graph(PATH_GRAPH_NODES, closed)
+        algo = GraphAlgo(g)
+
+        start = time.perf_counter()
+        sccs = algo.connected_components()
+        run_time = (time.perf_counter() - start) * 1000
+
+        assert len(sccs) == (1 if closed else PATH_GRAPH_NODES)
+        print("path graph |V|={} closed={}: {} SCCs in {:.1f} ms".format(PATH_GRAPH_NODES, closed, len(sccs), run_time))
+
+
+if __name__ == "__main__":
+    benchmark_path_graph()
@@ -0,0 +1,175 @@
+import random
+import time
+from heapq import heappush, heappop
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from scripts.produce_expected_json import COMP_DIR
+
+BENCH_GRAPH = 'G_10000_80000_0.json'
+NUM_QUERIES = 200
+SEED = 1234
+# Side of the road like grid graph.
+ROAD_GRID_SIDE = 200
+STRATEGIES = [GraphAlgo.SHORTEST_PATH_DIJKSTRA, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL, GraphAlgo.SHORTEST_PATH_A_STAR,
+              GraphAlgo.SHORTEST_PATH_ALT]
+
+
+def legacy_shortest_path(algo: GraphAlgo, src: int, dest: int) -> (float, list):
+    '''
+    The previous shortest_path: resets every node, keeps popping the heap after the target is settled,
+    relaxes stale heap entries again and builds the path with insert(0, ...).
+    Kept here only as the baseline to compare against.
+    '''
+    g = algo.get_graph()
+    nodes = g.get_all_v()
+    for n in nodes.values():
+        n.tag = 0
+
+    distances = {src: 0.0}
+    parents = {}
+    pq = [(0.0, src)]
+
+    while pq:
+        node_distance, node_id = heappop(pq)
+        nodes[node_id].tag = 1
+
+        for neighbour_id, weight in g.all_out_edges_of_node(node_id).items():
+            if nodes[neighbour_id].tag == 1:
+                continue
+            new_distance = distances[node_id] + weight
+            if new_distance < distances.get(neighbour_id, float('inf')):
+                distances[neighbour_id] = new_distance
+                parents[neighbour_id] = node_id
+                heappush(pq, (new_distance, neighbour_id))
+
+    if dest not in distances:
+        return float('inf'), []
+
+    path = []
+    node_id = dest
+    while node_id != src:
+        path.insert(0, node_id)
+        node_id = parents[node_id]
+    path.insert(0, node_id)
+
+    return distances[dest], path
+
+
+def benchmark_shortest_path():
+    algo = GraphAlgo()
+    algo.load_from_json('{}{}'.format(COMP_DIR, BENCH_GRAPH))
+
+    rnd = random.Random(SEED)
+    keys = list(algo.get_graph().get_all_v().keys())
+    queries = [(rnd.choice(keys), rnd.choice(keys)) for _ in range(NUM_QUERIES)]
+
+    start = time.perf_counter()
+    legacy_results = [legacy_shortest_path(algo, src, dest) for src, dest in queries]
+    legacy_ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+
+    start = time.perf_counter()
+    results = [algo.shortest_path(src, dest) for src, dest in queries]
+    current_ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+
+    for (legacy_dist, _), (dist, _) in zip(legacy_results, results):
+        assert abs(legacy_dist - dist) < 1e-9 or legacy_dist == dist
+
+    print("{}: {} queries".format(BENCH_GRAPH, NUM_QUERIES))
+    print("legacy  {:.3f} ms/query".format(legacy_ms))
+    print("current {:.3f} ms/query".format(current_ms))
+    print("speedup x{:.2f}".format(legacy_ms / current_ms))
+
+
+def road_grid(side: int, seed: int) -> DiGraph:
+    '''
+    :return: A side x side grid with two way streets, each direction weighted 1 to 2.
+    '''
+    rnd = random.Random(seed)
+    g = DiGraph()
+    g.add_nodes_from((y * side + x, (x, y, 0)) for y in range(side) for x in range(side))
+    for y in range(side):
+        for x in range(side):
+            node_id = y * side + x
+            for other_node_id in ((node_id + 1) if x + 1 < side else None, (node_id + side) if y + 1 < side else None):
+                if other_node_id is not None:
+                    g.add_edge(node_id, other_node_id, rnd.uniform(1, 2))
+                    g.add_edge(other_node_id, node_id, rnd.uniform(1, 2))
+    return g
+
+
+def benchmark_strategies():
+    '''
+    Latency and settled nodes of every shortest_path strategy, on random queries.
+    '''
+    comparison = GraphAlgo()
+    comparison.load_from_json('{}{}'.format(COMP_DIR, BENCH_GRAPH))
+    graphs = [(BENCH_GRAPH, comparison.get_graph()),
+              ('road grid {0}x{0}'.format(ROAD_GRID_SIDE), road_grid(ROAD_GRID_SIDE, SEED))]
+
+    for name, g in graphs:
+        algo = GraphAlgo(g)
+        rnd = random.Random(SEED)
+        keys = list(g.get_all_v().keys())
+        queries = [(rnd.choice(keys), rnd.choice(keys)) for _ in range(NUM_QUERIES)]
+
+        print("{}: {} queries".format(name, NUM_QUERIES))
+        start = time.perf_counter()
+        algo.preprocess_landmarks()
+        print("  landmarks preprocessing {:.0f} ms".format((time.perf_counter() - start) * 1000))
+
+        expected = None
+        for strategy in STRATEGIES:
+            stats = {}
+            settled = 0
+            distances = []
+            start = time.perf_counter()
+            for src, dest in queries:
+                distances.append(algo.shortest_path(src, dest, strategy, stats)[0])
+                settled += stats['settled']
+            run_ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+
+            if expected is None:
+                expected = distances
+            assert all(abs(a - b) < 1e-9 or a == b for a, b in zip(expected, distances))
+            print("  {:<14} {:.3f} ms/query, {:.0f} settled/query".format(strategy, run_ms, settled / NUM_QUERIES))
+
+
+def benchmark_shortest_path_tree():
+    '''
+    Distances from one depot to every node: a shortest_path per node, against one shortest_path_tree.
+    A shortest_path per node is timed on NUM_QUERIES of them only.
+    '''
+    algo = GraphAlgo()
+    algo.load_from_json('{}{}'.format(COMP_DIR, BENCH_GRAPH))
+    keys = list(algo.get_graph().get_all_v().keys())
+    depot = random.Random(SEED).choice(keys)
+
+    start = time.perf_counter()
+    distances = [algo.shortest_path(depot, dest)[0] for dest in keys[:NUM_QUERIES]]
+    per_node_ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+
+    start = time.perf_counter()
+    tree = algo.shortest_path_tree(depot)
+    tree_distances = [tree.distance_to(dest) for dest in keys]
+    paths = [tree.path_to(dest) for dest in keys]
+    tree_ms = (time.perf_counter() - start) * 1000
+
+    assert all(abs(a - b) < 1e-9 or a == b for a, b in zip(distances, tree_distances))
+    assert len(paths) == len(keys)
+    start = time.perf_counter()
+    cached = [algo.shortest_path(depot, dest) for dest in keys]
+    cached_ms = (time.perf_counter() - start) * 1000 / len(keys)
+    assert len(cached) == len(keys)
+
+    print("{}: depot {} to all {} nodes".format(BENCH_GRAPH, depot, len(keys)))
+    print("  shortest_path per node ~{:.0f} ms ({:.3f} ms/query over {} queries)".format(
+        per_node_ms * len(keys), per_node_ms, NUM_QUERIES))
+    print("  shortest_path_tree     {:.0f} ms, distances and paths to all".format(tree_ms))
+    print("  shortest_path from the cached tree {:.4f} ms/query".format(cached_ms))
+
+
+if __name__ == "__main__":
+    benchmark_shortest_path()
+    benchmark_strategies()
+    benchmark_shortest_path_tree()
@@ -0,0 +1,58 @@
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+from DiGraph import DiGraph
+from GraphPlotter import GraphPlotter
+from location.Range import Range
+from location.Range2D import Range2D
+
+# A SIDE x SIDE lattice, every node linked to its right and upper neighbours.
+SIDE = 320
+TILE_MAX_ZOOM = 2
+
+
+def lattice(side: int) -> DiGraph:
+    '''
+    :return: A side x side grid graph, node positions on the integer points.
+    '''
+    g = DiGraph(position_array=True)
+    g.add_nodes_from((y * side + x, (x, y, 0)) for y in range(side) for x in range(side))
+    g.add_edges_from((y * side + x, y * side + x + 1, 1) for y in range(side) for x in range(side - 1))
+    g.add_edges_from((y * side + x, (y + 1) * side + x, 1) for y in range(side - 1) for x in range(side))
+    return g
+
+
+def timed(func) -> float:
+    '''
+    :return: Run time of func in ms.
+    '''
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def benchmark_viewport():
+    g = lattice(SIDE)
+    print("{} nodes, {} edges".format(g.v_size(), g.e_size()))
+
+    plotter = GraphPlotter(g, GraphPlotter.RENDER_BATCHED)
+    print("whole graph: {:.0f} ms".format(timed(lambda: plotter.render(figsize=(8, 8)))))
+
+    # The first region query builds the spatial index.
+    for side in (SIDE / 4, SIDE / 10, SIDE / 10, SIDE / 40):
+        region = Range2D(Range(SIDE / 2, SIDE / 2 + side), Range(SIDE / 2, SIDE / 2 + side))
+        run_time = timed(lambda: plotter.render(figsize=(8, 8), region=region))
+        print("region {:.0f} x {:.0f}: {:.0f} ms".format(side, side, run_time))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        written = []
+        run_time = timed(lambda: written.append(plotter.render_tiles(tmp, TILE_MAX_ZOOM)))
+        print("tiles up to zoom {}: {} tiles, {:.0f} ms".format(TILE_MAX_ZOOM, written[0], run_time))
+
+
+if __name__ == "__main__":
+    benchmark_viewport()
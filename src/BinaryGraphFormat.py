@@ -0,0 +1,205 @@
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Set, Tuple
+
+from CSRGraph import CSRGraph
+from DiGraph import DiGraph
+from Edge import Edge
+from GraphElement import GraphElement
+from GraphInterface import GraphInterface
+from Node import Node
+from location.GeoLocation import GeoLocation
+
+
+class BinaryGraphFormat(object):
+    '''
+    Compact little endian binary graph file, loaded through mmap without any text parsing.
+
+    Layout, every section is 8 bytes aligned:
+        header      magic, version, flags, |V|, number of stored edges, mode count, extras size
+        node ids    int64[|V|]
+        positions   float64[|V| * 3], NaN for nodes without a position
+        offsets     int64[|V| + 1], out edges of the node at index i are [offsets[i], offsets[i + 1])
+        dests       int64[|E|], dense node indices
+        weights     float64[|E|]
+        extras      UTF-8 JSON with the node / edge info, tag and weight fields that are not the defaults, and the
+                    edges whose weight is an int (given back as int so JSON output is unchanged)
+    '''
+    __MAGIC = b'OOPG'
+    __VERSION = 1
+    __HEADER = struct.Struct('<4sHHqqqq')
+    __NODE_DEFAULTS = (('info', ''), ('tag', 0), ('weight', 0))
+    __EDGE_DEFAULTS = (('info', ''), ('tag', Edge.INVALID_ENTRY))
+
+    @classmethod
+    def save(cls, g: GraphInterface, file_name: str):
+        '''
+        Writes a graph to a binary file.
+        :param g: Graph to save.
+        :param file_name: Path to the out file.
+        :return: None
+        '''
+        nodes = g.get_all_v()
+        keys = array('q', nodes.keys())
+        index = {key: i for i, key in enumerate(keys)}
+
+        positions = array('d')
+        offsets = array('q', [0])
+        dests = array('q')
+        weights = array('d')
+        node_extras: List[list] = []
+        edge_extras: List[list] = []
+        int_weights: List[int] = []
+
+        for i, key in enumerate(keys):
+            node = nodes[key]
+            geo = node.geo_location
+            positions.extend((geo.x, geo.y, geo.z) if geo else (math.nan, math.nan, math.nan))
+
+            extra = cls.__extra_fields(node, cls.__NODE_DEFAULTS)
+            if extra:
+                node_extras.append([i, extra])
+
+            for other_node_id, weight, edge in cls.__iter_out_edges(g, key):
+                if edge is not None:
+                    extra = cls.__extra_fields(edge, cls.__EDGE_DEFAULTS)
+                    if extra:
+                        edge_extras.append([len(dests), extra])
+                if type(weight) is int:
+                    int_weights.append(len(dests))
+                dests.append(index[other_node_id])
+                weights.append(weight)
+            offsets.append(len(dests))
+
+        extras = b''
+        if node_extras or edge_extras or int_weights:
+            extras = json.dumps({'nodes': node_extras, 'edges': edge_extras,
+                                 'int_weights': int_weights}).encode('utf-8')
+
+        with open(file_name, 'wb') as f:
+            f.write(cls.__HEADER.pack(cls.__MAGIC, cls.__VERSION, 0, len(keys), len(dests), g.get_mc(), len(extras)))
+            for buf in (keys, positions, offsets, dests, weights):
+                if sys.byteorder != 'little':
+                    buf = array(buf.typecode, buf)
+                    buf.byteswap()
+                buf.tofile(f)
+            f.write(extras)
+
+    @classmethod
+    def load(cls, file_name: str, frozen: bool = False) -> GraphInterface:
+        '''
+        Reads a graph from a binary file.
+        :param file_name: Path to the file.
+        :param frozen: If True return a read only CSRGraph over the mapped file (no copy of the edge buffers),
+                       a DiGraph o.w.
+        :return: The graph.
+        '''
+        with open(file_name, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mm) < cls.__HEADER.size:
+            mm.close()
+            raise ValueError("Not a binary graph file.")
+
+        magic, version, _, n, m, mode_count, extras_size = cls.__HEADER.unpack_from(mm, 0)
+        if magic != cls.__MAGIC or version != cls.__VERSION:
+            mm.close()
+            raise ValueError("Not a binary graph file.")
+
+        view = memoryview(mm)
+        offset = cls.__HEADER.size
+        sections = []
+        for typecode, length in (('q', n), ('d', 3 * n), ('q', n + 1), ('q', m), ('d', m)):
+            sections.append(cls.__section(view, offset, typecode, length))
+            offset += 8 * length
+        keys, positions, offsets, dests, weights = sections
+
+        extras = {}
+        if extras_size:
+            extras = json.loads(bytes(view[offset:offset + extras_size]).decode('utf-8'))
+
+        nodes = cls.__build_nodes(keys, positions, extras.get('nodes', ()))
+        int_weights: Set[int] = set(extras.get('int_weights', ()))
+
+        if frozen:
+            # The views keep the mapping alive for as long as the snapshot lives.
+            return CSRGraph(keys, offsets, dests, weights, mode_count, nodes=nodes, int_weights=int_weights)
+
+        edge_extras: Dict[int, dict] = {e: extra for e, extra in extras.get('edges', ())}
+        g = DiGraph.from_elements(cls.__iter_elements(nodes, keys, offsets, dests, weights, edge_extras, int_weights,
+                                                      mode_count))
+
+        for section in sections:
+            if isinstance(section, memoryview):
+                section.release()
+        view.release()
+        mm.close()
+
+        return g
+
+    @staticmethod
+    def __section(view: memoryview, offset: int, typecode: str, length: int):
+        '''
+        A typed view over a part of the mapped file, copied and byte swapped only on big endian machines.
+        '''
+        section = view[offset:offset + 8 * length]
+        if sys.byteorder == 'little':
+            return section.cast(typecode)
+
+        res = array(typecode, bytes(section))
+        res.byteswap()
+        return res
+
+    @staticmethod
+    def __build_nodes(keys, positions, node_extras) -> Dict[int, Node]:
+        nodes: Dict[int, Node] = {}
+        for i, key in enumerate(keys):
+            x, y, z = positions[3 * i], positions[3 * i + 1], positions[3 * i + 2]
+            geo = None if math.isnan(x) else GeoLocation(x, y, z)
+            nodes[key] = Node(key, geo)
+
+        for i, extra in node_extras:
+            node = nodes[keys[i]]
+            for attr, value in extra.items():
+                setattr(node, attr, value)
+
+        return nodes
+
+    @staticmethod
+    def __iter_elements(nodes: Dict[int, Node], keys, offsets, dests, weights, edge_extras: Dict[int, dict],
+                        int_weights: Set[int], mode_count: int) -> Iterator[Tuple[str, object]]:
+        for node in nodes.values():
+            yield GraphElement.NODE, node
+
+        for i, key in enumerate(keys):
+            for e in range(offsets[i], offsets[i + 1]):
+                extra = edge_extras.get(e, {})
+                weight = int(weights[e]) if e in int_weights else weights[e]
+                yield GraphElement.EDGE, Edge(src=key, dest=keys[dests[e]], weight=weight, **extra)
+
+        yield GraphElement.MODE_COUNT, mode_count
+
+    @staticmethod
+    def __iter_out_edges(g: GraphInterface, key: int) -> Iterator[Tuple[int, float, Edge]]:
+        '''
+        Out edges with their Edge instance when the graph keeps them (for info and tag).
+        '''
+        if isinstance(g, DiGraph):
+            return ((e.dest, e.weight, e) for e in g.out_edges(key))
+        return ((other_node_id, weight, None) for other_node_id, weight in g.out_neighbours(key))
+
+    @staticmethod
+    def __extra_fields(obj, defaults) -> dict:
+        '''
+        :return: Attributes that differ from their defaults (0.0 is kept apart from 0 so JSON output is unchanged).
+        '''
+        extra = {}
+        for attr, default in defaults:
+            value = getattr(obj, attr)
+            if value != default or type(value) is not type(default):
+                extra[attr] = value
+        return extra
@@ -0,0 +1,206 @@
+from array import array
+from typing import Dict, Iterator, Set, Tuple
+
+from Edge import Edge
+from GraphInterface import GraphInterface
+from Node import Node
+
+
+class CSRGraph(GraphInterface):
+    '''
+    Read only compressed sparse row (CSR) snapshot of a graph.
+    Node keys are mapped to dense indices, the out edges of the node at index i are stored at
+    [out_offsets[i], out_offsets[i + 1]) of out_dests / out_weights. In edges are kept the same way (CSC).
+    The snapshot remembers the mode count it was built from so stale snapshots can be detected.
+    It is read only, the mutators change nothing and return False.
+    Weights are stored as floats, to_dict gives the ones that were ints in the source back as int.
+    GraphAlgo runs its Dijkstra and SCC searches straight over the arrays, the other algorithms go through the
+    neighbour iterators, which map every index back to a key.
+    '''
+
+    def __init__(self, keys, out_offsets, out_dests, out_weights, mode_count: int,
+                 nodes: Dict[int, Node] = None, source: GraphInterface = None, int_weights: Set[int] = None):
+        self.__keys = keys
+        self.__index: Dict[int, int] = {key: i for i, key in enumerate(keys)}
+        self.__out_offsets = out_offsets
+        self.__out_dests = out_dests
+        self.__out_weights = out_weights
+        self.__mode_count = mode_count
+        self.__nodes = nodes
+        self.__source = source
+        # Positions in out_weights of the weights that were ints.
+        self.__int_weights: Set[int] = int_weights or set()
+
+        self.__in_offsets, self.__in_srcs, self.__in_weights = self.__build_reverse()
+
+        # Slicing a memoryview does not copy, neighbour iteration relies on that.
+        self.__out_dests_view = memoryview(self.__out_dests)
+        self.__out_weights_view = memoryview(self.__out_weights)
+        self.__in_srcs_view = memoryview(self.__in_srcs)
+        self.__in_weights_view = memoryview(self.__in_weights)
+
+    @classmethod
+    def from_graph(cls, g: GraphInterface) -> 'CSRGraph':
+        '''
+        Builds a snapshot of a graph.
+        :param g: Graph to freeze.
+        :return: CSRGraph
+        '''
+        nodes = dict(g.get_all_v())
+        keys = array('q', nodes.keys())
+        index = {key: i for i, key in enumerate(keys)}
+
+        out_offsets = array('q', [0])
+        out_dests = array('q')
+        out_weights = array('d')
+        int_weights: Set[int] = set()
+
+        for key in keys:
+            for other_node_id, weight in g.out_neighbours(key):
+                if type(weight) is int:
+                    int_weights.add(len(out_dests))
+                out_dests.append(index[other_node_id])
+                out_weights.append(weight)
+            out_offsets.append(len(out_dests))
+
+        return cls(keys, out_offsets, out_dests, out_weights, g.get_mc(), nodes=nodes, source=g,
+                   int_weights=int_weights)
+
+    def __build_reverse(self) -> Tuple[array, array, array]:
+        '''
+        Builds the in edges (CSC) buffers from the out edges by a counting sort on destination.
+        :return: in_offsets, in_srcs, in_weights
+        '''
+        n = len(self.__keys)
+        m = len(self.__out_dests)
+
+        in_offsets = array('q', bytes(8 * (n + 1)))
+        for d in self.__out_dests:
+            in_offsets[d + 1] += 1
+        for i in range(n):
+            in_offsets[i + 1] += in_offsets[i]
+
+        in_srcs = array('q', bytes(8 * m))
+        in_weights = array('d', bytes(8 * m))
+        fill = in_offsets[:-1]
+
+        for src in range(n):
+            for e in range(self.__out_offsets[src], self.__out_offsets[src + 1]):
+                d = self.__out_dests[e]
+                pos = fill[d]
+                in_srcs[pos] = src
+                in_weights[pos] = self.__out_weights[e]
+                fill[d] = pos + 1
+
+        return in_offsets, in_srcs, in_weights
+
+    @property
+    def keys(self):
+        return self.__keys
+
+    @property
+    def out_offsets(self):
+        return self.__out_offsets
+
+    @property
+    def out_dests(self):
+        return self.__out_dests
+
+    @property
+    def out_weights(self):
+        return self.__out_weights
+
+    @property
+    def in_offsets(self):
+        return self.__in_offsets
+
+    @property
+    def in_srcs(self):
+        return self.__in_srcs
+
+    @property
+    def in_weights(self):
+        return self.__in_weights
+
+    def index_of(self, key: int) -> int:
+        '''
+        Dense index of a node key.
+        :param key: Node key.
+        :return: Index or None if missing.
+        '''
+        return self.__index.get(key)
+
+    def is_stale(self) -> bool:
+        '''
+        :return: True if the graph this snapshot was built from has changed since.
+        '''
+        return self.__source is not None and self.__source.get_mc() != self.__mode_count
+
+    def v_size(self) -> int:
+        return len(self.__keys)
+
+    def e_size(self) -> int:
+        return len(self.__out_dests)
+
+    def get_all_v(self) -> Dict[int, Node]:
+        if self.__nodes is None:
+            self.__nodes = {key: Node(key) for key in self.__keys}
+        return self.__nodes
+
+    def all_in_edges_of_node(self, id1: int) -> dict:
+        return dict(self.in_neighbours(id1))
+
+    def all_out_edges_of_node(self, id1: int) -> dict:
+        return dict(self.out_neighbours(id1))
+
+    def in_neighbours(self, id1: int) -> Iterator[Tuple[int, float]]:
+        i = self.__index[id1]
+        start, end = self.__in_offsets[i], self.__in_offsets[i + 1]
+        keys = self.__keys
+        return ((keys[src], w) for src, w in zip(self.__in_srcs_view[start:end], self.__in_weights_view[start:end]))
+
+    def out_neighbours(self, id1: int) -> Iterator[Tuple[int, float]]:
+        i = self.__index[id1]
+        start, end = self.__out_offsets[i], self.__out_offsets[i + 1]
+        keys = self.__keys
+        return ((keys[d], w) for d, w in zip(self.__out_dests_view[start:end], self.__out_weights_view[start:end]))
+
+    def get_mc(self) -> int:
+        return self.__mode_count
+
+    def add_edge(self, id1: int, id2: int, weight: float) -> bool:
+        return False
+
+    def add_node(self, node_id: int, pos: tuple = None) -> bool:
+        return False
+
+    def remove_node(self, node_id: int) -> bool:
+        return False
+
+    def remove_edge(self, node_id1: int, node_id2: int) -> bool:
+        return False
+
+    def to_dict(self) -> dict:
+        res = {'modeCount': self.get_mc(),
+               'edgeCount': self.e_size(),
+               'links': {},
+               'nodes': {}}
+
+        for node in self.get_all_v().values():
+            res['nodes'][node.key] = node.to_dict()
+
+        keys = self.__keys
+        int_weights = self.__int_weights
+        for i, key in enumerate(keys):
+            links = {}
+            for e in range(self.__out_offsets[i], self.__out_offsets[i + 1]):
+                weight = self.__out_weights[e]
+                other_node_id = keys[self.__out_dests[e]]
+                links[other_node_id] = Edge(src=key, dest=other_node_id,
+                                            weight=int(weight) if e in int_weights else weight).to_dict()
+            res['links'][key] = links
+
+        return res
+
+    def __repr__(self) -> str:
+        return "CSRGraph: |V|={} , |E|={}".format(self.v_size(), self.e_size())
@@ -0,0 +1,35 @@
+from typing import Dict, List
+
+from DiGraph import DiGraph
+
+
+class Condensation(object):
+    '''
+    DAG of the strongly connected components of a graph.
+    Each component is a node of the DAG keyed by its component id, an edge between two components carries
+    the minimal weight of the original edges between them.
+    '''
+
+    def __init__(self, graph: DiGraph, members: List[List[int]], node_id_to_component: Dict[int, int]):
+        self.graph: DiGraph = graph
+        self.members: List[List[int]] = members
+        self.node_id_to_component: Dict[int, int] = node_id_to_component
+
+    def component_of(self, node_id: int) -> int:
+        '''
+        Component id of an original node.
+        :param node_id: Node id in the original graph.
+        :return: Component id, None if the node is unknown.
+        '''
+        return self.node_id_to_component.get(node_id)
+
+    def members_of(self, component_id: int) -> List[int]:
+        '''
+        Original nodes of a component.
+        :param component_id: Component id.
+        :return: List of node ids.
+        '''
+        return self.members[component_id]
+
+    def __repr__(self) -> str:
+        return "Condensation: |components|={} , |edges|={}".format(self.graph.v_size(), self.graph.e_size())
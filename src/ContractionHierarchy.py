@@ -0,0 +1,425 @@
+from array import array
+from heapq import heapify, heappush, heappop
+from typing import Dict, List, Set, Tuple
+
+from GraphInterface import GraphInterface
+
+
+class ContractionHierarchy(object):
+    '''
+    Contraction Hierarchies (CH) of a graph for fast point to point shortest path queries.
+    Preprocessing contracts the nodes one by one, the node whose removal adds the fewest shortcuts first: every
+    shortest path through the contracted node between two nodes still in the graph is replaced by a shortcut edge,
+    unless a witness search finds another path that is as short. The order a node was contracted in is its rank.
+    A query is a bidirectional Dijkstra that only goes up in rank: forward from the source over the upward out edges,
+    backward from the target over the upward in edges. Both meet at the highest node of a shortest path, and settle
+    a few hundred nodes where plain Dijkstra settles the whole graph. Contraction may stop before the last nodes,
+    they are left as a core above all the others, see build.
+    Upward out edges of the node at index i are stored at [up_offsets[i], up_offsets[i + 1]) of up_heads /
+    up_weights / up_middles, upward in edges the same way in the down buffers, like CSRGraph. The middle of a
+    shortcut is the node it skips, -1 for an edge of the graph, shortcuts are unpacked through them.
+    The hierarchy belongs to one state of the graph, it records its MC.
+    '''
+    # Witness searches give up after settling this many nodes, the shortcut is added then. More shortcuts than
+    # needed, never a wrong distance.
+    WITNESS_SETTLED_LIMIT = 32
+    # The same for the searches that only estimate how many shortcuts contracting a node needs.
+    PRIORITY_WITNESS_SETTLED_LIMIT = 16
+    # Contraction stops once the nodes left have this many out edges on average, see build.
+    DEFAULT_CORE_DEGREE = 16.0
+
+    def __init__(self, mc: int, keys: array, up: Tuple[array, array, array, array],
+                 down: Tuple[array, array, array, array], core: bytearray, shortcuts: int):
+        '''
+        Use build.
+        :param mc: MC of the graph the hierarchy was computed on.
+        :param keys: Node keys by index.
+        :param up: offsets, heads, weights, middles of the upward out edges.
+        :param down: offsets, tails, weights, middles of the upward in edges.
+        :param core: 1 for the nodes left uncontracted, by index.
+        :param shortcuts: Number of shortcuts in up and down.
+        '''
+        self.__mc: int = mc
+        self.__keys: array = keys
+        self.__index: Dict[int, int] = {key: i for i, key in enumerate(keys)}
+        self.__up_offsets, self.__up_heads, self.__up_weights, self.__up_middles = up
+        self.__down_offsets, self.__down_tails, self.__down_weights, self.__down_middles = down
+        self.__core: bytearray = core
+        self.__shortcuts: int = shortcuts
+
+    @classmethod
+    def build(cls, g: GraphInterface, core_degree: float = DEFAULT_CORE_DEGREE) -> 'ContractionHierarchy':
+        '''
+        Orders and contracts the nodes of g.
+        The nodes left fill up with shortcuts as contraction goes on, on graphs with little structure, like random
+        ones, right away. Contracting dense nodes costs much and saves little, so once the nodes left are that dense
+        they stay a core above all the others. Their edges among themselves are their upward edges, a query runs
+        bidirectional Dijkstra inside the core from where the upward searches reached it.
+        :param g: Graph, weights must not be negative.
+        :param core_degree: Mean out degree of the nodes left that stops the contraction, inf contracts all.
+        :return: The hierarchy.
+        '''
+        keys = array('q', g.get_all_v().keys())
+        index = {key: i for i, key in enumerate(keys)}
+        n = len(keys)
+
+        # The graph not contracted yet, {neighbour: weight} both ways, and the node every shortcut skips. Self loops
+        # never help.
+        outs: List[Dict[int, float]] = [{} for _ in range(n)]
+        ins: List[Dict[int, float]] = [{} for _ in range(n)]
+        middles: Dict[Tuple[int, int], int] = {}
+        edges = 0
+        for i, key in enumerate(keys):
+            for other_node_id, weight in g.out_neighbours(key):
+                j = index[other_node_id]
+                if j != i:
+                    outs[i][j] = weight
+                    ins[j][i] = weight
+                    edges += 1
+
+        # Contracted neighbours of every node, spreads the contraction evenly over the graph.
+        deleted = [0] * n
+        # Depth in the hierarchy, one above the highest contracted neighbour, keeps the upward searches short.
+        levels = [0] * n
+        contracted = [False] * n
+        priorities = [cls.__priority(outs, ins, deleted, levels, i) for i in range(n)]
+        pq = sorted(zip(priorities, range(n)))
+
+        up: List[Dict[int, float]] = [{}] * n
+        down: List[Dict[int, float]] = [{}] * n
+        remaining = n
+        while pq and edges < core_degree * remaining:
+            priority, node = heappop(pq)
+            # Contracted, or pushed again since with a new priority.
+            if contracted[node] or priority != priorities[node]:
+                continue
+
+            for tail, head, weight in cls.__shortcuts(outs, ins, node, cls.WITNESS_SETTLED_LIMIT):
+                # An edge there may be shorter, the witness search gave up before finding it.
+                if weight < outs[tail].get(head, float('inf')):
+                    edges += head not in outs[tail]
+                    outs[tail][head] = weight
+                    ins[head][tail] = weight
+                    middles[(tail, head)] = node
+
+            # All the neighbours left are contracted later, the edges of the node now are its upward edges.
+            contracted[node] = True
+            remaining -= 1
+            edges -= len(outs[node]) + len(ins[node])
+            up[node] = outs[node]
+            down[node] = ins[node]
+            neighbours = set(outs[node]).union(ins[node])
+            for head in outs[node]:
+                del ins[head][node]
+            for tail in ins[node]:
+                del outs[tail][node]
+            for neighbour in neighbours:
+                deleted[neighbour] += 1
+                levels[neighbour] = max(levels[neighbour], levels[node] + 1)
+            outs[node] = {}
+            ins[node] = {}
+
+            # Only the neighbours lost edges or got shortcuts, their priorities change.
+            for neighbour in neighbours:
+                priorities[neighbour] = cls.__priority(outs, ins, deleted, levels, neighbour)
+                heappush(pq, (priorities[neighbour], neighbour))
+
+        for node in range(n):
+            if not contracted[node]:
+                up[node] = outs[node]
+                down[node] = ins[node]
+
+        return cls(g.get_mc(), keys, cls.__pack(up, middles, False), cls.__pack(down, middles, True),
+                   bytearray(not c for c in contracted), len(middles))
+
+    @property
+    def mc(self) -> int:
+        return self.__mc
+
+    @property
+    def shortcuts(self) -> int:
+        '''
+        :return: Number of shortcut edges added by the contraction.
+        '''
+        return self.__shortcuts
+
+    @property
+    def core_size(self) -> int:
+        '''
+        :return: Number of nodes left uncontracted, see build.
+        '''
+        return sum(self.__core)
+
+    @property
+    def nbytes(self) -> int:
+        '''
+        :return: Size of the edge and key buffers in bytes, without the key to index dict.
+        '''
+        buffers = (self.__keys, self.__up_offsets, self.__up_heads, self.__up_weights, self.__up_middles,
+                   self.__down_offsets, self.__down_tails, self.__down_weights, self.__down_middles)
+        return sum(len(buffer) * buffer.itemsize for buffer in buffers) + len(self.__core)
+
+    def query(self, src: int, dest: int, stats: dict = None) -> (float, list):
+        '''
+        :param src: Source node key.
+        :param dest: Target node key.
+        :param stats: If given, 'settled' is set to the number of nodes both searches settled.
+        :return: The distance from src to dest and the path with the shortcuts unpacked, (inf, []) if there is none.
+        '''
+        index = self.__index
+        if src not in index or dest not in index:
+            if stats is not None:
+                stats['settled'] = 0
+            return float('inf'), []
+
+        source = index[src]
+        target = index[dest]
+        # Side 0 forward from the source over the upward out edges, side 1 backward from the target over the upward
+        # in edges.
+        distances: Tuple[Dict[int, float], Dict[int, float]] = ({source: 0.0}, {target: 0.0})
+        predecessors: Tuple[Dict[int, int], Dict[int, int]] = ({}, {})
+        settled: Tuple[Set[int], Set[int]] = (set(), set())
+
+        best, meeting = self.__upward_search(distances, predecessors, settled)
+        best, meeting = self.__core_search(distances, predecessors, settled, best, meeting)
+
+        if stats is not None:
+            stats['settled'] = len(settled[0]) + len(settled[1])
+
+        if meeting == -1:
+            return float('inf'), []
+
+        # Hierarchy edges from the source to the meeting node, then to the target, each one unpacked.
+        hops = [meeting]
+        while hops[-1] != source:
+            hops.append(predecessors[0][hops[-1]])
+        hops.reverse()
+        node = meeting
+        while node != target:
+            node = predecessors[1][node]
+            hops.append(node)
+
+        path = [source]
+        for tail, head in zip(hops, hops[1:]):
+            self.__unpack(tail, head, path)
+        keys = self.__keys
+        return best, [keys[node] for node in path]
+
+    def __upward_search(self, distances: Tuple[Dict[int, float], Dict[int, float]],
+                        predecessors: Tuple[Dict[int, int], Dict[int, int]],
+                        settled: Tuple[Set[int], Set[int]]) -> Tuple[float, int]:
+        '''
+        Both sides up the contracted nodes, core nodes are reached but not gone on from.
+        Neither side stops at the other's settled nodes, the highest node of a path is only settled last, a side
+        stops once its queue head is no shorter than the best path.
+        :return: Distance of the best path through the contracted nodes and its meeting node, -1 if none.
+        '''
+        edges = ((self.__up_offsets, self.__up_heads, self.__up_weights),
+                 (self.__down_offsets, self.__down_tails, self.__down_weights))
+        core = self.__core
+        queues: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = (
+            [(0.0, node) for node in distances[0]], [(0.0, node) for node in distances[1]])
+
+        best = float('inf')
+        meeting = -1
+        while queues[0] or queues[1]:
+            for side in (0, 1):
+                pq = queues[side]
+                if pq and pq[0][0] >= best:
+                    pq.clear()
+                if not pq:
+                    continue
+
+                node_distance, node = heappop(pq)
+                side_distances = distances[side]
+                if node in settled[side] or node_distance > side_distances[node]:
+                    continue
+
+                other_distance = distances[1 - side].get(node)
+                if other_distance is not None and node_distance + other_distance < best:
+                    best = node_distance + other_distance
+                    meeting = node
+
+                # Left for the core search.
+                if core[node]:
+                    continue
+                settled[side].add(node)
+
+                # Stall on demand: a higher node reaches this one shorter, over an edge this side does not go
+                # along. The distance is not the shortest, no shortest path goes on from here.
+                stall_offsets, stall_others, stall_weights = edges[1 - side]
+                if any(side_distances.get(stall_others[e], float("inf")) + stall_weights[e] < node_distance
+                       for e in range(stall_offsets[node], stall_offsets[node + 1])):
+                    continue
+
+                offsets, others, weights = edges[side]
+                for e in range(offsets[node], offsets[node + 1]):
+                    neighbour = others[e]
+                    new_neighbour_distance = node_distance + weights[e]
+                    if new_neighbour_distance < side_distances.get(neighbour, float("inf")):
+                        side_distances[neighbour] = new_neighbour_distance
+                        predecessors[side][neighbour] = node
+                        heappush(pq, (new_neighbour_distance, neighbour))
+
+        return best, meeting
+
+    def __core_search(self, distances: Tuple[Dict[int, float], Dict[int, float]],
+                      predecessors: Tuple[Dict[int, int], Dict[int, int]], settled: Tuple[Set[int], Set[int]],
+                      best: float, meeting: int) -> Tuple[float, int]:
+        '''
+        Bidirectional Dijkstra inside the core, from the core nodes the upward search reached. Core edges go both
+        ways, so like GraphAlgo's bidirectional strategy it stops once the two queue heads add up to the best path.
+        :return: Distance of the best path and its meeting node, -1 if none.
+        '''
+        core = self.__core
+        edges = ((self.__up_offsets, self.__up_heads, self.__up_weights),
+                 (self.__down_offsets, self.__down_tails, self.__down_weights))
+        queues: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = (
+            [(d, node) for node, d in distances[0].items() if core[node]],
+            [(d, node) for node, d in distances[1].items() if core[node]])
+        heapify(queues[0])
+        heapify(queues[1])
+
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            node_distance, node = heappop(queues[side])
+            side_distances = distances[side]
+            if node in settled[side] or node_distance > side_distances[node]:
+                continue
+            settled[side].add(node)
+
+            other_distances = distances[1 - side]
+            offsets, others, weights = edges[side]
+            for e in range(offsets[node], offsets[node + 1]):
+                neighbour = others[e]
+                new_neighbour_distance = node_distance + weights[e]
+                if new_neighbour_distance < side_distances.get(neighbour, float("inf")):
+                    side_distances[neighbour] = new_neighbour_distance
+                    predecessors[side][neighbour] = node
+                    heappush(queues[side], (new_neighbour_distance, neighbour))
+
+                    # The other side reached the neighbour too, a path goes through it.
+                    other_distance = other_distances.get(neighbour)
+                    if other_distance is not None and new_neighbour_distance + other_distance < best:
+                        best = new_neighbour_distance + other_distance
+                        meeting = neighbour
+
+        return best, meeting
+
+    def __unpack(self, tail: int, head: int, path: List[int]):
+        '''
+        Appends the nodes of edge tail -> head after tail to path, shortcuts replaced by the edges they skip.
+        '''
+        stack = [(tail, head)]
+        while stack:
+            tail, head = stack.pop()
+            middle = self.__middle(tail, head)
+            if middle == -1:
+                path.append(head)
+            else:
+                # tail -> middle first.
+                stack.append((middle, head))
+                stack.append((tail, middle))
+
+    def __middle(self, tail: int, head: int) -> int:
+        '''
+        :return: Middle of the hierarchy edge tail -> head, stored with the lower of the two.
+        '''
+        up_offsets = self.__up_offsets
+        for e in range(up_offsets[tail], up_offsets[tail + 1]):
+            if self.__up_heads[e] == head:
+                return self.__up_middles[e]
+
+        down_offsets = self.__down_offsets
+        for e in range(down_offsets[head], down_offsets[head + 1]):
+            if self.__down_tails[e] == tail:
+                return self.__down_middles[e]
+
+        raise ValueError("No hierarchy edge from {} to {}.".format(tail, head))
+
+    @classmethod
+    def __priority(cls, outs: List[Dict[int, float]], ins: List[Dict[int, float]], deleted: List[int],
+                   levels: List[int], node: int) -> int:
+        '''
+        Edge difference, shortcuts added minus edges removed, plus contracted neighbours and level. Only an
+        estimate, its witness searches settle fewer nodes than the contraction's.
+        '''
+        shortcuts = cls.__shortcuts(outs, ins, node, cls.PRIORITY_WITNESS_SETTLED_LIMIT)
+        return 2 * (len(shortcuts) - len(outs[node]) - len(ins[node])) + deleted[node] + levels[node]
+
+    @classmethod
+    def __shortcuts(cls, outs: List[Dict[int, float]], ins: List[Dict[int, float]], node: int,
+                    settled_limit: int) -> List[Tuple[int, int, float]]:
+        '''
+        :return: The shortcuts (tail, head, weight) contracting node needs, one witness search per in neighbour.
+        '''
+        shortcuts: List[Tuple[int, int, float]] = []
+        node_outs = outs[node]
+        if not node_outs:
+            return shortcuts
+
+        for tail, in_weight in ins[node].items():
+            targets = {head: in_weight + out_weight for head, out_weight in node_outs.items() if head != tail}
+            if not targets:
+                continue
+
+            witnessed = cls.__witness_search(outs, tail, node, targets, max(targets.values()), settled_limit)
+            shortcuts.extend((tail, head, weight) for head, weight in targets.items()
+                             if witnessed.get(head, float('inf')) > weight)
+        return shortcuts
+
+    @staticmethod
+    def __witness_search(outs: List[Dict[int, float]], source: int, avoid: int, targets: Dict[int, float],
+                         limit: float, settled_limit: int) -> Dict[int, float]:
+        '''
+        Dijkstra from source around avoid, up to distance limit and settled_limit settled nodes.
+        :return: Tentative distances, an upper bound of the real ones.
+        '''
+        distances: Dict[int, float] = {source: 0.0}
+        get_distance = distances.get
+        remaining = len(targets)
+        settled = 0
+        pq: List[Tuple[float, int]] = [(0.0, source)]
+
+        while pq and settled < settled_limit:
+            node_distance, node_id = heappop(pq)
+            # A node is only pushed again with a shorter distance, the older entry is stale.
+            if node_distance > distances[node_id]:
+                continue
+            if node_distance > limit:
+                break
+            settled += 1
+            if node_id in targets:
+                remaining -= 1
+                if not remaining:
+                    break
+
+            for neighbour_id, weight in outs[node_id].items():
+                new_neighbour_distance = node_distance + weight
+                if new_neighbour_distance < get_distance(neighbour_id, float("inf")) and neighbour_id != avoid:
+                    distances[neighbour_id] = new_neighbour_distance
+                    heappush(pq, (new_neighbour_distance, neighbour_id))
+
+        return distances
+
+    @staticmethod
+    def __pack(edges: List[Dict[int, float]], middles: Dict[Tuple[int, int], int],
+               incoming: bool) -> Tuple[array, array, array, array]:
+        '''
+        :param incoming: False for out edges, other ends are heads, True for in edges, other ends are tails.
+        :return: offsets, other ends, weights, middles of the edges of every node.
+        '''
+        offsets = array('q', [0])
+        others = array('q')
+        weights = array('d')
+        edge_middles = array('q')
+        for node, node_edges in enumerate(edges):
+            for other, weight in node_edges.items():
+                others.append(other)
+                weights.append(weight)
+                edge_middles.append(middles.get((other, node) if incoming else (node, other), -1))
+            offsets.append(len(others))
+        return offsets, others, weights, edge_middles
@@ -1,48 +1,102 @@
-from typing import Dict, List
+import numbers
+from typing import Dict, List, Iterable, Iterator, Tuple
 
+from CSRGraph import CSRGraph
 from Edge import Edge
+from GraphElement import GraphElement
 from GraphInterface import GraphInterface
+from GraphListener import GraphListener
 from LinkAttributes import LinkAttributes
 from Node import Node
 from location.GeoLocation import GeoLocation
 
 
 class DiGraph(GraphInterface):
-    def __init__(self):
+    __LOAD_BATCH_SIZE = 4096
+
+    def __init__(self, position_array: bool = False):
         self.__mode_count = 0
         self.__nodes: Dict[int, Node] = {}
 
         # {<node_id>: {'LINKS_OUT': {<other_id>: Edge}, 'LINKS_IN': {<other_id>: Edge}}}
         self.__links: Dict[int, Dict[str, Dict[int, Edge]]] = {}
         self.__edge_count: int = 0
+        self.__listeners: List[GraphListener] = []
+        self.__positions = None
+
+        if position_array:
+            self.enable_position_array()
 
     @classmethod
     def from_dict(cls, data) -> GraphInterface:
-        g = cls()
-
         nodes = data.get("nodes") or data.get("Nodes")
         edges = data.get("links") or data.get("Edges")
 
         if nodes is None or edges is None:
             raise ValueError("Malformed JSON.")
 
+        return cls.from_elements(cls.__iter_dict_elements(data, nodes, edges))
+
+    @staticmethod
+    def __iter_dict_elements(data: dict, nodes, edges) -> Iterator[Tuple[str, object]]:
         nodes = nodes.values() if isinstance(nodes, dict) else nodes
         for node in nodes:
-            n = Node.from_dict(node)
-            g.__add_node_by_instance(n)
+            yield GraphElement.NODE, node
 
         # if of type links (our data structure)
         if 'links' in data:
-            actual_edges: List[dict] = []
             for l in edges.values():
-                actual_edges += l.values()
-            edges = actual_edges
-
-        for e in edges:
-            new_edge = Edge.from_dict(e)
-            g.__add_edge_by_instance(new_edge)
+                for e in l.values():
+                    yield GraphElement.EDGE, e
+        else:
+            for e in edges:
+                yield GraphElement.EDGE, e
 
         mode_count = data.get('modeCount')
+        if mode_count is not None:
+            yield GraphElement.MODE_COUNT, mode_count
+
+    @classmethod
+    def from_elements(cls, elements: Iterable[Tuple[str, object]]) -> GraphInterface:
+        """
+        Builds a graph from a stream of (GraphElement kind, value) pairs, node and edge values are dicts
+        or ready Node and Edge instances.
+        Elements are consumed one at a time and added in batches, edges may come before the nodes they connect.
+        An edge whose nodes never show up raises ValueError.
+        @param elements: Iterable of elements, e.g. a JsonGraphReader
+        @return: The graph
+        """
+        g = cls()
+        node_batch: List[Node] = []
+        edge_batch: List[Edge] = []
+        pending_edges: List[Edge] = []
+        mode_count = None
+
+        for kind, value in elements:
+            if kind == GraphElement.NODE:
+                node_batch.append(value if isinstance(value, Node) else Node.from_dict(value))
+            elif kind == GraphElement.EDGE:
+                edge_batch.append(value if isinstance(value, Edge) else Edge.from_dict(value))
+            elif kind == GraphElement.MODE_COUNT:
+                mode_count = value
+
+            if len(node_batch) + len(edge_batch) >= cls.__LOAD_BATCH_SIZE:
+                g.add_nodes_from(node_batch)
+                node_batch = []
+
+                # Edges whose nodes did not show up yet wait for the end of the stream.
+                pending_edges.extend(e for e in edge_batch if e.src not in g.__nodes or e.dest not in g.__nodes)
+                g.add_edges_from(e for e in edge_batch if e.src in g.__nodes and e.dest in g.__nodes)
+                edge_batch = []
+
+        g.add_nodes_from(node_batch)
+        pending_edges.extend(edge_batch)
+        for e in pending_edges:
+            if e.src not in g.__nodes or e.dest not in g.__nodes:
+                raise ValueError("Edge {} -> {} connects a node that is not in the graph.".format(e.src, e.dest))
+        for start in range(0, len(pending_edges), cls.__LOAD_BATCH_SIZE):
+            g.add_edges_from(pending_edges[start:start + cls.__LOAD_BATCH_SIZE])
+
         if mode_count is not None:
             g.__set_mode_count(mode_count)
 
@@ -100,6 +154,27 @@ class DiGraph(GraphInterface):
         return {connected_node_id: v.weight for connected_node_id, v in
                 self.__links.get(id1).get(LinkAttributes.ATTR_LINKS_OUT).items()}
 
+    def in_neighbours(self, id1: int) -> Iterator[Tuple[int, float]]:
+        """return an iterator over the nodes connected to (into) node_id, each node is represented using a pair
+        (other_node_id, weight). The pairs are read straight off the stored edges, unlike all_in_edges_of_node no
+        intermediate dictionary is built. The graph must not be changed while iterating.
+        """
+        return ((connected_node_id, e.weight) for connected_node_id, e in
+                self.__links[id1][LinkAttributes.ATTR_LINKS_IN].items())
+
+    def out_neighbours(self, id1: int) -> Iterator[Tuple[int, float]]:
+        """return an iterator over the nodes connected from node_id, each node is represented using a pair
+        (other_node_id, weight). The pairs are read straight off the stored edges, unlike all_out_edges_of_node no
+        intermediate dictionary is built. The graph must not be changed while iterating.
+        """
+        return ((connected_node_id, e.weight) for connected_node_id, e in
+                self.__links[id1][LinkAttributes.ATTR_LINKS_OUT].items())
+
+    def out_edges(self, id1: int) -> Iterator[Edge]:
+        """return an iterator over the stored Edge instances leaving node_id, they must not be changed.
+        """
+        return iter(self.__links[id1][LinkAttributes.ATTR_LINKS_OUT].values())
+
     def get_mc(self) -> int:
         """
         Returns the current version of this graph,
@@ -127,20 +202,12 @@ class DiGraph(GraphInterface):
             self.__links.get(id2).get(LinkAttributes.ATTR_LINKS_IN)[id1] = e
             self.__mode_count += 1
             self.__edge_count += 1
+
+            for listener in self.__listeners:
+                listener.on_edge_added(id1, id2, weight)
             return True
         return False
 
-    def __add_node_by_instance(self, node: Node):
-        self.add_node(node.key)
-        self.__nodes[node.key] = node
-        node.set_links_dict(self.__links.get(node.key))
-
-
-    def __add_edge_by_instance(self, edge: Edge):
-        self.add_edge(edge.src, edge.dest, edge.weight)
-        self.__links.get(edge.src).get(LinkAttributes.ATTR_LINKS_OUT)[edge.dest] = edge
-        self.__links.get(edge.dest).get(LinkAttributes.ATTR_LINKS_IN)[edge.src] = edge
-
     def add_node(self, node_id: int, pos: tuple = None) -> bool:
         """
         Adds a node to the graph.
@@ -160,11 +227,114 @@ class DiGraph(GraphInterface):
                                                            LinkAttributes.ATTR_LINKS_IN: {}}
             self.__links[node_id] = links_container
             node.set_links_dict(links_container)
+            if self.__positions is not None:
+                self.__positions.attach(node)
             self.__mode_count += 1
 
+            for listener in self.__listeners:
+                listener.on_node_added(node_id)
             return True
         return False
 
+    def add_nodes_from(self, nodes: Iterable) -> int:
+        """
+        Adds many nodes at once, the MC is increased once for the whole batch.
+        @param nodes: Iterable of (node_id, pos) pairs, pos may be None, or of Node instances (kept as is)
+        @return: The number of nodes added
+
+        Note: The whole batch is checked before anything is added, a malformed entry raises ValueError.
+        Like add_node, ids that already exist are skipped.
+        """
+        batch = [node if isinstance(node, Node) else self.__node_from_pair(node) for node in nodes]
+
+        added: List[int] = []
+        for node in batch:
+            if node.key in self.__nodes:
+                continue
+
+            links_container: Dict[str, Dict[int, Edge]] = {LinkAttributes.ATTR_LINKS_OUT: {},
+                                                           LinkAttributes.ATTR_LINKS_IN: {}}
+            self.__nodes[node.key] = node
+            self.__links[node.key] = links_container
+            node.set_links_dict(links_container)
+            if self.__positions is not None:
+                self.__positions.attach(node)
+            added.append(node.key)
+
+        if added:
+            self.__mode_count += 1
+            for listener in self.__listeners:
+                for node_id in added:
+                    listener.on_node_added(node_id)
+        return len(added)
+
+    def add_edges_from(self, edges: Iterable) -> int:
+        """
+        Adds many edges at once, the MC is increased once for the whole batch.
+        @param edges: Iterable of (src, dest, weight) triplets, e.g. rows of an int array, or of Edge instances
+                      (kept as is)
+        @return: The number of edges added
+
+        Note: The whole batch is checked before anything is added, a malformed entry raises ValueError.
+        Like add_edge, self loops, edges with a missing node and edges that already exist are skipped.
+        """
+        batch = [(e.src, e.dest, e.weight, e) if isinstance(e, Edge) else self.__edge_triplet(e) for e in edges]
+
+        nodes = self.__nodes
+        links = self.__links
+        added = 0
+        for src, dest, weight, e in batch:
+            if src == dest or src not in nodes or dest not in nodes:
+                continue
+            out_links = links[src][LinkAttributes.ATTR_LINKS_OUT]
+            if dest in out_links:
+                continue
+
+            if e is None:
+                e = Edge(src=src, dest=dest, weight=weight)
+            out_links[dest] = e
+            links[dest][LinkAttributes.ATTR_LINKS_IN][src] = e
+            self.__edge_count += 1
+
+            if added == 0:
+                self.__mode_count += 1
+            added += 1
+
+            # Listeners see the graph edge by edge, as if add_edge was called.
+            for listener in self.__listeners:
+                listener.on_edge_added(src, dest, weight)
+        return added
+
+    @staticmethod
+    def __node_from_pair(pair) -> Node:
+        try:
+            node_id, pos = pair
+        except (TypeError, ValueError):
+            raise ValueError("Malformed node entry {}, expected (node_id, pos).".format(pair))
+
+        if not isinstance(node_id, numbers.Integral):
+            raise ValueError("Node id {} must be an integer.".format(node_id))
+        if pos is not None and len(pos) != 3:
+            raise ValueError("Malformed position {}, expected (x, y, z).".format(pos))
+
+        return Node(int(node_id), GeoLocation(*pos) if pos is not None else None)
+
+    @staticmethod
+    def __edge_triplet(triplet) -> Tuple[int, int, float, None]:
+        try:
+            src, dest, weight = triplet
+        except (TypeError, ValueError):
+            raise ValueError("Malformed edge entry {}, expected (src, dest, weight).".format(triplet))
+
+        if not isinstance(src, numbers.Integral) or not isinstance(dest, numbers.Integral):
+            raise ValueError("Edge ends {}, {} must be integers.".format(src, dest))
+        if not isinstance(weight, numbers.Real):
+            raise ValueError("Edge weight {} must be a number.".format(weight))
+
+        # Plain Python numbers, numpy scalars do not serialize to JSON.
+        weight = int(weight) if isinstance(weight, numbers.Integral) else float(weight)
+        return int(src), int(dest), weight, None
+
     def remove_node(self, node_id: int) -> bool:
         """
         Removes a node from the graph.
@@ -175,12 +345,20 @@ class DiGraph(GraphInterface):
         """
 
         if node_id in self.__nodes:
-            for other_node_id in self.__links.get(node_id).get(LinkAttributes.ATTR_LINKS_OUT).keys():
+            # Copy the keys, remove_edge changes the dicts.
+            for other_node_id in list(self.__links.get(node_id).get(LinkAttributes.ATTR_LINKS_OUT).keys()):
                 self.remove_edge(node_id, other_node_id)
+            for other_node_id in list(self.__links.get(node_id).get(LinkAttributes.ATTR_LINKS_IN).keys()):
+                self.remove_edge(other_node_id, node_id)
 
             del self.__links[node_id]
+            if self.__positions is not None:
+                self.__positions.detach(self.__nodes[node_id])
             del self.__nodes[node_id]
             self.__mode_count += 1
+
+            for listener in self.__listeners:
+                listener.on_node_removed(node_id)
             return True
         return False
 
@@ -198,9 +376,58 @@ class DiGraph(GraphInterface):
             del self.__links.get(node_id2).get(LinkAttributes.ATTR_LINKS_IN)[node_id1]
             self.__mode_count += 1
             self.__edge_count -= 1
+
+            for listener in self.__listeners:
+                listener.on_edge_removed(node_id1, node_id2)
             return True
         return False
 
+    def add_listener(self, listener: GraphListener):
+        """
+        Registers a listener to be notified on every node or edge addition and removal.
+        @param listener: GraphListener
+        """
+        if listener not in self.__listeners:
+            self.__listeners.append(listener)
+
+    def remove_listener(self, listener: GraphListener):
+        """
+        Unregisters a listener, does nothing if it is not registered.
+        @param listener: GraphListener
+        """
+        if listener in self.__listeners:
+            self.__listeners.remove(listener)
+
+    def enable_position_array(self):
+        """
+        Moves the node positions into one contiguous N x 3 float64 array (a PositionStore, needs numpy).
+        Node.geo_location stays the public API, it becomes a view on the node row.
+        Does nothing if already enabled.
+        @return: The PositionStore
+        """
+        if self.__positions is None:
+            from location.PositionStore import PositionStore
+
+            self.__positions = PositionStore()
+            for node in self.__nodes.values():
+                self.__positions.attach(node)
+        return self.__positions
+
+    @property
+    def position_store(self):
+        """
+        @return: The PositionStore if enable_position_array was called, None o.w.
+        """
+        return self.__positions
+
+    def freeze(self) -> CSRGraph:
+        """
+        Builds a read only CSR snapshot of this graph for read heavy workloads.
+        The snapshot records the current MC, CSRGraph.is_stale() tells if this graph was changed since.
+        @return: CSRGraph snapshot
+        """
+        return CSRGraph.from_graph(self)
+
     def __set_mode_count(self, mode_count: int):
         self.__mode_count = mode_count
 
@@ -1,4 +1,5 @@
 class Edge(object):
+    __slots__ = ('src', 'dest', 'weight', 'info', 'tag')
     INVALID_ENTRY = -1
 
     def __init__(self, src: int = None, dest: int = None, weight: float = None, info: str = None, tag: int = None):
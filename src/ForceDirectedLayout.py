@@ -0,0 +1,270 @@
+import math
+from typing import Dict, List
+
+import numpy as np
+
+from GraphInterface import GraphInterface
+from location.GeoLocation import GeoLocation
+
+
+class ForceDirectedLayout(object):
+    '''
+    Fruchterman-Reingold force directed layout (https://en.wikipedia.org/wiki/Force-directed_graph_drawing),
+    computed on arrays. Nodes that already have a geo_location are pinned, they push and pull the others but never
+    move. Every iteration is a few batched array operations:
+        repulsion   between every two nodes, exact for nodes in neighbouring cells of a uniform grid, through a
+                    hierarchy of coarser cells for the rest, so an iteration is about linear in |V|
+                    instead of quadratic.
+        attraction  along every edge, direction ignored.
+        cooling     the move of a node is capped by a temperature that drops linearly to 0.
+    '''
+    DEFAULT_ITERATIONS = 50
+
+    # Pairs handled at once by the repulsion, bounds the temporary arrays.
+    __MAX_PAIRS_PER_BATCH = 1 << 20
+    __MIN_DIST_SQ = 1e-12
+    # Up to this many nodes the repulsion is computed over all the pairs.
+    __EXACT_REPULSION_MAX_NODES = 256
+    # Largest dense key to cell table, bigger grids fall back to binary search.
+    __MAX_LOOKUP_TABLE = 1 << 22
+    __INITIAL_TEMPERATURE_RATIO = 0.1
+
+    def __init__(self, g: GraphInterface, iterations: int = DEFAULT_ITERATIONS, seed: int = 0):
+        '''
+        :param g: Graph to lay out.
+        :param iterations: Iteration budget.
+        :param seed: Seed of the initial random placement, the same seed gives the same layout.
+        '''
+        if iterations < 0:
+            raise ValueError("Iterations must not be negative.")
+
+        self.__g: GraphInterface = g
+        self.__iterations: int = iterations
+        self.__seed: int = seed
+
+    def run(self) -> int:
+        '''
+        Gives a position to every node that has none, z is 0.
+        :return: The number of nodes positioned.
+        '''
+        nodes = self.__g.get_all_v()
+        keys: List[int] = list(nodes.keys())
+        free_keys = [key for key in keys if nodes[key].geo_location is None]
+        if not free_keys:
+            return 0
+
+        index: Dict[int, int] = {key: i for i, key in enumerate(keys)}
+        pinned = np.array([nodes[key].geo_location is not None for key in keys])
+        pos = np.zeros((len(keys), 2))
+        for i in np.flatnonzero(pinned):
+            geo = nodes[keys[i]].geo_location
+            pos[i] = (geo.x, geo.y)
+
+        src, dest = self.__edge_arrays(keys, index)
+        k = self.__place_randomly(pos, pinned)
+        self.__simulate(pos, pinned, src, dest, k)
+
+        for i in np.flatnonzero(~pinned):
+            nodes[keys[i]].geo_location = GeoLocation(pos[i, 0], pos[i, 1], 0)
+        return len(free_keys)
+
+    def __edge_arrays(self, keys: List[int], index: Dict[int, int]) -> (np.ndarray, np.ndarray):
+        src = []
+        dest = []
+        for key in keys:
+            i = index[key]
+            for other_node_id, _ in self.__g.out_neighbours(key):
+                src.append(i)
+                dest.append(index[other_node_id])
+        return np.array(src, dtype=np.int64), np.array(dest, dtype=np.int64)
+
+    def __place_randomly(self, pos: np.ndarray, pinned: np.ndarray) -> float:
+        '''
+        Spreads the free nodes over the frame, the bounding box of the pinned nodes or a square of side sqrt(|V|).
+        :return: k, the ideal distance between nodes.
+        '''
+        n = len(pos)
+        if pinned.any():
+            low = pos[pinned].min(axis=0)
+            high = pos[pinned].max(axis=0)
+            side = (high - low).max() or 1.0
+            center = (low + high) / 2
+            size = np.where(high - low > 0, high - low, side)
+            low = center - size / 2
+        else:
+            size = np.array([math.sqrt(n), math.sqrt(n)])
+            low = np.zeros(2)
+
+        rng = np.random.default_rng(self.__seed)
+        free = ~pinned
+        pos[free] = low + rng.random((int(free.sum()), 2)) * size
+        return math.sqrt(size[0] * size[1] / n)
+
+    def __simulate(self, pos: np.ndarray, pinned: np.ndarray, src: np.ndarray, dest: np.ndarray, k: float):
+        free = ~pinned
+        temperature = self.__INITIAL_TEMPERATURE_RATIO * math.sqrt(len(pos)) * k
+
+        for iteration in range(self.__iterations):
+            disp = self.__repulsion(pos, k)
+
+            # Attraction d^2 / k along the edges, as delta / d * d^2 / k.
+            delta = pos[src] - pos[dest]
+            dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+            pull = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] -= np.bincount(src, weights=pull[:, axis], minlength=len(pos))
+                disp[:, axis] += np.bincount(dest, weights=pull[:, axis], minlength=len(pos))
+
+            # Move the free nodes, capped by the temperature.
+            step = temperature * (1 - iteration / self.__iterations)
+            length = np.sqrt(np.einsum('ij,ij->i', disp, disp))
+            scale = np.minimum(length, step) / np.maximum(length, self.__MIN_DIST_SQ)
+            pos[free] += disp[free] * scale[free, None]
+
+    def __repulsion(self, pos: np.ndarray, k: float) -> np.ndarray:
+        '''
+        Repulsion k^2 / d between every two nodes. Nodes in neighbouring cells of a uniform grid are paired
+        exactly. Farther nodes are handled by cells: on every coarser level (cell side doubled) a cell is pushed by
+        the cells that are not its neighbours but whose parent neighbours its parent, as if all the mass sat at the
+        centers of mass. Every two far nodes are counted on exactly one level.
+        :return: N x 2 displacement.
+        '''
+        if len(pos) <= self.__EXACT_REPULSION_MAX_NODES:
+            return self.__repulsion_exact(pos, k)
+
+        disp = np.zeros((len(pos), 2))
+
+        # About one node per cell at the current density keeps the exact pairs few, the far field levels take
+        # care of the rest whatever the cell size.
+        extent = pos.max(axis=0) - pos.min(axis=0)
+        cell_size = math.sqrt(extent[0] * extent[1] / len(pos)) or k
+        cells = np.floor(pos / cell_size).astype(np.int64)
+
+        keys, width, _ = self.__cell_keys(cells)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        # Every pair is visited once and pushes both nodes: the own cell and half of the neighbouring ones.
+        for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+            target = keys + dx * width + dy
+            start = np.searchsorted(sorted_keys, target, side='left')
+            counts = np.searchsorted(sorted_keys, target, side='right') - start
+            self.__repel_pairs(pos, disp, order, start, counts, k * k, same_cell=(dx, dy) == (0, 0))
+
+        # Far field, level by level until every cell neighbours every other.
+        while (cells.max(axis=0) - cells.min(axis=0)).max() > 1:
+            self.__repel_cells(pos, disp, cells, k * k)
+            cells = cells >> 1
+
+        return disp
+
+    def __repulsion_exact(self, pos: np.ndarray, k: float) -> np.ndarray:
+        '''
+        Repulsion over all the pairs at once, cheaper than the grid for small graphs.
+        '''
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist_sq = np.einsum('ijk,ijk->ij', delta, delta)
+        np.fill_diagonal(dist_sq, np.inf)
+        return np.einsum('ijk,ij->ik', delta, k * k / np.maximum(dist_sq, self.__MIN_DIST_SQ))
+
+    def __repel_cells(self, pos: np.ndarray, disp: np.ndarray, cells: np.ndarray, k_sq: float):
+        '''
+        One far field level, see __repulsion.
+        '''
+        keys, width, origin = self.__cell_keys(cells)
+        cell_keys, inverse = np.unique(keys, return_inverse=True)
+        mass = np.bincount(inverse).astype(np.float64)
+        com = np.stack([np.bincount(inverse, weights=pos[:, axis]) / mass for axis in (0, 1)], axis=1)
+        lookup = self.__cell_lookup(cell_keys)
+        force = np.zeros((len(cell_keys), 2))
+
+        # Parity from the unshifted cells, it has to match the parents of the next level.
+        cell_x = cell_keys // width + origin[0]
+        cell_y = cell_keys % width + origin[1]
+
+        # Which cells interact only depends on the parity of a cell: an even x sees x - 2 .. x + 3, an odd one
+        # x - 3 .. x + 2, its own neighbours excluded.
+        for parity_x in (0, 1):
+            for parity_y in (0, 1):
+                members = np.flatnonzero(((cell_x & 1) == parity_x) & ((cell_y & 1) == parity_y))
+                if not len(members):
+                    continue
+
+                for dx in range(-2 - parity_x, 4 - parity_x):
+                    for dy in range(-2 - parity_y, 4 - parity_y):
+                        if abs(dx) <= 1 and abs(dy) <= 1:
+                            continue
+
+                        other = lookup(cell_keys[members] + dx * width + dy)
+                        found = other >= 0
+                        a = members[found]
+                        b = other[found]
+                        delta = com[a] - com[b]
+                        dist_sq = np.einsum('ij,ij->i', delta, delta)
+                        force[a] += delta * (mass[b] * k_sq / np.maximum(dist_sq, self.__MIN_DIST_SQ))[:, None]
+
+        disp += force[inverse]
+
+    def __cell_lookup(self, cell_keys: np.ndarray):
+        '''
+        :param cell_keys: Sorted unique cell keys.
+        :return: Function from an array of keys to the indices in cell_keys, -1 for keys not there.
+        '''
+        # Keys are at least 3 * width + 3 (the margin of __cell_keys) and looked up keys are at most 3 rows and
+        # columns away, so they all fall in [0, 2 * last key].
+        table_size = int(cell_keys[-1]) * 2 + 1
+        if table_size <= self.__MAX_LOOKUP_TABLE:
+            table = np.full(table_size, -1, dtype=np.int64)
+            table[cell_keys] = np.arange(len(cell_keys))
+            return lambda keys: table[keys]
+
+        def search(keys: np.ndarray) -> np.ndarray:
+            idx = np.minimum(np.searchsorted(cell_keys, keys), len(cell_keys) - 1)
+            return np.where(cell_keys[idx] == keys, idx, -1)
+        return search
+
+    @staticmethod
+    def __cell_keys(cells: np.ndarray) -> (np.ndarray, int, np.ndarray):
+        '''
+        Single int keys for 2D cells, with a margin of 3 cells on every side so keys of nearby cells never wrap.
+        :return: keys, width and origin, key = (x - origin x) * width + (y - origin y).
+        '''
+        origin = cells.min(axis=0) - 3
+        shifted = cells - origin
+        width = int(shifted[:, 1].max()) + 4
+        return shifted[:, 0] * width + shifted[:, 1], width, origin
+
+    def __repel_pairs(self, pos: np.ndarray, disp: np.ndarray, order: np.ndarray, start: np.ndarray,
+                      counts: np.ndarray, k_sq: float, same_cell: bool):
+        '''
+        Node i is paired with order[start[i]:start[i] + counts[i]], handled in batches of about
+        __MAX_PAIRS_PER_BATCH pairs. Both nodes of a pair are pushed.
+        :param same_cell: The pairs are within cells, only i < j is kept so every pair counts once.
+        '''
+        n = len(pos)
+        ends = np.cumsum(counts)
+        first = 0
+        while first < n:
+            budget = (ends[first - 1] if first else 0) + self.__MAX_PAIRS_PER_BATCH
+            last = max(int(np.searchsorted(ends, budget, side='right')), first + 1)
+
+            batch_counts = counts[first:last]
+            total = int(batch_counts.sum())
+            if total:
+                i = np.repeat(np.arange(first, last), batch_counts)
+                offsets = np.arange(total) - np.repeat(np.cumsum(batch_counts) - batch_counts, batch_counts)
+                j = order[np.repeat(start[first:last], batch_counts) + offsets]
+
+                if same_cell:
+                    once = i < j
+                    i = i[once]
+                    j = j[once]
+
+                delta = pos[i] - pos[j]
+                dist_sq = np.einsum('ij,ij->i', delta, delta)
+
+                # delta / d * k^2 / d
+                push = delta * (k_sq / np.maximum(dist_sq, self.__MIN_DIST_SQ))[:, None]
+                for axis in (0, 1):
+                    disp[:, axis] += np.bincount(i, weights=push[:, axis], minlength=n)
+                    disp[:, axis] -= np.bincount(j, weights=push[:, axis], minlength=n)
+            first = last
@@ -1,24 +1,40 @@
 import json
 import math
+import os
 import sys
 import traceback
+from array import array
+from collections import OrderedDict
 from heapq import heappush, heappop
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Set, Tuple
 
+from BinaryGraphFormat import BinaryGraphFormat
+from CSRGraph import CSRGraph
+from Condensation import Condensation
 from DiGraph import DiGraph
 from GraphAlgoInterface import GraphAlgoInterface
+from GraphInterface import GraphInterface
+from JsonGraphReader import JsonGraphReader
 from Node import Node
+from ShortestPathTree import ShortestPathTree
 from location.GeoLocation import GeoLocation
 from location.Range import Range
 from location.Range2D import Range2D
-from src import GraphInterface
-import matplotlib.pyplot as plt
+from location.SpatialGrid import SpatialGrid
 
 
 class GraphAlgo(GraphAlgoInterface):
+    LAYOUT_SPIRAL = 'spiral'
+    LAYOUT_FORCE_DIRECTED = 'force_directed'
+
+    SHORTEST_PATH_DIJKSTRA = 'dijkstra'
+    SHORTEST_PATH_BIDIRECTIONAL = 'bidirectional'
+    SHORTEST_PATH_A_STAR = 'a_star'
+    SHORTEST_PATH_ALT = 'alt'
+    SHORTEST_PATH_CH = 'ch'
+
     __STATUS_NODE_NOT_VISITED = 0
     __STATUS_NODE_VISITED = 1
-    __STATUS_NODE_QUEUED = 2
 
     __NUM_NODES_IN_CIRCLE = 25
     __MULTIPLIER_DIST_X = 1.1
@@ -26,15 +42,33 @@ class GraphAlgo(GraphAlgoInterface):
     __NUM_NODES_IN_X_AXIS = 10
     __RADIUS_EPS_DIVIDER = 2
     __SEARCH_RADIUS_MULTIPLIER = 1.5
-    __RAD_ARC = 0.15
-    __Z_ORDER = 99
-    __COLOR_TEXT = 'midnightblue'
-    __COLOR_BOX = 'yellow'
+    # The landmark tables of a graph JSON file go to file name + suffix.
+    __LANDMARKS_FILE_SUFFIX = '.landmarks.npz'
+    # Shortest path trees kept per graph state, the least recently used goes first.
+    __SHORTEST_PATH_TREE_CACHE_SIZE = 8
+    # Shrinks the A* heuristic scale a hair so rounding never makes it overestimate.
+    __A_STAR_SCALE_SAFETY = 1 - 1e-9
     __DEGREES = 360
 
     def __init__(self, g: GraphInterface = None):
         self.__g: DiGraph = g
-        sys.setrecursionlimit(99999999)
+
+        # (graph, mc, sccs, {node_id: index of its scc}), replaced as a whole so readers never see a partial cache.
+        self.__scc_cache: Tuple[GraphInterface, int, List[List[int]], Dict[int, int]] = None
+        # (graph, mc) of the last single component query answered without the cache.
+        self.__last_component_query: Tuple[GraphInterface, int] = None
+        # {name: (graph, stamp, value)} of the values computed from the graph, see __cached:
+        # 'a_star_scale': the A* heuristic scale, see __get_a_star_scale.
+        # 'landmarks': Landmarks for SHORTEST_PATH_ALT.
+        # 'contraction_hierarchy': ContractionHierarchy for SHORTEST_PATH_CH.
+        # 'path_trees': (node keys and index shared by the trees, {src: ShortestPathTree} least recently used first).
+        self.__caches: Dict[str, Tuple[GraphInterface, object, object]] = {}
+        # Landmarks built when the tables are rebuilt, None for Landmarks.DEFAULT_COUNT.
+        self.__landmark_count: Optional[int] = None
+        # Core degree of the hierarchy when it is rebuilt, None for ContractionHierarchy.DEFAULT_CORE_DEGREE.
+        self.__core_degree: Optional[float] = None
+        # (graph, render mode, GraphPlotter) of the last drawing.
+        self.__plotter: Tuple[GraphInterface, str, object] = None
 
     def get_graph(self) -> GraphInterface:
         """
@@ -45,13 +79,14 @@ class GraphAlgo(GraphAlgoInterface):
     def load_from_json(self, file_name: str) -> bool:
         """
         Loads a graph from a json file.
+        Landmark tables saved next to the file (see save_to_json) are loaded too if they match the graph.
         @param file_name: The path to the json file
         @returns True if the loading was successful, False o.w.
         """
         try:
             with open(file_name, 'r') as f:
-                data = json.loads(f.read())
-            self.__g = DiGraph.from_dict(data)
+                self.__g = DiGraph.from_elements(JsonGraphReader(f))
+            self.__load_landmarks(file_name + self.__LANDMARKS_FILE_SUFFIX)
             return True
         except:
             traceback.print_exc()
@@ -60,22 +95,69 @@ class GraphAlgo(GraphAlgoInterface):
     def save_to_json(self, file_name: str) -> bool:
         """
         Saves the graph in JSON format to a file
+        Landmark tables built for the graph as it is are saved next to it, file_name + '.landmarks.npz', so loading
+        it again does not need the preprocessing.
         @param file_name: The path to the out file
         @return: True if the save was successful, False o.w.
         """
         try:
             with open(file_name, 'w') as f:
                 f.write(json.dumps(self.get_graph().to_dict()))
+            self.__save_landmarks(file_name + self.__LANDMARKS_FILE_SUFFIX)
+            return True
+        except:
+            traceback.print_exc()
+        return False
+
+    def load_from_binary(self, file_name: str, frozen: bool = False) -> bool:
+        """
+        Loads a graph from a binary file written by save_to_binary, the file is memory mapped, not parsed.
+        @param file_name: The path to the binary file
+        @param frozen: If True the graph is a read only CSRGraph over the mapped file, a DiGraph o.w.
+        @returns True if the loading was successful, False o.w.
+        """
+        try:
+            self.__g = BinaryGraphFormat.load(file_name, frozen=frozen)
+            return True
+        except:
+            traceback.print_exc()
+            return False
+
+    def save_to_binary(self, file_name: str) -> bool:
+        """
+        Saves the graph in the compact binary format to a file
+        @param file_name: The path to the out file
+        @return: True if the save was successful, False o.w.
+        """
+        try:
+            BinaryGraphFormat.save(self.get_graph(), file_name)
             return True
         except:
             traceback.print_exc()
         return False
 
-    def shortest_path(self, id1: int, id2: int) -> (float, list):
+    def shortest_path(self, id1: int, id2: int, strategy: str = SHORTEST_PATH_DIJKSTRA,
+                      stats: dict = None) -> (float, list):
         """
         Returns the shortest path from node id1 to node id2 using Dijkstra's Algorithm
         @param id1: The start node id
         @param id2: The end node id
+        @param strategy: SHORTEST_PATH_DIJKSTRA searches forward from id1 until id2 is settled.
+                         SHORTEST_PATH_BIDIRECTIONAL searches forward from id1 over out edges and backward from id2
+                         over in edges at the same time, until the two searches meet on a shortest path. On road like
+                         graphs it settles far fewer nodes.
+                         SHORTEST_PATH_A_STAR searches forward from id1 guided by the straight line distance to id2,
+                         settling the nodes towards id2 first. Needs every node positioned, see __get_a_star_scale,
+                         o.w. runs as SHORTEST_PATH_DIJKSTRA.
+                         SHORTEST_PATH_ALT is A* with landmark distance bounds, needs no positions. The landmark
+                         tables are built by the first such query (or by preprocess_landmarks) and again after the
+                         graph changes, see Landmarks.
+                         SHORTEST_PATH_CH answers from a contraction hierarchy, two small searches upward in it, for
+                         graphs queried many times between changes. The hierarchy is built by the first such query
+                         (or by preprocess_contraction_hierarchy) and again after the graph changes, see
+                         ContractionHierarchy.
+        @param stats: If given, 'settled' is set to the number of nodes the search settled, 0 if answered from a
+                      shortest path tree
         @return: The distance of the path, a list of the nodes ids that the path goes through
 
         Example:
@@ -93,76 +175,462 @@ class GraphAlgo(GraphAlgoInterface):
 
         Notes:
         If there is no path between id1 and id2, or one of them dose not exist the function returns (float('inf'),[])
+        The graph is only read, so many threads may query the same graph as long as nobody changes it meanwhile.
+        All the strategies give the same distance, when several paths are shortest they may pick different ones.
+        If a shortest_path_tree of id1 is still cached for the graph as it is, the path comes from the tree, whatever
+        the strategy.
         More info:
         https://en.wikipedia.org/wiki/Dijkstra's_algorithm
+        https://en.wikipedia.org/wiki/Bidirectional_search
+        https://en.wikipedia.org/wiki/A*_search_algorithm
+        https://en.wikipedia.org/wiki/Contraction_hierarchies
         """
+        if strategy not in (self.SHORTEST_PATH_DIJKSTRA, self.SHORTEST_PATH_BIDIRECTIONAL, self.SHORTEST_PATH_A_STAR,
+                            self.SHORTEST_PATH_ALT, self.SHORTEST_PATH_CH):
+            raise ValueError("Unknown shortest path strategy {}.".format(strategy))
 
-        for n in self.get_graph().get_all_v().values():
-            n.tag = self.__STATUS_NODE_NOT_VISITED
+        self.__ensure_fresh_graph()
+
+        nodes = self.get_graph().get_all_v()
+        if id1 not in nodes or id2 not in nodes:
+            if stats is not None:
+                stats['settled'] = 0
+            return float('inf'), []
+
+        tree = self.__get_cached_path_tree(id1)
+        if tree is not None:
+            if stats is not None:
+                stats['settled'] = 0
+            return tree.distance_to(id2), tree.path_to(id2)
+
+        if strategy == self.SHORTEST_PATH_BIDIRECTIONAL:
+            return self.__bidirectional_dijkstra(id1, id2, stats)
+        if strategy == self.SHORTEST_PATH_A_STAR:
+            return self.__a_star(id1, id2, stats)
+        if strategy == self.SHORTEST_PATH_ALT:
+            return self.__alt(id1, id2, stats)
+        if strategy == self.SHORTEST_PATH_CH:
+            return self.__get_contraction_hierarchy().query(id1, id2, stats)
+        if isinstance(self.get_graph(), CSRGraph):
+            return self.__csr_dijkstra(id1, id2, stats)
+        return self.__dijkstra(id1, id2, stats)
+
+    def shortest_path_tree(self, src: int) -> ShortestPathTree:
+        """
+        Returns the shortest paths from node src to every node, one Dijkstra run over the whole graph.
+        The trees of the last few sources are kept until the graph changes, asking again for one of them costs
+        nothing, and shortest_path from src answers from it.
+        @param src: The start node id
+        @return: The tree, distance_to(id) in O(1) and path_to(id) in O(path length), see ShortestPathTree
+
+        Notes:
+        Raises ValueError if src is not in the graph.
+        """
+        self.__ensure_fresh_graph()
+        tree = self.__get_cached_path_tree(src)
+        if tree is not None:
+            return tree
+
+        nodes, trees = self.__cached('path_trees', lambda g: (ShortestPathTree.node_index(g), OrderedDict()))
+        tree = ShortestPathTree.build(self.get_graph(), src, nodes)
+        trees[src] = tree
+        while len(trees) > self.__SHORTEST_PATH_TREE_CACHE_SIZE:
+            trees.popitem(last=False)
+        return tree
+
+    def __get_cached_path_tree(self, src: int) -> Optional[ShortestPathTree]:
+        '''
+        :return: The kept shortest path tree of src, made the most recently used, None if there is none for the graph
+                 as it is.
+        '''
+        cache = self.__cached('path_trees')
+        if cache is None:
+            return None
+
+        trees = cache[1]
+        tree = trees.pop(src, None)
+        if tree is not None:
+            trees[src] = tree
+        return tree
+
+    def __dijkstra(self, src: int, dest: int, stats: Optional[dict]) -> (float, list):
+        # All the query state is local, the graph and its nodes are never written to.
+        distances: Dict[int, float] = {src: 0.0}
+        predecessors: Dict[int, int] = {}
+        settled: Set[int] = set()
+        pq: List[Tuple[float, int]] = [(0.0, src)]
+
+        while pq:
+            node_distance, node_id = heappop(pq)
+
+            # A shorter distance was already found for this node, the entry is stale.
+            if node_id in settled:
+                continue
+            settled.add(node_id)
+
+            # Distance of the target is final once it is settled.
+            if node_id == dest:
+                break
+
+            # Traverse neighbours
+            for neighbour_id, weight in self.get_graph().out_neighbours(node_id):
+                if neighbour_id in settled:
+                    continue
 
-        src = id1
-        dest = id2
+                new_neighbour_distance = node_distance + weight
 
-        distances: Dict[int, float] = {}
-        pq: [Node] = []
-        visited_nodes: [Node] = []
+                # Found a shorter distance, update the map.
+                if new_neighbour_distance < distances.get(neighbour_id, float("inf")):
+                    distances[neighbour_id] = new_neighbour_distance
+                    predecessors[neighbour_id] = node_id
+                    heappush(pq, (new_neighbour_distance, neighbour_id))
 
-        actual_distance = float(('inf'))
-        actual_path = []
+        if stats is not None:
+            stats['settled'] = len(settled)
 
-        heappush(pq, (0.0, self.get_graph().get_all_v().get(src)))
-        distances[src] = 0.0
+        if dest not in settled:
+            return float('inf'), []
 
-        needed_node: Node = None
+        return distances.get(dest), self.__backtrack_path(src, dest, predecessors)
 
-        while (len(pq) > 0):
-            node_distance, node = heappop(pq)
-            visited_nodes.append(node) # Save node for cleaning up
+    def __csr_dijkstra(self, src: int, dest: int, stats: Optional[dict]) -> (float, list):
+        '''
+        __dijkstra on a CSRGraph, straight over its arrays by node index, no key lookups and no neighbour tuples.
+        '''
+        g: CSRGraph = self.get_graph()
+        offsets = g.out_offsets
+        dests = g.out_dests
+        weights = g.out_weights
+        s = g.index_of(src)
+        t = g.index_of(dest)
+
+        n = g.v_size()
+        distances = array('d', [float('inf')]) * n
+        predecessors = array('q', [-1]) * n
+        settled = bytearray(n)
+        settled_count = 0
+        distances[s] = 0.0
+        pq: List[Tuple[float, int]] = [(0.0, s)]
+
+        while pq:
+            node_distance, i = heappop(pq)
+            if settled[i]:
+                continue
+            settled[i] = 1
+            settled_count += 1
+            if i == t:
+                break
+
+            for e in range(offsets[i], offsets[i + 1]):
+                j = dests[e]
+                new_neighbour_distance = node_distance + weights[e]
+                if not settled[j] and new_neighbour_distance < distances[j]:
+                    distances[j] = new_neighbour_distance
+                    predecessors[j] = i
+                    heappush(pq, (new_neighbour_distance, j))
+
+        if stats is not None:
+            stats['settled'] = settled_count
+
+        if not settled[t]:
+            return float('inf'), []
+
+        keys = g.keys
+        path: List[int] = []
+        i = t
+        while i != -1:
+            path.append(keys[i])
+            i = predecessors[i]
+        path.reverse()
+        return distances[t], path
+
+    def __bidirectional_dijkstra(self, src: int, dest: int, stats: Optional[dict]) -> (float, list):
+        '''
+        Dijkstra from both ends, side 0 forward from src over out edges, side 1 backward from dest over in edges.
+        The side with the smaller queue head moves. Every time a node gets a shorter distance on one side while the
+        other side reached it too, the path through it is a candidate. Once the two queue heads add up to at least
+        the best candidate no shorter path can be left, the candidate is the shortest path.
+        '''
+        g = self.get_graph()
+        distances: Tuple[Dict[int, float], Dict[int, float]] = ({src: 0.0}, {dest: 0.0})
+        predecessors: Tuple[Dict[int, int], Dict[int, int]] = ({}, {})
+        settled: Tuple[Set[int], Set[int]] = (set(), set())
+        queues: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([(0.0, src)], [(0.0, dest)])
+        neighbours = (g.out_neighbours, g.in_neighbours)
 
-            node.tag = self.__STATUS_NODE_VISITED
-            needed_node = node if node.key == dest else needed_node
+        best = 0.0 if src == dest else float('inf')
+        meeting: Optional[int] = src if src == dest else None
 
-            # Traverse neighbours
-            for neighbour_id, weight in self.get_graph().all_out_edges_of_node(node.key).items():
-                neighbour: Node = self.get_graph().get_all_v().get(neighbour_id)
-                if neighbour.tag == self.__STATUS_NODE_VISITED:
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            node_distance, node_id = heappop(queues[side])
+
+            if node_id in settled[side]:
+                continue
+            settled[side].add(node_id)
+
+            side_distances = distances[side]
+            other_distances = distances[1 - side]
+            for neighbour_id, weight in neighbours[side](node_id):
+                if neighbour_id in settled[side]:
                     continue
 
-                new_neighbour_distance = distances.get(node.key) + weight
+                new_neighbour_distance = node_distance + weight
+                if new_neighbour_distance < side_distances.get(neighbour_id, float("inf")):
+                    side_distances[neighbour_id] = new_neighbour_distance
+                    predecessors[side][neighbour_id] = node_id
+                    heappush(queues[side], (new_neighbour_distance, neighbour_id))
 
-                # Found a shorter distance, update the map.
+                    # The other side reached the neighbour too, a path goes through it.
+                    other_distance = other_distances.get(neighbour_id)
+                    if other_distance is not None and new_neighbour_distance + other_distance < best:
+                        best = new_neighbour_distance + other_distance
+                        meeting = neighbour_id
+
+        if stats is not None:
+            stats['settled'] = len(settled[0]) + len(settled[1])
+
+        if meeting is None:
+            return float('inf'), []
+
+        # src .. meeting by the forward predecessors, then meeting .. dest by the backward ones.
+        path = self.__backtrack_path(src, meeting, predecessors[0])
+        node_id = meeting
+        while node_id != dest:
+            node_id = predecessors[1][node_id]
+            path.append(node_id)
+
+        return best, path
+
+    def __a_star(self, src: int, dest: int, stats: Optional[dict]) -> (float, list):
+        '''
+        A* with h(v) = scale * distance(v, dest), consistent, see __get_a_star_scale.
+        '''
+        nodes = self.get_graph().get_all_v()
+        scale = self.__get_a_star_scale()
+        target = nodes[dest].geo_location
+        if scale is None or target is None:
+            return self.__dijkstra(src, dest, stats)
+
+        target_x, target_y, target_z = target.x, target.y, target.z
+
+        def estimate(node_id: int) -> float:
+            geo = nodes[node_id].geo_location
+            dx = geo.x - target_x
+            dy = geo.y - target_y
+            dz = geo.z - target_z
+            return scale * math.sqrt(dx * dx + dy * dy + dz * dz)
+
+        return self.__goal_directed(src, dest, lambda node_ids: [estimate(node_id) for node_id in node_ids], stats)
+
+    def __alt(self, src: int, dest: int, stats: Optional[dict]) -> (float, list):
+        '''
+        A* with the landmark heuristic, see Landmarks.
+        '''
+        return self.__goal_directed(src, dest, self.__get_landmarks().estimator(dest), stats)
+
+    def __goal_directed(self, src: int, dest: int, estimate: Callable[[List[int]], List[float]],
+                        stats: Optional[dict]) -> (float, list):
+        '''
+        A*, Dijkstra ordered by distance plus estimate. The estimate must be consistent, then like Dijkstra a settled
+        node is final and the search stops once dest is settled.
+        :param estimate: Lower bounds of the distances from nodes to dest, inf if a node cannot reach dest. Asked
+                         for the new neighbours of a settled node together.
+        '''
+        source_estimate = estimate([src])[0]
+        distances: Dict[int, float] = {src: 0.0}
+        predecessors: Dict[int, int] = {}
+        settled: Set[int] = set()
+        pq: List[Tuple[float, int]] = [(source_estimate, src)] if source_estimate != float('inf') else []
+        # h of every node reached, computed once.
+        estimates: Dict[int, float] = {}
+
+        while pq:
+            _, node_id = heappop(pq)
+
+            if node_id in settled:
+                continue
+            settled.add(node_id)
+
+            if node_id == dest:
+                break
+
+            node_distance = distances[node_id]
+            improved: List[int] = []
+            for neighbour_id, weight in self.get_graph().out_neighbours(node_id):
+                if neighbour_id in settled:
+                    continue
+
+                new_neighbour_distance = node_distance + weight
                 if new_neighbour_distance < distances.get(neighbour_id, float("inf")):
                     distances[neighbour_id] = new_neighbour_distance
-                    heappush(pq, (new_neighbour_distance, neighbour))
-                    neighbour.tag = self.__STATUS_NODE_QUEUED
-                    neighbour.info = "{}".format(node.key)
+                    predecessors[neighbour_id] = node_id
+                    improved.append(neighbour_id)
 
-        if needed_node:
-            actual_distance = distances.get(dest)
-            actual_path = self.__backtrack_path(src, needed_node)
+            unknown = [neighbour_id for neighbour_id in improved if neighbour_id not in estimates]
+            if unknown:
+                estimates.update(zip(unknown, estimate(unknown)))
 
-        # Restore previous state.
-        for n in visited_nodes:
-            n.tag = self.__STATUS_NODE_NOT_VISITED
+            for neighbour_id in improved:
+                neighbour_estimate = estimates[neighbour_id]
+                # dest is out of reach from there.
+                if neighbour_estimate != float('inf'):
+                    heappush(pq, (distances[neighbour_id] + neighbour_estimate, neighbour_id))
+
+        if stats is not None:
+            stats['settled'] = len(settled)
+
+        if dest not in settled:
+            return float('inf'), []
+
+        return distances[dest], self.__backtrack_path(src, dest, predecessors)
+
+    def __get_a_star_scale(self) -> Optional[float]:
+        '''
+        The A* heuristic scale, the smallest weight / distance ratio over the edges. Any path from v to dest weighs
+        at least scale times its length, which is at least scale * distance(v, dest), so the heuristic never
+        overestimates, and by the triangle inequality it is consistent.
+        That only holds when every node has a position, an edge through a node without one could be cheaper than
+        its ends are apart. Computed again when the graph changes or a node is given a position, see
+        Node.position_version.
+        :return: The scale, None if some node has no position or no edge has a length.
+        '''
+        # Moving a node leaves the MC as is.
+        return self.__cached('a_star_scale', self.__compute_a_star_scale,
+                             (self.get_graph().get_mc(), Node.position_version()))
+
+    def __compute_a_star_scale(self, g: GraphInterface) -> Optional[float]:
+        nodes = g.get_all_v()
+        scale: Optional[float] = None
+        if all(n.geo_location is not None for n in nodes.values()):
+            ratio = float('inf')
+            for node_id, n in nodes.items():
+                geo = n.geo_location
+                for other_node_id, weight in g.out_neighbours(node_id):
+                    distance = geo.distance(nodes[other_node_id].geo_location)
+                    if distance > 0 and weight / distance < ratio:
+                        ratio = weight / distance
+
+            if ratio != float('inf'):
+                scale = max(ratio, 0.0) * self.__A_STAR_SCALE_SAFETY
+        return scale
+
+    def preprocess_landmarks(self, count: int = None) -> List[int]:
+        """
+        Builds the landmark tables of SHORTEST_PATH_ALT now instead of on the first query.
+        @param count: Number of landmarks, also used when the tables are rebuilt. Landmarks.DEFAULT_COUNT if None.
+                      More landmarks make tighter bounds but cost 2 full Dijkstra runs each
+        @return: The landmark node ids
+        """
+        self.__ensure_fresh_graph()
+        self.__landmark_count = count
+        self.__caches.pop('landmarks', None)
+        return self.__get_landmarks().landmarks
 
-        return (actual_distance, actual_path)
+    def __save_landmarks(self, file_name: str):
+        '''
+        Saves the landmark tables if they match the graph, o.w. removes tables of an older graph at file_name.
+        '''
+        landmarks = self.__cached('landmarks')
+        if landmarks is not None:
+            landmarks.save(file_name)
+        elif os.path.exists(file_name):
+            os.remove(file_name)
+
+    def __load_landmarks(self, file_name: str):
+        '''
+        Loads the landmark tables at file_name if there are and they match the graph, they are not needed otherwise.
+        '''
+        self.__caches.pop('landmarks', None)
+        if not os.path.exists(file_name):
+            return
+
+        from Landmarks import Landmarks
+        try:
+            landmarks = Landmarks.load(file_name)
+        except:
+            traceback.print_exc()
+            return
 
-    def __backtrack_path(self, src: int, needed_node: Node) -> List[Node]:
+        if landmarks.is_current(self.get_graph()):
+            self.__cached('landmarks', lambda g: landmarks)
+
+    def __get_landmarks(self) -> 'Landmarks':
+        '''
+        :return: The landmark tables of the graph, built again if the graph changed since.
+        '''
+        # numpy, only loaded by the strategies that need it.
+        from Landmarks import Landmarks
+
+        count = self.__landmark_count or Landmarks.DEFAULT_COUNT
+        return self.__cached('landmarks', lambda g: Landmarks.build(g, count))
+
+    def preprocess_contraction_hierarchy(self, core_degree: float = None) -> int:
+        """
+        Builds the contraction hierarchy of SHORTEST_PATH_CH now instead of on the first query.
+        @param core_degree: Mean out degree of the nodes left uncontracted that stops the contraction, also used
+                            when the hierarchy is rebuilt. ContractionHierarchy.DEFAULT_CORE_DEGREE if None, inf
+                            contracts every node
+        @return: The number of shortcuts added
+        """
+        self.__ensure_fresh_graph()
+        self.__core_degree = core_degree
+        self.__caches.pop('contraction_hierarchy', None)
+        return self.__get_contraction_hierarchy().shortcuts
+
+    def __get_contraction_hierarchy(self) -> 'ContractionHierarchy':
+        '''
+        :return: The contraction hierarchy of the graph, built again if the graph changed since.
+        '''
+        from ContractionHierarchy import ContractionHierarchy
+
+        core_degree = self.__core_degree
+        if core_degree is None:
+            core_degree = ContractionHierarchy.DEFAULT_CORE_DEGREE
+        return self.__cached('contraction_hierarchy', lambda g: ContractionHierarchy.build(g, core_degree))
+
+    def __cached(self, name: str, build: Callable[[GraphInterface], object] = None, stamp: object = None):
+        '''
+        A value computed from the graph, kept until the graph changes.
+        :param name: Cache name, see __init__.
+        :param build: Computes the value from the graph, None to only look it up.
+        :param stamp: State of the graph the value belongs to, the MC if None.
+        :return: The value for the graph as it is, built if needed. None if there is none and build is None.
+        '''
+        g = self.get_graph()
+        if stamp is None:
+            stamp = g.get_mc()
+
+        cache = self.__caches.get(name)
+        if cache is not None and cache[0] is g and cache[1] == stamp:
+            return cache[2]
+        if build is None:
+            return None
+
+        value = build(g)
+        # Replaced as a whole, concurrent queries see either value.
+        self.__caches[name] = (g, stamp, value)
+        return value
+
+    def __backtrack_path(self, src: int, dest: int, predecessors: Dict[int, int]) -> List[int]:
         '''
         Produce a path after path building is done.
-        :param src: From node.
-        :param needed_node: To node.
+        :param src: From node id.
+        :param dest: To node id.
+        :param predecessors: Map of node id to the node id it was reached from.
         :return: list of node ids.
         '''
-        path: List[Node] = []
+        path: List[int] = [dest]
 
-        backtracking_node: Node = needed_node
-        while backtracking_node.key != src:
-            path.insert(0, backtracking_node.key)
-            if backtracking_node.info:
-                backtracking_node = self.get_graph().get_all_v().get(int(backtracking_node.info))
-        path.insert(0, backtracking_node.key)
+        backtracking_node_id = dest
+        while backtracking_node_id != src:
+            backtracking_node_id = predecessors[backtracking_node_id]
+            path.append(backtracking_node_id)
 
+        path.reverse()
         return path
 
     def connected_component(self, id1: int) -> list:
@@ -173,14 +641,25 @@ class GraphAlgo(GraphAlgoInterface):
 
         Notes:
         If the graph is None or id1 is not in the graph, the function should return an empty list []
+        A single query only explores the nodes reachable from id1, the nodes reaching id1 are found over in edges.
+        Once a second query arrives for an unchanged graph all the SCCs are computed and cached until the MC
+        changes, from then on queries are answered in O(1) plus the size of the SCC.
         """
-        self.__set_all_nodes_unvisited()
-        res = self.__tarjan(self.get_graph().get_all_v().get(id1))
-
-        for scc in res:
-            if id1 in scc:
-                return scc
-        return []
+        self.__ensure_fresh_graph()
+        g = self.get_graph()
+        if id1 not in g.get_all_v():
+            return []
+
+        cache = self.__get_scc_cache()
+        if cache is None:
+            query = (g, g.get_mc())
+            if self.__last_component_query != query:
+                self.__last_component_query = query
+                return self.__reachability_component(id1)
+            cache = self.__build_scc_cache()
+
+        _, _, sccs, node_id_to_component = cache
+        return list(sccs[node_id_to_component[id1]])
 
     def connected_components(self) -> List[list]:
         """
@@ -189,84 +668,360 @@ class GraphAlgo(GraphAlgoInterface):
 
         Notes:
         If the graph is None the function should return an empty list []
+        The result is cached until the MC of the graph changes.
         """
-        self.__set_all_nodes_unvisited()
-        res = self.__tarjan()
-        # res.reverse()
-        return res
+        self.__ensure_fresh_graph()
+        cache = self.__get_scc_cache() or self.__build_scc_cache()
+        return [list(scc) for scc in cache[2]]
 
-    def __set_all_nodes_unvisited(self):
-        for n in self.get_graph().get_all_v().values():
-            n.tag = self.__STATUS_NODE_NOT_VISITED
+    def is_strongly_connected(self, id1: int, id2: int) -> bool:
+        """
+        Checks if two nodes are in the same Strongly Connected Component(SCC).
+        @param id1: The first node id
+        @param id2: The second node id
+        @return: True if id1 and id2 reach each other, False o.w. or if one of them is not in the graph
+
+        Notes:
+        Uses the SCC cache, answered in O(1) as long as the MC of the graph does not change.
+        """
+        self.__ensure_fresh_graph()
+        cache = self.__get_scc_cache() or self.__build_scc_cache()
+        node_id_to_component = cache[3]
+
+        component_id = node_id_to_component.get(id1)
+        return component_id is not None and component_id == node_id_to_component.get(id2)
+
+    def condensation(self) -> Condensation:
+        """
+        Builds the condensation of the graph, a DAG with a node per Strongly Connected Component(SCC).
+        The DAG edges carry the minimal weight of the edges between the two SCCs.
+        @return: Condensation, the component ids are the indices of the SCCs in connected_components()
 
-    def __tarjan(self, node: Node = None):
-        components: list = []
-        node_id_to_lowlink: dict = {}
-        seen_stack: list = []
+        Notes:
+        The DAG edges are gathered in the same Tarjan pass that finds the SCCs, the SCC cache is refreshed too.
+        """
+        self.__ensure_fresh_graph()
+        g = self.get_graph()
+        mc = g.get_mc()
 
-        self.__counter_lowlink: int = 0
+        dag_edges: Dict[int, Dict[int, float]] = {}
+        sccs, node_id_to_component = self.__tarjan(dag_edges)
+        self.__scc_cache = (g, mc, sccs, node_id_to_component)
 
-        run_on_nodes = [node] if node else self.get_graph().get_all_v().values()
+        dag = DiGraph()
+        for component_id in range(len(sccs)):
+            dag.add_node(component_id)
+        for component_id, component_edges in dag_edges.items():
+            for other_component_id, weight in component_edges.items():
+                dag.add_edge(component_id, other_component_id, weight)
 
-        for n in run_on_nodes:
-            if n.tag == self.__STATUS_NODE_NOT_VISITED:
-                self.__tarjan_DFS(node=n,
-                                  components=components,
-                                  node_id_to_lowlink=node_id_to_lowlink,
-                                  seen_stack=seen_stack)
+        return Condensation(dag, [list(scc) for scc in sccs], dict(node_id_to_component))
 
-        return components
+    def __get_scc_cache(self) -> Tuple[GraphInterface, int, List[List[int]], Dict[int, int]]:
+        '''
+        :return: The SCC cache if it was computed for the current graph and MC, None o.w.
+        '''
+        cache = self.__scc_cache
+        g = self.get_graph()
+        if cache is not None and cache[0] is g and cache[1] == g.get_mc():
+            return cache
+        return None
 
-    def __next_lowlink_val(self) -> int:
+    def __build_scc_cache(self) -> Tuple[GraphInterface, int, List[List[int]], Dict[int, int]]:
         '''
-        Incr next lowlink val.
-        :return:
+        Runs Tarjan and indexes each node to its SCC.
+        :return: The new SCC cache.
         '''
-        res = self.__counter_lowlink
-        self.__counter_lowlink += 1
-        return res
+        g = self.get_graph()
+        mc = g.get_mc()
+        sccs, node_id_to_component = self.__tarjan()
 
-    def __tarjan_DFS(self, node: Node, components: list, node_id_to_lowlink: dict,
-                     seen_stack: list):
-        node.tag = self.__STATUS_NODE_VISITED
-        seen_stack.append(node.key)
-        node_id_to_lowlink[node.key] = self.__next_lowlink_val()
+        cache = (g, mc, sccs, node_id_to_component)
+        self.__scc_cache = cache
+        return cache
 
-        is_root: bool = True
+    def __reachability_component(self, id1: int) -> List[int]:
+        '''
+        The SCC of a node is the intersection of the nodes it reaches and the nodes reaching it.
+        Only the part of the graph reachable from id1 is explored, the backward search (over in edges)
+        is limited to the forward reachable nodes.
+        :param id1: Node id.
+        :return: The SCC, in DFS discovery order from id1.
+        '''
+        g = self.get_graph()
+
+        # Forward DFS, nodes are kept in discovery order.
+        forward_order: List[int] = [id1]
+        forward: Set[int] = {id1}
+        dfs_stack = [g.out_neighbours(id1)]
+
+        while dfs_stack:
+            for neighbour_id, _ in dfs_stack[-1]:
+                if neighbour_id not in forward:
+                    forward.add(neighbour_id)
+                    forward_order.append(neighbour_id)
+                    dfs_stack.append(g.out_neighbours(neighbour_id))
+                    break
+            else:
+                dfs_stack.pop()
 
-        for neighbour_id, weight in self.get_graph().all_out_edges_of_node(node.key).items():
-            neighbour: Node = self.get_graph().get_all_v().get(neighbour_id)
+        # Backward search within the forward reachable nodes.
+        backward: Set[int] = {id1}
+        queue = [id1]
 
-            # Traverse neighbours
-            if neighbour.tag == self.__STATUS_NODE_NOT_VISITED:
-                self.__tarjan_DFS(neighbour, components, node_id_to_lowlink, seen_stack)
-
-            # Check lowlink
-            my_low_link = node_id_to_lowlink.get(node.key)
-            neighbour_low_link = node_id_to_lowlink.get(neighbour_id)
-
-            if neighbour_id in seen_stack and neighbour_low_link < my_low_link:
-                node_id_to_lowlink[node.key] = neighbour_low_link
-                is_root = False
-
-        if is_root:
-            scc = []
-            while True:
-                node_id = seen_stack.pop()
-                scc.append(node_id)
-                node_id_to_lowlink[node_id] = node_id_to_lowlink[node.key]
-                if node_id == node.key:
-                    break
+        while queue:
+            node_id = queue.pop()
+            for neighbour_id, _ in g.in_neighbours(node_id):
+                if neighbour_id in forward and neighbour_id not in backward:
+                    backward.add(neighbour_id)
+                    queue.append(neighbour_id)
 
-            scc.reverse()
-            components.append(scc)
+        return [node_id for node_id in forward_order if node_id in backward]
 
-    def set_missing_positions(self):
+    def __ensure_fresh_graph(self):
         '''
-        Set missing positions for node by a growing spiral and radius. Takes into account if other node are place in
-        the radius too.
+        Algorithms may run directly on a CSRGraph snapshot, make sure it still reflects its source graph.
         :return: None
         '''
+        g = self.get_graph()
+        if isinstance(g, CSRGraph) and g.is_stale():
+            raise ValueError("Graph snapshot is stale, freeze the graph again.")
+
+    def __set_all_nodes_unvisited(self):
+        for n in self.get_graph().get_all_v().values():
+            n.tag = self.__STATUS_NODE_NOT_VISITED
+
+    def __tarjan(self, dag_edges: Dict[int, Dict[int, float]] = None) -> Tuple[List[List[int]], Dict[int, int]]:
+        '''
+        Tarjan's SCC algorithm with an explicit DFS stack, deep graphs do not depend on the recursion limit.
+        :param dag_edges: If given, filled in the same pass with the condensation DAG edges
+                          {component id: {other component id: min edge weight}}.
+        :return: List of SCCs in the order they were completed (component id is the index) and node id to component id.
+        '''
+        g = self.get_graph()
+        if dag_edges is None and isinstance(g, CSRGraph):
+            return self.__csr_tarjan(g)
+
+        components: List[List[int]] = []
+        node_id_to_lowlink: Dict[int, int] = {}
+        node_id_to_component: Dict[int, int] = {}
+        seen_stack: List[int] = []
+        on_stack: Set[int] = set()
+        # Edges into already completed SCCs, kept per source node until the SCC of the source completes.
+        outgoing: Dict[int, List[Tuple[int, float]]] = {} if dag_edges is not None else None
+        counter_lowlink = 0
+
+        for root_id in g.get_all_v().keys():
+            if root_id in node_id_to_lowlink:
+                continue
+
+            node_id_to_lowlink[root_id] = counter_lowlink
+            counter_lowlink += 1
+            seen_stack.append(root_id)
+            on_stack.add(root_id)
+
+            # Frames of [node id, neighbours iterator, is root, weight of the edge to the child being visited].
+            dfs_stack: list = [[root_id, g.out_neighbours(root_id), True, None]]
+
+            while dfs_stack:
+                frame = dfs_stack[-1]
+                node_id = frame[0]
+
+                descended = False
+                for neighbour_id, weight in frame[1]:
+                    # Traverse neighbours, the edge is checked once the neighbour is done.
+                    if neighbour_id not in node_id_to_lowlink:
+                        node_id_to_lowlink[neighbour_id] = counter_lowlink
+                        counter_lowlink += 1
+                        seen_stack.append(neighbour_id)
+                        on_stack.add(neighbour_id)
+                        frame[3] = weight
+                        dfs_stack.append([neighbour_id, g.out_neighbours(neighbour_id), True, None])
+                        descended = True
+                        break
+
+                    self.__check_tarjan_edge(frame, neighbour_id, weight, node_id_to_lowlink, on_stack,
+                                             node_id_to_component, outgoing)
+
+                if descended:
+                    continue
+
+                dfs_stack.pop()
+
+                if frame[2]:
+                    component_id = len(components)
+                    scc = []
+                    while True:
+                        popped_id = seen_stack.pop()
+                        on_stack.discard(popped_id)
+                        scc.append(popped_id)
+                        node_id_to_lowlink[popped_id] = node_id_to_lowlink[node_id]
+                        node_id_to_component[popped_id] = component_id
+                        if popped_id == node_id:
+                            break
+
+                    scc.reverse()
+                    components.append(scc)
+
+                    if outgoing is not None:
+                        # Every edge leaving this SCC goes to an SCC completed before it.
+                        component_edges = dag_edges.setdefault(component_id, {})
+                        for member_id in scc:
+                            for other_component_id, weight in outgoing.pop(member_id, ()):
+                                if weight < component_edges.get(other_component_id, float('inf')):
+                                    component_edges[other_component_id] = weight
+
+                if dfs_stack:
+                    parent_frame = dfs_stack[-1]
+                    self.__check_tarjan_edge(parent_frame, node_id, parent_frame[3], node_id_to_lowlink, on_stack,
+                                             node_id_to_component, outgoing)
+
+        return components, node_id_to_component
+
+    @staticmethod
+    def __csr_tarjan(g: CSRGraph) -> Tuple[List[List[int]], Dict[int, int]]:
+        '''
+        __tarjan on a CSRGraph, straight over its arrays by node index. Same DFS order, so the same SCCs in the same
+        order.
+        '''
+        offsets = g.out_offsets
+        dests = g.out_dests
+        keys = g.keys
+        n = g.v_size()
+
+        components: List[List[int]] = []
+        # -1 until the node is discovered.
+        lowlink = array('q', [-1]) * n
+        component = array('q', [-1]) * n
+        on_stack = bytearray(n)
+        seen_stack: List[int] = []
+        counter_lowlink = 0
+
+        for root in range(n):
+            if lowlink[root] != -1:
+                continue
+
+            lowlink[root] = counter_lowlink
+            counter_lowlink += 1
+            seen_stack.append(root)
+            on_stack[root] = 1
+
+            # Frames of [node index, position of the next out edge, is root].
+            dfs_stack: list = [[root, offsets[root], True]]
+
+            while dfs_stack:
+                frame = dfs_stack[-1]
+                i = frame[0]
+                e = frame[1]
+                end = offsets[i + 1]
+
+                descended = False
+                while e < end:
+                    j = dests[e]
+                    e += 1
+                    if lowlink[j] == -1:
+                        lowlink[j] = counter_lowlink
+                        counter_lowlink += 1
+                        seen_stack.append(j)
+                        on_stack[j] = 1
+                        frame[1] = e
+                        dfs_stack.append([j, offsets[j], True])
+                        descended = True
+                        break
+
+                    if on_stack[j] and lowlink[j] < lowlink[i]:
+                        lowlink[i] = lowlink[j]
+                        frame[2] = False
+
+                if descended:
+                    continue
+
+                dfs_stack.pop()
+
+                if frame[2]:
+                    component_id = len(components)
+                    scc = []
+                    while True:
+                        popped = seen_stack.pop()
+                        on_stack[popped] = 0
+                        scc.append(keys[popped])
+                        lowlink[popped] = lowlink[i]
+                        component[popped] = component_id
+                        if popped == i:
+                            break
+
+                    scc.reverse()
+                    components.append(scc)
+
+                if dfs_stack:
+                    parent_frame = dfs_stack[-1]
+                    parent = parent_frame[0]
+                    if on_stack[i] and lowlink[i] < lowlink[parent]:
+                        lowlink[parent] = lowlink[i]
+                        parent_frame[2] = False
+
+        return components, {key: component_id for key, component_id in zip(keys, component)}
+
+    @staticmethod
+    def __check_tarjan_edge(frame: list, neighbour_id: int, weight: float, node_id_to_lowlink: Dict[int, int],
+                            on_stack: Set[int], node_id_to_component: Dict[int, int],
+                            outgoing: Dict[int, List[Tuple[int, float]]]):
+        '''
+        Check lowlink of a DFS frame against one of its visited neighbours.
+        :param frame: [node id, neighbours iterator, is root, child edge weight]
+        :param neighbour_id: Neighbour node id.
+        :param weight: Weight of the edge to the neighbour.
+        :param node_id_to_lowlink: Lowlink values.
+        :param on_stack: Node ids currently on the Tarjan stack.
+        :param node_id_to_component: Component ids of the completed SCCs.
+        :param outgoing: Edges into completed SCCs per source node, None if not collected.
+        :return: None
+        '''
+        if neighbour_id in on_stack:
+            if node_id_to_lowlink[neighbour_id] < node_id_to_lowlink[frame[0]]:
+                node_id_to_lowlink[frame[0]] = node_id_to_lowlink[neighbour_id]
+                frame[2] = False
+        elif outgoing is not None:
+            outgoing.setdefault(frame[0], []).append((node_id_to_component[neighbour_id], weight))
+
+    def set_missing_positions(self, layout: str = LAYOUT_SPIRAL, iterations: int = None):
+        '''
+        Set missing positions for nodes, nodes that have a position keep it.
+        :param layout: LAYOUT_SPIRAL places the neighbours of every node on a growing spiral and radius, taking into
+                       account other nodes placed in the radius. LAYOUT_FORCE_DIRECTED runs a force directed layout
+                       (ForceDirectedLayout) where the positioned nodes are pinned.
+        :param iterations: Iteration budget of LAYOUT_FORCE_DIRECTED, ForceDirectedLayout.DEFAULT_ITERATIONS if None.
+        :return: None
+        '''
+        if layout not in (self.LAYOUT_SPIRAL, self.LAYOUT_FORCE_DIRECTED):
+            raise ValueError("Unknown layout {}.".format(layout))
+
+        # Rendering calls this every time, keep it cheap once every node has a position.
+        if not self.__has_missing_positions():
+            return
+
+        if layout == self.LAYOUT_SPIRAL:
+            self.__set_missing_positions_spiral()
+        elif layout == self.LAYOUT_FORCE_DIRECTED:
+            from ForceDirectedLayout import ForceDirectedLayout
+
+            if iterations is None:
+                iterations = ForceDirectedLayout.DEFAULT_ITERATIONS
+            ForceDirectedLayout(self.get_graph(), iterations).run()
+
+    def __has_missing_positions(self) -> bool:
+        '''
+        :return: True if a node of the graph has no position.
+        '''
+        positions = self.__position_store()
+        if positions is not None:
+            return len(positions.positioned_xy()) < self.get_graph().v_size()
+        return any(n.geo_location is None for n in self.get_graph().get_all_v().values())
+
+    def __set_missing_positions_spiral(self):
+        # Neighbour positioning below is recursive.
+        sys.setrecursionlimit(99999999)
+
         nodes = self.get_graph().get_all_v()
         self.__set_all_nodes_unvisited()
 
@@ -274,6 +1029,13 @@ class GraphAlgo(GraphAlgoInterface):
         initial_world_range = self.__get_current_world_range()
         spiral_scc_factor = 1
 
+        # Placed nodes are indexed by position, a free position check only looks at the cells around the candidate.
+        free_radius = initial_world_range.x_range.length / self.__NUM_NODES_IN_X_AXIS / self.__RADIUS_EPS_DIVIDER
+        placed = SpatialGrid(free_radius if free_radius > 0 else 1)
+        for node in nodes.values():
+            if node.geo_location:
+                placed.add(node.key, node.geo_location)
+
         sccs = self.connected_components()
         self.__set_all_nodes_unvisited()
 
@@ -295,28 +1057,32 @@ class GraphAlgo(GraphAlgoInterface):
 
             for node_id in scc:
                 node: Node = nodes.get(node_id)
-                self.__position_neighbours(node, starting_location, initial_world_range)
+                self.__position_neighbours(node, starting_location, initial_world_range, placed)
 
-    def __is_position_free(self, geo, neigh: Node, init_r: float):
+    def __is_position_free(self, geo, init_r: float, placed: SpatialGrid):
         '''
         Check if position is ok for node to be place in.
         :param geo: GeoLocation point.
-        :param neigh: Node.
         :param init_r: Initial radius.
+        :param placed: Index of the positioned nodes.
         :return: True if ok else False.
         '''
-        for n in self.get_graph().get_all_v().values():
-            if n.geo_location:
-                if geo.distance(n.geo_location) <= init_r / self.__RADIUS_EPS_DIVIDER:
-                    return False
-        return True
+        return not placed.any_within(geo, init_r / self.__RADIUS_EPS_DIVIDER)
+
+    def __position_store(self):
+        '''
+        :return: The PositionStore of the graph, None if it does not keep one.
+        '''
+        return getattr(self.get_graph(), 'position_store', None)
 
-    def __position_neighbours(self, node: Node, starting_point: GeoLocation, initial_world_range: Range2D, angle=0):
+    def __position_neighbours(self, node: Node, starting_point: GeoLocation, initial_world_range: Range2D,
+                              placed: SpatialGrid, angle=0):
         '''
         Position neighbours by finding them a free location in a growing circle.
         :param node: Starting node.
         :param starting_point:  Starting GeoLocation.
         :param initial_world_range: Initial x a y ranges for world.
+        :param placed: Index of the positioned nodes, updated with every node placed.
         :param angle: Starting angle.
         :return: None
         '''
@@ -325,9 +1091,10 @@ class GraphAlgo(GraphAlgoInterface):
 
             if not node.geo_location:
                 node.geo_location = starting_point
+                placed.add(node.key, node.geo_location)
 
             actual_angle = angle
-            for neighbour_id in self.get_graph().all_out_edges_of_node(node.key).keys():
+            for neighbour_id, _ in self.get_graph().out_neighbours(node.key):
                 init_r = initial_world_range.x_range.length / self.__NUM_NODES_IN_X_AXIS
                 r = init_r
                 neigh = self.get_graph().get_all_v().get(neighbour_id)
@@ -344,36 +1111,18 @@ class GraphAlgo(GraphAlgoInterface):
                             newy = node.geo_location.y + r * math.sin(actual_angle)
 
                             new_location = GeoLocation(newx, newy, 0)
-                            if self.__is_position_free(new_location, neigh, init_r):
+                            if self.__is_position_free(new_location, init_r, placed):
                                 neigh.geo_location = new_location
+                                placed.add(neigh.key, neigh.geo_location)
                                 new_location_found = True
                                 break
                         r = r * self.__SEARCH_RADIUS_MULTIPLIER
-                    self.__position_neighbours(neigh, neigh.geo_location, initial_world_range, actual_angle)
+                    self.__position_neighbours(neigh, neigh.geo_location, initial_world_range, placed, actual_angle)
 
     def __get_current_world_range(self) -> Range2D:
-        min_x = None
-        max_x = None
-        min_y = None
-        max_y = None
-
-        for node in self.get_graph().get_all_v().values():
-            if node.geo_location:
-                if min_x is None:
-                    min_x = node.geo_location.x
-                    max_x = min_x
-                    min_y = node.geo_location.y
-                    max_y = min_y
-                else:
-                    if node.geo_location.x < min_x:
-                        min_x = node.geo_location.x
-                    if node.geo_location.x > max_x:
-                        max_x = node.geo_location.x
-
-                    if node.geo_location.y < min_y:
-                        min_y = node.geo_location.y
-                    if node.geo_location.y > max_y:
-                        max_y = node.geo_location.y
+        positions = self.__position_store()
+        bounds = positions.bounds() if positions is not None else self.__get_positioned_bounds()
+        min_x, max_x, min_y, max_y = bounds if bounds is not None else (None, None, None, None)
 
         if min_x is None:
             min_x = 0
@@ -391,52 +1140,86 @@ class GraphAlgo(GraphAlgoInterface):
 
         return Range2D(Range(min_x, max_x), Range(min_y, max_y))
 
-    def plot_graph(self) -> None:
-        self.set_missing_positions()
+    def __get_positioned_bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        '''
+        Bounds of a graph without a PositionStore, see PositionStore.bounds for the vectorized ones.
+        :return: (min x, max x, min y, max y) over the positioned nodes, None if there are none.
+        '''
+        xs = []
+        ys = []
+        for node in self.get_graph().get_all_v().values():
+            geo = node.geo_location
+            if geo:
+                xs.append(geo.x)
+                ys.append(geo.y)
+
+        if not xs:
+            return None
+        return min(xs), max(xs), min(ys), max(ys)
+
+    def plot_graph(self, layout: str = LAYOUT_SPIRAL, iterations: int = None, render_mode: str = None) -> None:
         """
         Plots the graph.
         If the nodes have a position, the nodes will be placed there.
         Otherwise, they will be placed in a random but elegant manner.
+        @param layout: How missing positions are set, see set_missing_positions
+        @param iterations: Iteration budget of the force directed layout, see set_missing_positions
+        @param render_mode: GraphPlotter render mode, GraphPlotter.RENDER_AUTO if None (batched for big graphs)
         @return: None
         """
+        self.__get_plotter(render_mode, layout, iterations).plot()
 
-        xs = []
-        ys = []
-
-        nodes = self.get_graph().get_all_v()
-
-        for n in nodes.values():
-            if not n.geo_location:
-                continue
-
-            xs.append(n.geo_location.x)
-            ys.append(n.geo_location.y)
+    def render_graph(self, file_name: str = None, fmt: str = None, figsize: Tuple[float, float] = None,
+                     dpi: float = None, region: Range2D = None, layout: str = LAYOUT_SPIRAL, iterations: int = None,
+                     render_mode: str = None) -> Optional[bytes]:
+        """
+        Draws the graph off screen (Agg backend), to an image file or to bytes. Needs no display and never blocks.
+        @param file_name: Image file to write, None to get the image as bytes
+        @param fmt: Image format ('png', 'svg'...), from the file extension if None, png if there is none
+        @param figsize: Figure width and height in inches, GraphPlotter.DEFAULT_FIGSIZE if None
+        @param dpi: Dots per inch, GraphPlotter.DEFAULT_DPI if None
+        @param region: Part of the plane shown, only the nodes and edges in it are drawn. The whole graph if None
+        @param layout: How missing positions are set, see set_missing_positions
+        @param iterations: Iteration budget of the force directed layout, see set_missing_positions
+        @param render_mode: GraphPlotter render mode, GraphPlotter.RENDER_AUTO if None
+        @return: The image as bytes if file_name is None, else None
+        """
+        plotter = self.__get_plotter(render_mode, layout, iterations)
+        return plotter.render(file_name, fmt, figsize or plotter.DEFAULT_FIGSIZE, dpi or plotter.DEFAULT_DPI, region)
 
-            plt.text(n.geo_location.x, n.geo_location.y, n.key,
-                     va='top',
-                     ha='right',
-                     color=self.__COLOR_TEXT,
-                     fontsize=9,
-                     bbox=dict(boxstyle='square, pad=0.2', ec='gray', fc=self.__COLOR_BOX, alpha=0.65),
-                     zorder=self.__Z_ORDER)
+    def render_tiles(self, directory: str, max_zoom: int, tile_size: int = None, fmt: str = None,
+                     layout: str = LAYOUT_SPIRAL, iterations: int = None, render_mode: str = None) -> int:
+        """
+        Writes a zoom level tile pyramid of the graph, directory/zoom/x/y.png, see GraphPlotter.render_tiles.
+        Empty tiles are skipped.
+        @param directory: Root directory of the pyramid
+        @param max_zoom: Deepest zoom level, 2^zoom x 2^zoom tiles cover the graph at a level
+        @param tile_size: Tile side in pixels, GraphPlotter.DEFAULT_TILE_SIZE if None
+        @param fmt: Image format of the tiles, GraphPlotter.DEFAULT_FORMAT if None
+        @param layout: How missing positions are set, see set_missing_positions
+        @param iterations: Iteration budget of the force directed layout, see set_missing_positions
+        @param render_mode: GraphPlotter render mode, GraphPlotter.RENDER_AUTO if None
+        @return: The number of tiles written
+        """
+        plotter = self.__get_plotter(render_mode, layout, iterations)
+        return plotter.render_tiles(directory, max_zoom, tile_size or plotter.DEFAULT_TILE_SIZE,
+                                    fmt or plotter.DEFAULT_FORMAT)
 
-            for connected_node_id in self.get_graph().all_out_edges_of_node(n.key):
-                connected_node = nodes.get(connected_node_id)
+    def __get_plotter(self, render_mode: Optional[str], layout: str, iterations: Optional[int]) -> 'GraphPlotter':
+        '''
+        Sets the missing positions, then gives the plotter. The plotter is kept between calls, it holds the spatial
+        index of the drawing so exploring the graph region by region does not index it again. The index is taken
+        again when the graph changes or a node is given a position, see GraphViewport.is_current.
+        :return: A GraphPlotter of the graph in the render mode, RENDER_AUTO if None.
+        '''
+        # matplotlib is heavy and may probe for a GUI, only load it when actually drawing.
+        from GraphPlotter import GraphPlotter
 
-                if not connected_node.geo_location:
-                    continue
+        self.set_missing_positions(layout, iterations)
 
-                x = n.geo_location.x
-                y = n.geo_location.y
-                plt.annotate("",
-                             xy=(connected_node.geo_location.x, connected_node.geo_location.y),
-                             xycoords='data',
-                             xytext=(x, y),
-                             textcoords='data',
-                             arrowprops=dict(arrowstyle="->",color='midnightblue',
-                                             connectionstyle="arc3,rad={}".format(self.__RAD_ARC)),
-                             )
-
-        plt.scatter(xs, ys, color='gray')
-        plt.draw()
-        plt.show()
+        render_mode = render_mode or GraphPlotter.RENDER_AUTO
+        cache = self.__plotter
+        if cache is None or cache[0] is not self.get_graph() or cache[1] != render_mode:
+            cache = (self.get_graph(), render_mode, GraphPlotter(self.get_graph(), render_mode))
+            self.__plotter = cache
+        return cache[2]
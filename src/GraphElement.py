@@ -0,0 +1,4 @@
+class GraphElement:
+    NODE = 'NODE'
+    EDGE = 'EDGE'
+    MODE_COUNT = 'MODE_COUNT'
@@ -1,3 +1,6 @@
+from typing import Iterator, Tuple
+
+
 class GraphInterface:
     """This abstract class represents an interface of a graph."""
 
@@ -30,6 +33,20 @@ class GraphInterface:
         (other_node_id, weight)
         """
 
+    def in_neighbours(self, id1: int) -> Iterator[Tuple[int, float]]:
+        """return an iterator over the nodes connected to (into) node_id, each node is represented using a pair
+        (other_node_id, weight). The default iterates the dictionary of all_in_edges_of_node, graphs that store
+        their edges otherwise override it.
+        """
+        return iter(self.all_in_edges_of_node(id1).items())
+
+    def out_neighbours(self, id1: int) -> Iterator[Tuple[int, float]]:
+        """return an iterator over the nodes connected from node_id, each node is represented using a pair
+        (other_node_id, weight). The default iterates the dictionary of all_out_edges_of_node, graphs that store
+        their edges otherwise override it.
+        """
+        return iter(self.all_out_edges_of_node(id1).items())
+
     def get_mc(self) -> int:
         """
         Returns the current version of this graph,
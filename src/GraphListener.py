@@ -0,0 +1,34 @@
+class GraphListener:
+    """This class represents a listener to graph mutations. Register with DiGraph.add_listener.
+    Every callback is called after the change was applied to the graph."""
+
+    def on_node_added(self, node_id: int):
+        """
+        Called after a node was added.
+        @param node_id: The node ID
+        """
+        pass
+
+    def on_node_removed(self, node_id: int):
+        """
+        Called after a node was removed, its edges were already reported through on_edge_removed.
+        @param node_id: The node ID
+        """
+        pass
+
+    def on_edge_added(self, id1: int, id2: int, weight: float):
+        """
+        Called after an edge was added.
+        @param id1: The start node of the edge
+        @param id2: The end node of the edge
+        @param weight: The weight of the edge
+        """
+        pass
+
+    def on_edge_removed(self, id1: int, id2: int):
+        """
+        Called after an edge was removed.
+        @param id1: The start node of the edge
+        @param id2: The end node of the edge
+        """
+        pass
@@ -0,0 +1,300 @@
+import io
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from GraphInterface import GraphInterface
+from GraphViewport import GraphViewport
+from location.Range import Range
+from location.Range2D import Range2D
+
+
+class GraphPlotter(object):
+    '''
+    Draws a graph with matplotlib. Kept apart from GraphAlgo so importing the algorithms never loads matplotlib.
+
+    Two render modes:
+        RENDER_DETAILED  a curved arrow annotation per edge and a boxed label per node, fine for small graphs.
+        RENDER_BATCHED   all the edges in one LineCollection (arrow heads in one quiver call) and all the nodes in one
+                         scatter, so the number of artists does not grow with the graph. Only the max_labels nodes
+                         with the highest degree get a label.
+    RENDER_AUTO picks RENDER_BATCHED from __AUTO_BATCHED_MIN_EDGES drawn edges on.
+
+    plot() shows the graph in a pyplot window, render() draws it off screen on the Agg backend to a file or to bytes,
+    without pyplot and without a display. Given a region, only the nodes and edges in it are looked up (through the
+    GraphViewport index) and drawn. render_tiles() writes a zoom level tile pyramid.
+    '''
+    RENDER_AUTO = 'auto'
+    RENDER_DETAILED = 'detailed'
+    RENDER_BATCHED = 'batched'
+
+    DEFAULT_MAX_LABELS = 100
+    DEFAULT_FIGSIZE = (12, 12)
+    DEFAULT_DPI = 100
+    DEFAULT_FORMAT = 'png'
+    DEFAULT_TILE_SIZE = 256
+
+    __RAD_ARC = 0.15
+    __Z_ORDER = 99
+    __COLOR_TEXT = 'midnightblue'
+    __COLOR_BOX = 'yellow'
+    __COLOR_NODE = 'gray'
+
+    __AUTO_BATCHED_MIN_EDGES = 500
+    # Above this many edges the batched mode draws plain lines, arrow heads would only add clutter.
+    __MAX_ARROW_HEADS = 20000
+    # Part of the edge, at its end, drawn as the arrow head.
+    __ARROW_HEAD_RATIO = 0.15
+    # Nodes this far (part of the tile side) outside a tile are drawn too, their markers and labels reach into it.
+    __TILE_MARGIN_RATIO = 0.1
+
+    # The off screen figure shared by every render() call, cleared before each use so rendering many graphs does not
+    # pile up figures. Not thread safe, use a process per worker.
+    __headless_figure: Optional[Figure] = None
+
+    def __init__(self, g: GraphInterface, mode: str = RENDER_AUTO, max_labels: int = DEFAULT_MAX_LABELS):
+        '''
+        :param g: Graph to draw, only positioned nodes and edges between positioned nodes are drawn.
+        :param mode: RENDER_AUTO, RENDER_DETAILED or RENDER_BATCHED.
+        :param max_labels: Most node labels drawn in RENDER_BATCHED, 0 for none.
+        '''
+        if mode not in (self.RENDER_AUTO, self.RENDER_DETAILED, self.RENDER_BATCHED):
+            raise ValueError("Unknown render mode {}.".format(mode))
+
+        self.__g: GraphInterface = g
+        self.__mode: str = mode
+        self.__max_labels: int = max_labels
+        self.__viewport: Optional[GraphViewport] = None
+
+    def plot(self) -> None:
+        '''
+        Draws on the current pyplot axes, then shows the figure.
+        :return: None
+        '''
+        # pyplot picks a GUI backend, only load it when actually showing.
+        import matplotlib.pyplot as plt
+
+        self.draw(plt.gca())
+        plt.draw()
+        plt.show()
+
+    def render(self, file_name: str = None, fmt: str = None, figsize: Tuple[float, float] = DEFAULT_FIGSIZE,
+               dpi: float = DEFAULT_DPI, region: Range2D = None) -> Optional[bytes]:
+        '''
+        Draws the graph off screen on the Agg backend.
+        :param file_name: File to write, None to get the image as bytes.
+        :param fmt: Image format, 'png', 'svg', 'pdf'... From the file extension if None, else DEFAULT_FORMAT.
+        :param figsize: Figure width and height in inches.
+        :param dpi: Dots per inch, the image is figsize * dpi pixels.
+        :param region: Part of the plane shown, only what is in it is drawn. Everything if None.
+        :return: The image as bytes if file_name is None, else None.
+        '''
+        if fmt is None:
+            extension = os.path.splitext(file_name)[1][1:] if file_name else ''
+            fmt = extension.lower() or self.DEFAULT_FORMAT
+
+        fig = self.__figure(figsize, dpi)
+        self.draw(fig.add_subplot(), region)
+        return self.__save(fig, file_name, fmt, dpi)
+
+    def render_tiles(self, directory: str, max_zoom: int, tile_size: int = DEFAULT_TILE_SIZE,
+                     fmt: str = DEFAULT_FORMAT, region: Range2D = None) -> int:
+        '''
+        Writes a tile pyramid of the graph, directory/zoom/x/y.fmt. Zoom 0 is one tile of the whole region, every
+        zoom level splits each tile in 4. x counts from the left, y from the top. Tiles with nothing to draw are not
+        written and their sub tiles are never looked at, so sparse areas cost nothing.
+        :param directory: Root directory of the pyramid, created if missing.
+        :param max_zoom: Deepest zoom level written.
+        :param tile_size: Side of a tile in pixels.
+        :param fmt: Image format of the tiles.
+        :param region: Area covered by zoom 0, the bounding square of the nodes if None.
+        :return: The number of tiles written.
+        '''
+        if max_zoom < 0:
+            raise ValueError("Zoom must not be negative.")
+
+        viewport = self.__get_viewport()
+        if region is None:
+            region = self.__bounding_square(viewport)
+            if region is None:
+                return 0
+
+        x_range = region.x_range
+        y_range = region.y_range
+        written = 0
+        pending = [(0, 0, 0)]
+        while pending:
+            zoom, tile_x, tile_y = pending.pop()
+            width = x_range.length / 2 ** zoom
+            height = y_range.length / 2 ** zoom
+            left = x_range.min + tile_x * width
+            top = y_range.max - tile_y * height
+            tile = Range2D(Range(left, left + width), Range(top - height, top))
+
+            nodes, edges = viewport.select(tile, max(width, height) * self.__TILE_MARGIN_RATIO)
+            if not len(nodes) and not len(edges):
+                continue
+
+            fig = self.__figure((tile_size / self.DEFAULT_DPI, tile_size / self.DEFAULT_DPI), self.DEFAULT_DPI)
+            ax = fig.add_axes((0, 0, 1, 1))
+            ax.set_axis_off()
+            self.__draw_selection(ax, viewport, nodes, edges)
+            ax.set_xlim(tile.x_range.min, tile.x_range.max)
+            ax.set_ylim(tile.y_range.min, tile.y_range.max)
+
+            tile_dir = os.path.join(directory, str(zoom), str(tile_x))
+            os.makedirs(tile_dir, exist_ok=True)
+            self.__save(fig, os.path.join(tile_dir, "{}.{}".format(tile_y, fmt)), fmt, self.DEFAULT_DPI)
+            written += 1
+
+            if zoom < max_zoom:
+                for dx in (0, 1):
+                    for dy in (0, 1):
+                        pending.append((zoom + 1, tile_x * 2 + dx, tile_y * 2 + dy))
+        return written
+
+    def draw(self, ax, region: Range2D = None) -> None:
+        '''
+        Draws the graph on matplotlib axes.
+        :param ax: matplotlib Axes.
+        :param region: Part of the plane shown, only what is in it is drawn. Everything if None.
+        :return: None
+        '''
+        viewport = self.__get_viewport()
+        if region is None:
+            self.__draw_selection(ax, viewport, np.arange(len(viewport.keys)), np.arange(len(viewport.src)))
+            return
+
+        nodes, edges = viewport.select(region)
+        self.__draw_selection(ax, viewport, nodes, edges)
+        ax.set_xlim(region.x_range.min, region.x_range.max)
+        ax.set_ylim(region.y_range.min, region.y_range.max)
+
+    def __get_viewport(self) -> GraphViewport:
+        '''
+        :return: The viewport of the graph, taken again if the graph changed.
+        '''
+        if self.__viewport is None or not self.__viewport.is_current():
+            self.__viewport = GraphViewport(self.__g)
+        return self.__viewport
+
+    def __draw_selection(self, ax, viewport: GraphViewport, nodes: np.ndarray, edges: np.ndarray):
+        '''
+        :param nodes: Indices of the viewport nodes to draw.
+        :param edges: Indices of the viewport edges to draw.
+        '''
+        keys = viewport.keys
+        node_keys = [keys[i] for i in nodes.tolist()]
+        xy = viewport.xy[nodes]
+        starts = viewport.xy[viewport.src[edges]]
+        ends = viewport.xy[viewport.dest[edges]]
+
+        mode = self.__mode
+        if mode == self.RENDER_AUTO:
+            mode = self.RENDER_BATCHED if len(edges) >= self.__AUTO_BATCHED_MIN_EDGES else self.RENDER_DETAILED
+
+        if mode == self.RENDER_BATCHED:
+            self.__draw_batched(ax, node_keys, xy, viewport.degree[nodes], starts, ends)
+        else:
+            self.__draw_detailed(ax, node_keys, xy, starts, ends)
+
+    def __draw_detailed(self, ax, keys: List[int], xy: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> None:
+        for key, (x, y) in zip(keys, xy.tolist()):
+            self.__draw_label(ax, key, x, y)
+
+        for (x, y), end in zip(starts.tolist(), ends.tolist()):
+            ax.annotate("",
+                        xy=end,
+                        xycoords='data',
+                        xytext=(x, y),
+                        textcoords='data',
+                        arrowprops=dict(arrowstyle="->",color='midnightblue',
+                                        connectionstyle="arc3,rad={}".format(self.__RAD_ARC)),
+                        )
+
+        ax.scatter(xy[:, 0], xy[:, 1], color=self.__COLOR_NODE)
+
+    def __draw_batched(self, ax, keys: List[int], xy: np.ndarray, degree: np.ndarray, starts: np.ndarray,
+                       ends: np.ndarray) -> None:
+        if len(starts):
+            ax.add_collection(LineCollection(np.stack([starts, ends], axis=1), colors=self.__COLOR_TEXT,
+                                             linewidths=0.5, alpha=0.6, zorder=1))
+
+            if len(starts) <= self.__MAX_ARROW_HEADS:
+                heads = (ends - starts) * self.__ARROW_HEAD_RATIO
+                tails = ends - heads
+                ax.quiver(tails[:, 0], tails[:, 1], heads[:, 0], heads[:, 1], angles='xy', scale_units='xy', scale=1,
+                          color=self.__COLOR_TEXT, width=0.002, headwidth=4, headlength=5, zorder=2)
+
+        ax.scatter(xy[:, 0], xy[:, 1], s=12, color=self.__COLOR_NODE, zorder=3)
+
+        # Level of detail, only the best connected nodes are labeled.
+        if self.__max_labels > 0 and len(keys):
+            for i in np.argsort(-degree, kind='stable')[:self.__max_labels]:
+                self.__draw_label(ax, keys[i], xy[i, 0], xy[i, 1])
+
+        ax.autoscale_view()
+
+    def __draw_label(self, ax, key: int, x: float, y: float) -> None:
+        ax.text(x, y, key,
+                va='top',
+                ha='right',
+                color=self.__COLOR_TEXT,
+                fontsize=9,
+                bbox=dict(boxstyle='square, pad=0.2', ec='gray', fc=self.__COLOR_BOX, alpha=0.65),
+                zorder=self.__Z_ORDER,
+                clip_on=True)
+
+    @staticmethod
+    def __bounding_square(viewport: GraphViewport) -> Optional[Range2D]:
+        '''
+        :return: The square around the bounding box of the viewport nodes, with a little padding. None if no nodes.
+        '''
+        bounds = viewport.bounds()
+        if bounds is None:
+            return None
+
+        side = max(bounds.x_range.length, bounds.y_range.length) or 1.0
+        # Nodes on the edge of the box keep their whole marker.
+        side *= 1.05
+        center_x = (bounds.x_range.min + bounds.x_range.max) / 2
+        center_y = (bounds.y_range.min + bounds.y_range.max) / 2
+        return Range2D(Range(center_x - side / 2, center_x + side / 2), Range(center_y - side / 2, center_y + side / 2))
+
+    @staticmethod
+    def __save(fig: Figure, file_name: Optional[str], fmt: str, dpi: float) -> Optional[bytes]:
+        '''
+        Saves and clears the figure.
+        :return: The image as bytes if file_name is None, else None.
+        '''
+        try:
+            if file_name is not None:
+                fig.savefig(file_name, format=fmt, dpi=dpi)
+                return None
+
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=dpi)
+            return buffer.getvalue()
+        finally:
+            # Drop the artists now, the graph can be big.
+            fig.clear()
+
+    @classmethod
+    def __figure(cls, figsize: Tuple[float, float], dpi: float) -> Figure:
+        '''
+        :return: The shared off screen figure, empty and set to figsize and dpi.
+        '''
+        fig = cls.__headless_figure
+        if fig is None:
+            fig = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(fig)
+            cls.__headless_figure = fig
+        else:
+            fig.clear()
+            fig.set_size_inches(figsize)
+            fig.set_dpi(dpi)
+        return fig
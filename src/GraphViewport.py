@@ -0,0 +1,166 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from GraphInterface import GraphInterface
+from Node import Node
+from location.GeoLocation import GeoLocation
+from location.Range import Range
+from location.Range2D import Range2D
+from location.SegmentGrid import SegmentGrid
+from location.SpatialGrid import SpatialGrid
+
+
+class GraphViewport(object):
+    '''
+    Array snapshot of the positioned part of a graph, what GraphPlotter draws: the node keys with their x, y and
+    degree, the edges between positioned nodes as index pairs.
+    select() picks what a region of the plane shows through a SpatialGrid of the nodes and a SegmentGrid of the
+    edges, both built on the first select, so exploring a big graph region by region costs about what the regions
+    hold instead of the whole graph.
+    The snapshot is taken once, is_current tells when the graph or the node positions changed since.
+    '''
+    # Nodes per SpatialGrid cell, about.
+    __NODES_PER_CELL = 4
+
+    def __init__(self, g: GraphInterface):
+        '''
+        :param g: Graph to snapshot.
+        '''
+        self.__g: GraphInterface = g
+        self.__mc: int = g.get_mc()
+        self.__position_version: int = Node.position_version()
+
+        self.__keys, self.__xy = self.__positioned_nodes()
+        self.__src, self.__dest = self.__positioned_edges()
+        self.__degree: np.ndarray = (np.bincount(self.__src, minlength=len(self.__keys)) +
+                                     np.bincount(self.__dest, minlength=len(self.__keys)))
+
+        self.__node_grid: Optional[SpatialGrid] = None
+        self.__edge_grid: Optional[SegmentGrid] = None
+
+    @property
+    def keys(self) -> List[int]:
+        '''
+        Keys of the positioned nodes, node i of the arrays below.
+        '''
+        return self.__keys
+
+    @property
+    def xy(self) -> np.ndarray:
+        '''
+        K x 2 array, x, y of the nodes.
+        '''
+        return self.__xy
+
+    @property
+    def src(self) -> np.ndarray:
+        '''
+        Source node index of every edge.
+        '''
+        return self.__src
+
+    @property
+    def dest(self) -> np.ndarray:
+        '''
+        Destination node index of every edge.
+        '''
+        return self.__dest
+
+    @property
+    def degree(self) -> np.ndarray:
+        '''
+        In plus out degree of the nodes, counting the edges between positioned nodes.
+        '''
+        return self.__degree
+
+    def is_current(self) -> bool:
+        '''
+        :return: True if the MC of the graph did not change since the snapshot and no node was given a new position.
+        '''
+        return self.__g.get_mc() == self.__mc and Node.position_version() == self.__position_version
+
+    def bounds(self) -> Optional[Range2D]:
+        '''
+        :return: Bounding box of the nodes, None if there are none.
+        '''
+        if not len(self.__keys):
+            return None
+
+        low = self.__xy.min(axis=0)
+        high = self.__xy.max(axis=0)
+        return Range2D(Range(low[0], high[0]), Range(low[1], high[1]))
+
+    def select(self, region: Range2D, margin: float = 0) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        :param region: x and y ranges, bounds included.
+        :param margin: Nodes up to this far outside the region are selected too, so markers and labels that reach
+                       into the region are drawn.
+        :return: Sorted indices of the nodes in the region and of the edges whose bounding box overlaps it.
+        '''
+        if self.__node_grid is None:
+            self.__build_grids()
+
+        x_range = region.x_range
+        y_range = region.y_range
+        grown = Range2D(Range(x_range.min - margin, x_range.max + margin),
+                        Range(y_range.min - margin, y_range.max + margin))
+
+        nodes = np.sort(np.array(self.__node_grid.in_range(grown), dtype=np.int64))
+        return nodes, self.__edge_grid.in_range(region)
+
+    def __build_grids(self):
+        xy = self.__xy
+        starts = xy[self.__src]
+        ends = xy[self.__dest]
+
+        # Cells sized for a few nodes each at the average density.
+        cell_size = 1.0
+        if len(xy):
+            extent = xy.max(axis=0) - xy.min(axis=0)
+            cell_size = math.sqrt(extent[0] * extent[1] * self.__NODES_PER_CELL / len(xy)) or extent.max() or 1.0
+
+        self.__node_grid = SpatialGrid(cell_size)
+        for i, (x, y) in enumerate(xy.tolist()):
+            self.__node_grid.add(i, GeoLocation(x, y, 0))
+
+        # The finest edge cells fit the usual edge.
+        edge_size = 0.0
+        if len(starts):
+            edge_size = float(np.median(np.abs(ends - starts).max(axis=1)))
+        self.__edge_grid = SegmentGrid(starts, ends, edge_size or cell_size)
+
+    def __positioned_nodes(self) -> Tuple[List[int], np.ndarray]:
+        '''
+        :return: Keys of the positioned nodes and their x, y as a K x 2 array, in the same order.
+        '''
+        nodes = self.__g.get_all_v()
+        positions = getattr(self.__g, 'position_store', None)
+
+        if positions is not None:
+            keys = list(nodes.keys())
+            rows = np.fromiter((positions.index_of(key) for key in keys), dtype=np.int64, count=len(keys))
+            xy = positions.coords[rows, :2]
+            positioned = ~np.isnan(xy[:, 0])
+            return [key for key, ok in zip(keys, positioned) if ok], xy[positioned]
+
+        keys = [key for key, n in nodes.items() if n.geo_location]
+        xy = np.array([(nodes[key].geo_location.x, nodes[key].geo_location.y) for key in keys]).reshape(-1, 2)
+        return keys, xy
+
+    def __positioned_edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        :return: Source and destination indices into keys of the edges between positioned nodes.
+        '''
+        index: Dict[int, int] = {key: i for i, key in enumerate(self.__keys)}
+        src = []
+        dest = []
+        for key in self.__keys:
+            i = index[key]
+            for other_node_id, _ in self.__g.out_neighbours(key):
+                j = index.get(other_node_id)
+                if j is not None:
+                    src.append(i)
+                    dest.append(j)
+        return np.array(src, dtype=np.int64), np.array(dest, dtype=np.int64)
@@ -0,0 +1,196 @@
+from typing import Dict, List, Set
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from GraphListener import GraphListener
+
+
+class IncrementalSCC(GraphListener):
+    '''
+    Strongly connected components kept up to date while edges are inserted into a DiGraph.
+
+    Components are kept in a union-find, the condensation DAG is kept in a topological order
+    (https://en.wikipedia.org/wiki/Topological_sorting#Dynamic_algorithms, Pearce-Kelly).
+    An insertion that agrees with the order costs O(1). Otherwise only the components between the two
+    endpoints in the order are searched, components on a newly closed cycle are merged and the affected
+    region is reordered.
+    Edge and node removals are not handled incrementally, the next query recomputes everything with Tarjan.
+    '''
+
+    def __init__(self, g: DiGraph):
+        self.__g: DiGraph = g
+        self.__parent: Dict[int, int] = {}
+        # Members and topological position, only kept for the component representatives.
+        self.__members: Dict[int, List[int]] = {}
+        self.__order: Dict[int, int] = {}
+        self.__next_order: int = 0
+        self.__dirty: bool = True
+        self.__mode_count: int = g.get_mc()
+
+        g.add_listener(self)
+
+    def detach(self):
+        '''
+        Stops tracking the graph.
+        :return: None
+        '''
+        self.__g.remove_listener(self)
+
+    def connected_components(self) -> List[List[int]]:
+        '''
+        All the SCCs, sinks of the condensation DAG first (like Tarjan).
+        :return: List of SCCs.
+        '''
+        self.__ensure_synced()
+        reps = sorted(self.__members, key=self.__order.get, reverse=True)
+        return [list(self.__members[rep]) for rep in reps]
+
+    def connected_component(self, id1: int) -> List[int]:
+        '''
+        The SCC of a node.
+        :param id1: Node id.
+        :return: The SCC, [] if id1 is not in the graph.
+        '''
+        self.__ensure_synced()
+        if id1 not in self.__parent:
+            return []
+        return list(self.__members[self.__find(id1)])
+
+    def is_strongly_connected(self, id1: int, id2: int) -> bool:
+        '''
+        :param id1: Node id.
+        :param id2: Node id.
+        :return: True if both nodes are in the graph and in the same SCC.
+        '''
+        self.__ensure_synced()
+        if id1 not in self.__parent or id2 not in self.__parent:
+            return False
+        return self.__find(id1) == self.__find(id2)
+
+    def on_node_added(self, node_id: int):
+        self.__mode_count = self.__g.get_mc()
+        if self.__dirty:
+            return
+
+        self.__parent[node_id] = node_id
+        self.__members[node_id] = [node_id]
+        self.__order[node_id] = self.__next_order
+        self.__next_order += 1
+
+    def on_node_removed(self, node_id: int):
+        self.__dirty = True
+
+    def on_edge_removed(self, id1: int, id2: int):
+        self.__dirty = True
+
+    def on_edge_added(self, id1: int, id2: int, weight: float):
+        self.__mode_count = self.__g.get_mc()
+        if self.__dirty:
+            return
+
+        src_rep = self.__find(id1)
+        dest_rep = self.__find(id2)
+        if src_rep == dest_rep:
+            return
+
+        lower_bound = self.__order[dest_rep]
+        upper_bound = self.__order[src_rep]
+
+        # The new edge agrees with the topological order.
+        if upper_bound < lower_bound:
+            return
+
+        forward = self.__search(dest_rep, True, lambda rep: self.__order[rep] <= upper_bound)
+        backward = self.__search(src_rep, False, lambda rep: self.__order[rep] >= lower_bound)
+
+        slots = sorted(self.__order[rep] for rep in forward | backward)
+        backward_only = sorted(backward - forward, key=self.__order.get)
+        forward_only = sorted(forward - backward, key=self.__order.get)
+
+        if src_rep in forward:
+            # The edge closes a cycle, every component both reachable from dest and reaching src collapses into one.
+            backward_only.append(self.__merge(forward & backward))
+
+        # Components reaching src take the lowest slots, the ones reachable from dest the highest.
+        for slot, rep in zip(slots, backward_only):
+            self.__order[rep] = slot
+        for slot, rep in zip(slots[len(slots) - len(forward_only):], forward_only):
+            self.__order[rep] = slot
+
+    def __search(self, start_rep: int, forward: bool, in_bounds) -> Set[int]:
+        '''
+        DFS over the condensation DAG limited to components within bounds.
+        :param start_rep: Representative to start from.
+        :param forward: Search over out edges if True, in edges o.w.
+        :param in_bounds: Predicate on a representative.
+        :return: Visited representatives.
+        '''
+        g = self.__g
+        visited = {start_rep}
+        stack = [start_rep]
+
+        while stack:
+            rep = stack.pop()
+            for member in self.__members[rep]:
+                neighbours = g.out_neighbours(member) if forward else g.in_neighbours(member)
+                for neighbour_id, _ in neighbours:
+                    neighbour_rep = self.__find(neighbour_id)
+                    if neighbour_rep not in visited and in_bounds(neighbour_rep):
+                        visited.add(neighbour_rep)
+                        stack.append(neighbour_rep)
+
+        return visited
+
+    def __merge(self, reps: Set[int]) -> int:
+        '''
+        Unites components, the one with the most members stays the representative.
+        :param reps: Representatives to unite.
+        :return: The new representative.
+        '''
+        merged_rep = max(reps, key=lambda rep: len(self.__members[rep]))
+        merged_members = self.__members[merged_rep]
+
+        for rep in reps:
+            if rep != merged_rep:
+                self.__parent[rep] = merged_rep
+                merged_members.extend(self.__members.pop(rep))
+                del self.__order[rep]
+
+        return merged_rep
+
+    def __find(self, node_id: int) -> int:
+        root = node_id
+        while self.__parent[root] != root:
+            root = self.__parent[root]
+
+        # Path compression.
+        while self.__parent[node_id] != root:
+            self.__parent[node_id], node_id = root, self.__parent[node_id]
+
+        return root
+
+    def __ensure_synced(self):
+        '''
+        Recomputes from scratch after a removal or a change that was not reported.
+        :return: None
+        '''
+        if self.__dirty or self.__mode_count != self.__g.get_mc():
+            self.__recompute()
+
+    def __recompute(self):
+        self.__parent = {}
+        self.__members = {}
+        self.__order = {}
+
+        # Tarjan completes the sinks of the condensation DAG first.
+        sccs = GraphAlgo(self.__g).connected_components()
+        for position, scc in enumerate(reversed(sccs)):
+            rep = scc[0]
+            for node_id in scc:
+                self.__parent[node_id] = rep
+            self.__members[rep] = scc
+            self.__order[rep] = position
+
+        self.__next_order = len(sccs)
+        self.__mode_count = self.__g.get_mc()
+        self.__dirty = False
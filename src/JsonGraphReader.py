@@ -0,0 +1,145 @@
+import json
+from typing import IO, Iterator, Tuple
+
+from GraphElement import GraphElement
+
+
+class JsonGraphReader(object):
+    '''
+    Incremental reader of graph JSON files, supports both the 'Nodes'/'Edges' arrays format and our own
+    'nodes'/'links' format.
+    The file is read in chunks and only one node, edge (or for 'links' one node's out edges) is decoded at a time,
+    so the whole document is never held in memory.
+    Iterating yields (GraphElement kind, value) pairs, node and edge values are dicts as in the file.
+    '''
+    __NODES_KEYS = ('nodes', 'Nodes')
+    __EDGES_KEY = 'Edges'
+    __LINKS_KEY = 'links'
+    __MODE_COUNT_KEY = 'modeCount'
+    __WHITESPACE = ' \t\n\r'
+    __DEFAULT_CHUNK_SIZE = 1 << 16
+
+    def __init__(self, f: IO[str], chunk_size: int = None):
+        self.__f = f
+        self.__chunk_size = chunk_size or self.__DEFAULT_CHUNK_SIZE
+        self.__decoder = json.JSONDecoder()
+        self.__buf = ''
+        self.__pos = 0
+        self.__eof = False
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        seen_nodes = False
+        seen_edges = False
+
+        self.__expect('{')
+        if self.__peek() == '}':
+            raise ValueError("Malformed JSON.")
+
+        while True:
+            key = self.__decode_value()
+            self.__expect(':')
+
+            if key in self.__NODES_KEYS:
+                seen_nodes = True
+                for node in self.__iter_container():
+                    yield GraphElement.NODE, node
+            elif key == self.__EDGES_KEY:
+                seen_edges = True
+                for edge in self.__iter_container():
+                    yield GraphElement.EDGE, edge
+            elif key == self.__LINKS_KEY:
+                seen_edges = True
+                for out_links in self.__iter_container():
+                    for edge in out_links.values():
+                        yield GraphElement.EDGE, edge
+            else:
+                value = self.__decode_value()
+                if key == self.__MODE_COUNT_KEY:
+                    yield GraphElement.MODE_COUNT, value
+
+            c = self.__next_char()
+            if c == '}':
+                break
+            if c != ',':
+                raise ValueError("Malformed JSON.")
+
+        if not seen_nodes or not seen_edges:
+            raise ValueError("Malformed JSON.")
+
+    def __iter_container(self) -> Iterator[object]:
+        '''
+        Iterates the values of a JSON array, or of a JSON object (keys are dropped).
+        '''
+        c = self.__next_char()
+        if c == '[':
+            end = ']'
+        elif c == '{':
+            end = '}'
+        else:
+            raise ValueError("Malformed JSON.")
+
+        if self.__peek() == end:
+            self.__pos += 1
+            return
+
+        while True:
+            if end == '}':
+                self.__decode_value()
+                self.__expect(':')
+            yield self.__decode_value()
+
+            c = self.__next_char()
+            if c == end:
+                return
+            if c != ',':
+                raise ValueError("Malformed JSON.")
+
+    def __decode_value(self) -> object:
+        '''
+        Decodes the next JSON value, reading more of the file until it is complete.
+        '''
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buf, self.__pos)
+                # A number may continue in the next chunk.
+                if end < len(self.__buf) or self.__eof:
+                    self.__pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.__eof:
+                    raise ValueError("Malformed JSON.")
+            self.__fill()
+
+    def __next_char(self) -> str:
+        c = self.__peek()
+        self.__pos += 1
+        return c
+
+    def __expect(self, expected: str):
+        if self.__next_char() != expected:
+            raise ValueError("Malformed JSON.")
+
+    def __peek(self) -> str:
+        '''
+        Skips whitespace.
+        :return: The next char without consuming it.
+        '''
+        while True:
+            while self.__pos < len(self.__buf) and self.__buf[self.__pos] in self.__WHITESPACE:
+                self.__pos += 1
+            if self.__pos < len(self.__buf):
+                return self.__buf[self.__pos]
+            if self.__eof:
+                raise ValueError("Malformed JSON.")
+            self.__fill()
+
+    def __fill(self):
+        '''
+        Drops the consumed part of the buffer and reads the next chunk.
+        '''
+        chunk = self.__f.read(self.__chunk_size)
+        if not chunk:
+            self.__eof = True
+        self.__buf = self.__buf[self.__pos:] + chunk
+        self.__pos = 0
@@ -0,0 +1,198 @@
+import hashlib
+from array import array
+from heapq import heappush, heappop
+from typing import Callable, Dict, List, Set, Tuple
+
+import numpy as np
+
+from GraphInterface import GraphInterface
+
+
+class Landmarks(object):
+    '''
+    ALT (A*, Landmarks, Triangle inequality) tables: for a few landmark nodes L the distance from L to every node
+    and from every node to L. For any v and t the triangle inequality bounds d(v, t) from below by
+    d(L, t) - d(L, v) and d(v, L) - d(t, L), the largest bound over the landmarks is a consistent A* heuristic that
+    needs no coordinates.
+    Landmarks are picked by farthest selection: the node farthest from a random start, then again and again the
+    node farthest from all the landmarks so far, so they sit on the rim of the graph.
+    The tables belong to one state of the graph, they record its MC and a fingerprint of its edges, see
+    is_current.
+    '''
+    DEFAULT_COUNT = 16
+
+    def __init__(self, mc: int, fingerprint: bytes, keys: List[int], landmarks: List[int], forward: np.ndarray,
+                 backward: np.ndarray):
+        '''
+        Use build or load.
+        :param mc: MC of the graph the tables were computed on.
+        :param fingerprint: fingerprint of that graph, None if unknown.
+        :param keys: Node keys, row i of the tables is node keys[i].
+        :param landmarks: Landmark node keys.
+        :param forward: |V| x k, forward[i, l] = d(landmarks[l], keys[i]), inf if unreachable.
+        :param backward: |V| x k, backward[i, l] = d(keys[i], landmarks[l]), inf if unreachable.
+        '''
+        self.__mc: int = mc
+        self.__fingerprint: bytes = fingerprint
+        self.__keys: List[int] = keys
+        self.__index: Dict[int, int] = {key: i for i, key in enumerate(keys)}
+        self.__landmarks: List[int] = landmarks
+        self.__forward: np.ndarray = forward
+        self.__backward: np.ndarray = backward
+        # [-forward | backward | 0], the bounds of a node towards dest are its row plus [to dest | -from dest | 0],
+        # one add and one max for a batch of nodes. The 0 column keeps the bound from going negative.
+        self.__bound_terms: np.ndarray = np.hstack([-forward, backward, np.zeros((len(keys), 1))])
+
+    @classmethod
+    def build(cls, g: GraphInterface, count: int = DEFAULT_COUNT, seed: int = 0) -> 'Landmarks':
+        '''
+        Picks the landmarks and computes the tables, two full Dijkstra runs per landmark.
+        :param g: Graph.
+        :param count: Number of landmarks, fewer if the graph is smaller.
+        :param seed: Seed of the random start node.
+        :return: The tables.
+        '''
+        if count < 1:
+            raise ValueError("At least one landmark is needed.")
+
+        keys = list(g.get_all_v().keys())
+        index = {key: i for i, key in enumerate(keys)}
+        count = min(count, len(keys))
+
+        landmarks: List[int] = []
+        forward: List[np.ndarray] = []
+        backward: List[np.ndarray] = []
+        if count:
+            start = keys[np.random.default_rng(seed).integers(len(keys))]
+            # Distance from the start, then round trip distance of every node to the closest landmark so far.
+            closest = cls.__distances(g, index, start, g.out_neighbours)
+
+            for _ in range(count):
+                # Unreachable nodes come first, a landmark there covers a part of the graph the others cannot.
+                candidate = int(np.argmax(np.where(np.isinf(closest), np.finfo(np.float64).max, closest)))
+                if closest[candidate] == 0 and landmarks:
+                    break
+
+                landmark = keys[candidate]
+                landmarks.append(landmark)
+                forward.append(cls.__distances(g, index, landmark, g.out_neighbours))
+                backward.append(cls.__distances(g, index, landmark, g.in_neighbours))
+                round_trip = forward[-1] + backward[-1]
+                closest = round_trip if len(landmarks) == 1 else np.minimum(closest, round_trip)
+
+        shape = (len(keys), len(landmarks))
+        return cls(g.get_mc(), cls.fingerprint(g), keys, landmarks,
+                   np.stack(forward, axis=1) if forward else np.zeros(shape),
+                   np.stack(backward, axis=1) if backward else np.zeros(shape))
+
+    @classmethod
+    def load(cls, file_name: str) -> 'Landmarks':
+        '''
+        :param file_name: File written by save.
+        :return: The tables.
+        '''
+        with np.load(file_name) as data:
+            # Tables saved without one never match a graph.
+            fingerprint = data['fingerprint'].tobytes() if 'fingerprint' in data.files else None
+            return cls(int(data['mc']), fingerprint, data['keys'].tolist(), data['landmarks'].tolist(),
+                       data['forward'], data['backward'])
+
+    def save(self, file_name: str):
+        '''
+        :param file_name: File to write, numpy npz format.
+        :return: None
+        '''
+        with open(file_name, 'wb') as f:
+            np.savez(f, mc=np.int64(self.__mc), fingerprint=np.frombuffer(self.__fingerprint, dtype=np.uint8),
+                     keys=np.array(self.__keys, dtype=np.int64),
+                     landmarks=np.array(self.__landmarks, dtype=np.int64), forward=self.__forward,
+                     backward=self.__backward)
+
+    @property
+    def landmarks(self) -> List[int]:
+        return list(self.__landmarks)
+
+    @property
+    def mc(self) -> int:
+        return self.__mc
+
+    @staticmethod
+    def fingerprint(g: GraphInterface) -> bytes:
+        '''
+        :return: SHA-256 over the nodes and their out edges (src, dest, weight), in key order. Tables loaded from a
+                 file are only used on a graph with the same one, the MC of a JSON file alone says nothing about
+                 weights edited in it.
+        '''
+        digest = hashlib.sha256()
+        for key in sorted(g.get_all_v().keys()):
+            edges = sorted(g.out_neighbours(key))
+            digest.update(array('q', [key, len(edges)] + [dest for dest, _ in edges]).tobytes())
+            digest.update(array('d', [weight for _, weight in edges]).tobytes())
+        return digest.digest()
+
+    def is_current(self, g: GraphInterface) -> bool:
+        '''
+        :return: True if the tables were computed on the graph as it is now: same MC, nodes and weighted edges.
+        '''
+        nodes = g.get_all_v()
+        return (g.get_mc() == self.__mc and len(nodes) == len(self.__keys) and
+                all(key in nodes for key in self.__keys) and self.__fingerprint == self.fingerprint(g))
+
+    def estimator(self, dest: int) -> Callable[[List[int]], List[float]]:
+        '''
+        :param dest: Target node key.
+        :return: The heuristic towards dest, from node keys to lower bounds of their distances to dest, inf for a
+                 node that cannot reach dest at all. Takes many nodes at once, one array operation for all of them.
+        '''
+        if not len(self.__landmarks):
+            return lambda node_ids: [0.0] * len(node_ids)
+
+        index = self.__index
+        bound_terms = self.__bound_terms
+        to_dest = self.__forward[index[dest]]
+        from_dest = self.__backward[index[dest]]
+        dest_terms = np.concatenate([to_dest, -from_dest, [0.0]])
+        if np.isfinite(dest_terms).all():
+            return lambda node_ids: (bound_terms[[index[node_id] for node_id in node_ids]] + dest_terms).max(
+                axis=1).tolist()
+
+        def estimate(node_ids: List[int]) -> List[float]:
+            # Some landmark does not reach dest, or dest does not reach it. A landmark reaching the node but not
+            # dest gives inf + finite, the node cannot reach dest either. inf - inf is no bound at all, the nan is
+            # skipped by fmax.
+            with np.errstate(invalid='ignore'):
+                bounds = bound_terms[[index[node_id] for node_id in node_ids]] + dest_terms
+            return np.fmax.reduce(bounds, axis=1).tolist()
+
+        return estimate
+
+    @staticmethod
+    def __distances(g: GraphInterface, index: Dict[int, int], source: int,
+                    neighbours: Callable[[int], object]) -> np.ndarray:
+        '''
+        Dijkstra from source over the whole graph.
+        :param neighbours: g.out_neighbours for distances from source, g.in_neighbours for distances to it.
+        :return: Distance of every node, by index, inf if unreachable.
+        '''
+        distances = np.full(len(index), np.inf)
+        tentative: Dict[int, float] = {source: 0.0}
+        settled: Set[int] = set()
+        pq: List[Tuple[float, int]] = [(0.0, source)]
+
+        while pq:
+            node_distance, node_id = heappop(pq)
+            if node_id in settled:
+                continue
+            settled.add(node_id)
+            distances[index[node_id]] = node_distance
+
+            for neighbour_id, weight in neighbours(node_id):
+                if neighbour_id in settled:
+                    continue
+
+                new_neighbour_distance = node_distance + weight
+                if new_neighbour_distance < tentative.get(neighbour_id, float("inf")):
+                    tentative[neighbour_id] = new_neighbour_distance
+                    heappush(pq, (new_neighbour_distance, neighbour_id))
+
+        return distances
@@ -3,7 +3,9 @@ from location.GeoLocation import GeoLocation
 
 
 class Node(object):
+    __slots__ = ('key', 'info', 'tag', 'weight', '_geo_location', '_position_store', '__links')
     __node_counter: int = 0
+    __position_version: int = 0
 
     def __init__(self, key: int = None, geo: GeoLocation = None):
         self.key: int = key if key is not None else self.__get_next_node_id()
@@ -11,6 +13,7 @@ class Node(object):
         self.tag: int = 0
         self.weight: int = 0
         self._geo_location: GeoLocation = geo
+        self._position_store = None
         self.__links = None
 
         pass
@@ -76,6 +79,15 @@ class Node(object):
 
         return res
 
+    @classmethod
+    def position_version(cls) -> int:
+        '''
+        Goes up each time a node, of any graph, is given a position. Moving a node leaves the MC as is, this tells
+        snapshots of the positions when they are stale. Coordinates changed in place on a GeoLocation are not seen.
+        :return: The version.
+        '''
+        return Node.__position_version
+
     @property
     def geo_location(self):
         return self._geo_location
@@ -84,7 +96,21 @@ class Node(object):
     def geo_location(self, geo: GeoLocation):
         if not isinstance(geo, GeoLocation):
             raise ValueError("{} must be of type {}".format(type(geo), GeoLocation))
+
+        # Positions of array backed graphs live in the graph PositionStore, the node keeps a view on its row.
+        if self._position_store is not None:
+            geo = self._position_store.assign(self.key, geo)
         self._geo_location = geo
+        Node.__position_version += 1
+
+    def set_position_store(self, store):
+        '''
+        Used by PositionStore when the node joins or leaves it, the current position is dropped.
+        :param store: PositionStore or None.
+        :return: None
+        '''
+        self._position_store = store
+        self._geo_location = None
 
     '''
     Not thread safe.
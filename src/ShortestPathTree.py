@@ -0,0 +1,113 @@
+from array import array
+from heapq import heappush, heappop
+from typing import Dict, List, Tuple
+
+from GraphInterface import GraphInterface
+
+
+class ShortestPathTree(object):
+    '''
+    Shortest paths from one source to every node of a graph, from a single Dijkstra run.
+    Nodes are kept by dense index: distances[i] is the distance of node keys[i] from the source, inf if it is out of
+    reach, predecessors[i] the index of the node before it on its path, -1 for the source and the nodes out of reach.
+    keys and index may be shared by all the trees of the same graph state, each tree only adds two arrays.
+    The tree belongs to one state of the graph, it records its MC.
+    '''
+
+    def __init__(self, mc: int, src: int, keys: array, index: Dict[int, int], distances: array, predecessors: array):
+        '''
+        Use build.
+        :param mc: MC of the graph the tree was computed on.
+        :param src: Source node key.
+        :param keys: Node keys by index.
+        :param index: Node key to index.
+        :param distances: Distance from src by index.
+        :param predecessors: Index of the node before by index.
+        '''
+        self.__mc: int = mc
+        self.__src: int = src
+        self.__keys: array = keys
+        self.__index: Dict[int, int] = index
+        self.__distances: array = distances
+        self.__predecessors: array = predecessors
+
+    @classmethod
+    def build(cls, g: GraphInterface, src: int,
+              nodes: Tuple[array, Dict[int, int]] = None) -> 'ShortestPathTree':
+        '''
+        :param g: Graph, weights must not be negative.
+        :param src: Source node key.
+        :param nodes: Node keys by index and key to index of g as it is, from node_index. Built if None.
+        :return: The tree.
+        '''
+        keys, index = nodes if nodes is not None else cls.node_index(g)
+        if src not in index:
+            raise ValueError("Node {} is not in the graph.".format(src))
+
+        n = len(keys)
+        distances = array('d', [float('inf')]) * n
+        predecessors = array('q', [-1]) * n
+        distances[index[src]] = 0.0
+        settled = bytearray(n)
+        pq: List[Tuple[float, int]] = [(0.0, src)]
+
+        while pq:
+            node_distance, node_id = heappop(pq)
+            i = index[node_id]
+            if settled[i]:
+                continue
+            settled[i] = 1
+
+            for neighbour_id, weight in g.out_neighbours(node_id):
+                j = index[neighbour_id]
+                new_neighbour_distance = node_distance + weight
+                # Never true for a settled neighbour, weights are not negative.
+                if new_neighbour_distance < distances[j]:
+                    distances[j] = new_neighbour_distance
+                    predecessors[j] = i
+                    heappush(pq, (new_neighbour_distance, neighbour_id))
+
+        return cls(g.get_mc(), src, keys, index, distances, predecessors)
+
+    @staticmethod
+    def node_index(g: GraphInterface) -> Tuple[array, Dict[int, int]]:
+        '''
+        :return: Node keys by index and key to index, for build.
+        '''
+        keys = array('q', g.get_all_v().keys())
+        return keys, {key: i for i, key in enumerate(keys)}
+
+    @property
+    def src(self) -> int:
+        return self.__src
+
+    @property
+    def mc(self) -> int:
+        return self.__mc
+
+    def distance_to(self, dest: int) -> float:
+        '''
+        :param dest: Node key.
+        :return: Distance from the source to dest, inf if dest is out of reach or not in the graph.
+        '''
+        i = self.__index.get(dest)
+        return float('inf') if i is None else self.__distances[i]
+
+    def path_to(self, dest: int) -> List[int]:
+        '''
+        :param dest: Node key.
+        :return: Node keys of the shortest path from the source to dest, [] if dest is out of reach or not in the
+                 graph.
+        '''
+        i = self.__index.get(dest)
+        if i is None or self.__distances[i] == float('inf'):
+            return []
+
+        keys = self.__keys
+        predecessors = self.__predecessors
+        path = []
+        while i != -1:
+            path.append(keys[i])
+            i = predecessors[i]
+        path.reverse()
+        return path
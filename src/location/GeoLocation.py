@@ -5,6 +5,8 @@ class GeoLocation(object):
     '''
     Represent a x,y,z point in space.
     '''
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x: float, y: float, z: float):
         self.x: float = float(x)
         self.y: float = float(y)
@@ -0,0 +1,143 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from location.GeoLocation import GeoLocation
+
+
+class PositionView(GeoLocation):
+    '''
+    A GeoLocation that reads and writes its coordinates straight from a row of a PositionStore.
+    '''
+    __slots__ = ('__store', '__index')
+
+    def __init__(self, store: 'PositionStore', index: int):
+        self.__store = store
+        self.__index = index
+
+    @property
+    def x(self) -> float:
+        return float(self.__store.coords[self.__index, 0])
+
+    @x.setter
+    def x(self, value: float):
+        self.__store.coords[self.__index, 0] = value
+
+    @property
+    def y(self) -> float:
+        return float(self.__store.coords[self.__index, 1])
+
+    @y.setter
+    def y(self, value: float):
+        self.__store.coords[self.__index, 1] = value
+
+    @property
+    def z(self) -> float:
+        return float(self.__store.coords[self.__index, 2])
+
+    @z.setter
+    def z(self, value: float):
+        self.__store.coords[self.__index, 2] = value
+
+
+class PositionStore(object):
+    '''
+    Node positions kept in one contiguous N x 3 float64 array, a row per node (dense index), so the bounds and the
+    positioned nodes are read vectorized. Rows of nodes without a position, or of removed nodes, are NaN.
+    Row indices are stable while a node is in the store, freed rows are reused by later nodes.
+    '''
+    __INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        self.__coords = np.full((self.__INITIAL_CAPACITY, 3), np.nan)
+        self.__size: int = 0
+        self.__node_id_to_index: Dict[int, int] = {}
+        self.__free: List[int] = []
+
+    @property
+    def coords(self) -> np.ndarray:
+        '''
+        :return: The used rows of the array, NaN rows included. Writes go through to the positions.
+        '''
+        return self.__coords[:self.__size]
+
+    def index_of(self, node_id: int) -> int:
+        return self.__node_id_to_index[node_id]
+
+    def __contains__(self, node_id: int) -> bool:
+        return node_id in self.__node_id_to_index
+
+    def __len__(self) -> int:
+        return len(self.__node_id_to_index)
+
+    def attach(self, node) -> None:
+        '''
+        Gives a node a row, its current position (if any) is copied in and replaced by a view on the row.
+        :param node: Node to attach.
+        :return: None
+        '''
+        index = self.__allocate()
+        self.__node_id_to_index[node.key] = index
+
+        geo = node.geo_location
+        node.set_position_store(self)
+        if geo is not None:
+            node.geo_location = geo
+
+    def detach(self, node) -> None:
+        '''
+        Frees the row of a node, the node gets a plain GeoLocation copy of its position back.
+        :param node: Node to detach.
+        :return: None
+        '''
+        geo = node.geo_location
+        node.set_position_store(None)
+        if geo is not None:
+            node.geo_location = GeoLocation(geo.x, geo.y, geo.z)
+
+        index = self.__node_id_to_index.pop(node.key)
+        self.__coords[index] = np.nan
+        self.__free.append(index)
+
+    def assign(self, node_id: int, geo: GeoLocation) -> PositionView:
+        '''
+        Writes a position into the row of a node.
+        :param node_id: Node id.
+        :param geo: Position.
+        :return: A view on the row.
+        '''
+        index = self.__node_id_to_index[node_id]
+        self.__coords[index] = (geo.x, geo.y, geo.z)
+        return PositionView(self, index)
+
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        '''
+        :return: (min x, max x, min y, max y) over the positioned nodes, None if there are none.
+        '''
+        xy = self.coords[:, :2]
+        positioned = xy[~np.isnan(xy[:, 0])]
+        if not len(positioned):
+            return None
+
+        min_x, min_y = positioned.min(axis=0)
+        max_x, max_y = positioned.max(axis=0)
+        return float(min_x), float(max_x), float(min_y), float(max_y)
+
+    def positioned_xy(self) -> np.ndarray:
+        '''
+        :return: K x 2 array with the x, y of the positioned nodes.
+        '''
+        xy = self.coords[:, :2]
+        return xy[~np.isnan(xy[:, 0])]
+
+    def __allocate(self) -> int:
+        if self.__free:
+            return self.__free.pop()
+
+        if self.__size == len(self.__coords):
+            grown = np.full((2 * len(self.__coords), 3), np.nan)
+            grown[:self.__size] = self.__coords
+            self.__coords = grown
+
+        self.__size += 1
+        return self.__size - 1
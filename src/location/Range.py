@@ -1,4 +1,6 @@
 class Range(object):
+    __slots__ = ('min', 'max')
+
     def __init__(self, min: float, max: float):
         self.min = min
         self.max = max
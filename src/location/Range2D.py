@@ -3,6 +3,8 @@ from location.Range import Range
 
 
 class Range2D(object):
+    __slots__ = ('x_range', 'y_range')
+
     def __init__(self, x_range: Range, y_range: Range):
         self.x_range = x_range
         self.y_range = y_range
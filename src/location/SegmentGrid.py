@@ -0,0 +1,100 @@
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from location.Range2D import Range2D
+
+
+class SegmentGrid(object):
+    '''
+    Static index of 2D segments (edges) for range queries, a loose grid per level: a segment goes to the first level
+    whose cell side is at least the longer side of its bounding box, in the cell of its low corner. A range query
+    then only looks at the cells that can hold a segment overlapping the range, about one column of cells around the
+    range on every level, so the cost follows the range and not the number of segments. The candidates are then tested
+    exactly against the range.
+    Built at once from arrays, rebuild it when the segments change.
+    '''
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, cell_size: float):
+        '''
+        :param starts: K x 2 array, x, y of the segment starts.
+        :param ends: K x 2 array, x, y of the segment ends.
+        :param cell_size: Cell side of the finest level, about the usual segment length works best.
+        '''
+        if not cell_size > 0:
+            raise ValueError("Cell size must be positive.")
+
+        self.__starts: np.ndarray = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        self.__ends: np.ndarray = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        self.__low: np.ndarray = np.minimum(self.__starts, self.__ends)
+        self.__high: np.ndarray = np.maximum(self.__starts, self.__ends)
+        # [(cell side, origin, width, sorted cell keys, segment ids in key order)]
+        self.__levels: List[Tuple[float, np.ndarray, int, np.ndarray, np.ndarray]] = []
+
+        if not len(self.__low):
+            return
+
+        side = (self.__high - self.__low).max(axis=1)
+        level_of = np.ceil(np.log2(np.maximum(side / cell_size, 1))).astype(np.int64)
+
+        for level in range(int(level_of.max()) + 1):
+            ids = np.flatnonzero(level_of == level)
+            size = cell_size * 2 ** level
+            if not len(ids):
+                continue
+
+            cells = np.floor(self.__low[ids] / size).astype(np.int64)
+            origin = cells.min(axis=0)
+            cells -= origin
+            width = int(cells[:, 1].max()) + 1
+            keys = cells[:, 0] * width + cells[:, 1]
+            order = np.argsort(keys, kind='stable')
+            self.__levels.append((size, origin, width, keys[order], ids[order]))
+
+    def __len__(self) -> int:
+        return len(self.__low)
+
+    def in_range(self, region: Range2D) -> np.ndarray:
+        '''
+        :param region: x and y ranges, bounds included.
+        :return: Sorted ids (row in starts / ends) of the segments that cross or touch the region.
+        '''
+        x_range = region.x_range
+        y_range = region.y_range
+        found = [np.zeros(0, dtype=np.int64)]
+
+        for size, origin, width, keys, ids in self.__levels:
+            # A segment here spans at most one cell, so one that reaches the region starts at most a cell before it.
+            min_cx = max(math.floor(x_range.min / size) - 1 - origin[0], 0)
+            max_cx = min(math.floor(x_range.max / size) - origin[0], int(keys[-1]) // width)
+            min_cy = max(math.floor(y_range.min / size) - 1 - origin[1], 0)
+            max_cy = min(math.floor(y_range.max / size) - origin[1], width - 1)
+            if min_cx > max_cx or min_cy > max_cy:
+                continue
+
+            # Within a column the cells of the range are consecutive keys.
+            columns = np.arange(min_cx, max_cx + 1) * width
+            first = np.searchsorted(keys, columns + min_cy, side='left')
+            counts = np.searchsorted(keys, columns + max_cy, side='right') - first
+            total = int(counts.sum())
+            if not total:
+                continue
+
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            found.append(ids[np.repeat(first, counts) + offsets])
+
+        candidates = np.concatenate(found)
+        low = self.__low[candidates]
+        high = self.__high[candidates]
+        overlap = ((low[:, 0] <= x_range.max) & (high[:, 0] >= x_range.min) &
+                   (low[:, 1] <= y_range.max) & (high[:, 1] >= y_range.min))
+        candidates = candidates[overlap]
+
+        # The bounding boxes overlap, the segment misses the range only if all 4 corners are on one side of its line.
+        start = self.__starts[candidates]
+        direction = self.__ends[candidates] - start
+        sides = np.stack([direction[:, 0] * (y - start[:, 1]) - direction[:, 1] * (x - start[:, 0])
+                          for x in (x_range.min, x_range.max) for y in (y_range.min, y_range.max)], axis=1)
+        crosses = ~((sides > 0).all(axis=1) | (sides < 0).all(axis=1))
+        return np.sort(candidates[crosses])
@@ -0,0 +1,127 @@
+import math
+from typing import Dict, Hashable, Iterator, List, Tuple
+
+from location.GeoLocation import GeoLocation
+from location.Range2D import Range2D
+
+
+class SpatialGrid(object):
+    '''
+    Uniform grid index of points over the x, y plane. A point is kept in the square cell its x, y fall into, so a
+    radius or a range query only looks at the cells it overlaps instead of every point.
+    Distances are 3D like GeoLocation.distance, z only filters after the cells are picked.
+    '''
+
+    def __init__(self, cell_size: float):
+        '''
+        :param cell_size: Side of a cell, about the usual query radius works best.
+        '''
+        if not cell_size > 0:
+            raise ValueError("Cell size must be positive.")
+
+        self.__cell_size: float = cell_size
+        # {(cell x, cell y): [(key, x, y, z)]}
+        self.__cells: Dict[Tuple[int, int], List[Tuple[Hashable, float, float, float]]] = {}
+        self.__key_to_cell: Dict[Hashable, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__key_to_cell)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__key_to_cell
+
+    def add(self, key: Hashable, geo: GeoLocation):
+        '''
+        Adds a point, replaces the previous point of the key if any.
+        :param key: Point key, e.g. a node id.
+        :param geo: Position.
+        :return: None
+        '''
+        if key in self.__key_to_cell:
+            self.remove(key)
+
+        cell = self.__cell_of(geo.x, geo.y)
+        self.__cells.setdefault(cell, []).append((key, geo.x, geo.y, geo.z))
+        self.__key_to_cell[key] = cell
+
+    def remove(self, key: Hashable) -> bool:
+        '''
+        :param key: Point key.
+        :return: True if the key was indexed, False o.w.
+        '''
+        cell = self.__key_to_cell.pop(key, None)
+        if cell is None:
+            return False
+
+        points = self.__cells[cell]
+        points[:] = [point for point in points if point[0] != key]
+        if not points:
+            del self.__cells[cell]
+        return True
+
+    def any_within(self, geo: GeoLocation, radius: float) -> bool:
+        '''
+        :param geo: Center point.
+        :param radius: Radius.
+        :return: True if an indexed point is at distance <= radius from geo.
+        '''
+        for _ in self.__iter_within(geo, radius):
+            return True
+        return False
+
+    def within(self, geo: GeoLocation, radius: float) -> List[Hashable]:
+        '''
+        :param geo: Center point.
+        :param radius: Radius.
+        :return: Keys of the indexed points at distance <= radius from geo.
+        '''
+        return list(self.__iter_within(geo, radius))
+
+    def in_range(self, region: Range2D) -> List[Hashable]:
+        '''
+        :param region: x and y ranges, bounds included.
+        :return: Keys of the indexed points inside the region.
+        '''
+        x_range = region.x_range
+        y_range = region.y_range
+        res = []
+        for points in self.__iter_cells(x_range.min, x_range.max, y_range.min, y_range.max):
+            for key, x, y, _ in points:
+                if x_range.min <= x <= x_range.max and y_range.min <= y <= y_range.max:
+                    res.append(key)
+        return res
+
+    def __iter_within(self, geo: GeoLocation, radius: float) -> Iterator[Hashable]:
+        gx, gy, gz = geo.x, geo.y, geo.z
+        max_sq = radius * radius
+
+        for points in self.__iter_cells(gx - radius, gx + radius, gy - radius, gy + radius):
+            for key, x, y, z in points:
+                dx = x - gx
+                dy = y - gy
+                dz = z - gz
+                if dx * dx + dy * dy + dz * dz <= max_sq:
+                    yield key
+
+    def __iter_cells(self, min_x: float, max_x: float, min_y: float, max_y: float) -> Iterator[list]:
+        '''
+        Non empty cells overlapping the box, walks whichever is smaller of the box cells and the used cells.
+        '''
+        min_cx, min_cy = self.__cell_of(min_x, min_y)
+        max_cx, max_cy = self.__cell_of(max_x, max_y)
+
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.__cells):
+            for (cx, cy), points in self.__cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    yield points
+            return
+
+        cells = self.__cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                points = cells.get((cx, cy))
+                if points:
+                    yield points
+
+    def __cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.__cell_size), math.floor(y / self.__cell_size)
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from BinaryGraphFormat import BinaryGraphFormat
+from CSRGraph import CSRGraph
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+
+
+class TestBinaryGraphFormat(TestCase):
+    def setUp(self) -> None:
+        fd, self.file_name = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+
+    def tearDown(self) -> None:
+        os.remove(self.file_name)
+
+    def test_round_trip_matches_json(self):
+        for name in ("A0", "A1", "A2", "A3", "A4", "A5", "T0.json"):
+            algo = GraphAlgo()
+            self.assertTrue(algo.load_from_json("../data/{}".format(name)))
+            expected = algo.get_graph().to_dict()
+
+            self.assertTrue(algo.save_to_binary(self.file_name))
+            loaded = GraphAlgo()
+            self.assertTrue(loaded.load_from_binary(self.file_name))
+
+            self.assertIsInstance(loaded.get_graph(), DiGraph)
+            # As text, 1 == 1.0 but the JSON written differs.
+            self.assertEqual(json.dumps(expected), json.dumps(loaded.get_graph().to_dict()))
+
+    def test_extras(self):
+        g = DiGraph()
+        g.add_node(1, (1.5, 2, 3))
+        g.add_node(2)
+        g.add_node(3)
+        g.add_edge(1, 2, 4.5)
+        g.add_edge(2, 3, 1)
+        g.get_all_v()[1].info = "first"
+        g.get_all_v()[2].tag = 7
+        g.get_all_v()[3].weight = 0.5
+
+        BinaryGraphFormat.save(g, self.file_name)
+        loaded = BinaryGraphFormat.load(self.file_name)
+
+        self.assertEqual(g.to_dict(), loaded.to_dict())
+        self.assertIsNone(loaded.get_all_v()[2].geo_location)
+        self.assertEqual("first", loaded.get_all_v()[1].info)
+        self.assertEqual(g.get_mc(), loaded.get_mc())
+
+    def test_frozen(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/T0.json")
+        algo.save_to_binary(self.file_name)
+        frozen = BinaryGraphFormat.load(self.file_name, frozen=True)
+
+        self.assertIsInstance(frozen, CSRGraph)
+        self.assertEqual(json.dumps(algo.get_graph().to_dict()), json.dumps(frozen.to_dict()))
+        self.assertEqual(json.dumps(algo.get_graph().to_dict()), json.dumps(algo.get_graph().freeze().to_dict()))
+
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        g = algo.get_graph()
+        algo.save_to_binary(self.file_name)
+
+        frozen = BinaryGraphFormat.load(self.file_name, frozen=True)
+
+        self.assertIsInstance(frozen, CSRGraph)
+        self.assertEqual(json.dumps(g.to_dict()), json.dumps(frozen.to_dict()))
+        self.assertEqual(g.all_out_edges_of_node(14), frozen.all_out_edges_of_node(14))
+        self.assertEqual(g.all_in_edges_of_node(14), frozen.all_in_edges_of_node(14))
+
+        frozen_algo = GraphAlgo(frozen)
+        self.assertEqual(algo.shortest_path(0, 40), frozen_algo.shortest_path(0, 40))
+
+    def test_bad_magic(self):
+        with open(self.file_name, 'wb') as f:
+            f.write(b'\0' * 64)
+
+        with self.assertRaises(ValueError):
+            BinaryGraphFormat.load(self.file_name)
+        self.assertFalse(GraphAlgo().load_from_binary(self.file_name))
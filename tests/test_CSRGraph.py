@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+
+
+class TestCSRGraph(TestCase):
+    def build_graph(self) -> DiGraph:
+        g = DiGraph()
+        for n in range(4):
+            g.add_node(n)
+        g.add_edge(0, 1, 1)
+        g.add_edge(1, 0, 1.1)
+        g.add_edge(1, 2, 1.3)
+        g.add_edge(2, 3, 1.1)
+        g.add_edge(1, 3, 10)
+        return g
+
+    def test_from_graph(self):
+        g = self.build_graph()
+        frozen = g.freeze()
+
+        self.assertEqual(g.v_size(), frozen.v_size())
+        self.assertEqual(g.e_size(), frozen.e_size())
+        self.assertEqual(g.get_mc(), frozen.get_mc())
+
+        for n in g.get_all_v():
+            self.assertEqual(g.all_out_edges_of_node(n), frozen.all_out_edges_of_node(n))
+            self.assertEqual(g.all_in_edges_of_node(n), frozen.all_in_edges_of_node(n))
+
+    def test_buffers(self):
+        frozen = self.build_graph().freeze()
+
+        self.assertEqual([0, 1, 4, 5, 5], list(frozen.out_offsets))
+        self.assertEqual(len(frozen.out_dests), len(frozen.in_srcs))
+        self.assertEqual(sorted(frozen.out_weights), sorted(frozen.in_weights))
+        self.assertEqual(2, frozen.index_of(2))
+        self.assertIsNone(frozen.index_of(123))
+
+    def test_is_stale(self):
+        g = self.build_graph()
+        frozen = g.freeze()
+        self.assertFalse(frozen.is_stale())
+
+        g.add_edge(3, 0, 1)
+        self.assertTrue(frozen.is_stale())
+
+    def test_read_only(self):
+        frozen = self.build_graph().freeze()
+
+        self.assertFalse(frozen.add_node(5))
+        self.assertFalse(frozen.add_edge(3, 0, 1))
+        self.assertFalse(frozen.remove_node(0))
+        self.assertFalse(frozen.remove_edge(0, 1))
+        self.assertEqual((4, 5), (frozen.v_size(), frozen.e_size()))
+
+    def test_algorithms_on_snapshot(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        frozen_algo = GraphAlgo(algo.get_graph().freeze())
+
+        self.assertEqual(algo.shortest_path(47, 19), frozen_algo.shortest_path(47, 19))
+        self.assertEqual(algo.connected_components(), frozen_algo.connected_components())
+
+        algo.get_graph().remove_edge(13, 14)
+        with self.assertRaises(ValueError):
+            frozen_algo.shortest_path(47, 19)
+
+    def test_index_searches(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        algo.get_graph().remove_edge(13, 14)
+        frozen_algo = GraphAlgo(algo.get_graph().freeze())
+        keys = list(algo.get_graph().get_all_v().keys())
+
+        # Dijkstra and Tarjan run on the arrays of the snapshot, their results are those of the graph.
+        for src in keys:
+            for dest in keys:
+                stats = {}
+                frozen_stats = {}
+                self.assertEqual(algo.shortest_path(src, dest, stats=stats),
+                                 frozen_algo.shortest_path(src, dest, stats=frozen_stats))
+                self.assertEqual(stats, frozen_stats)
+        self.assertEqual(algo.connected_components(), frozen_algo.connected_components())
+        self.assertEqual(algo.is_strongly_connected(13, 14), frozen_algo.is_strongly_connected(13, 14))
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from ContractionHierarchy import ContractionHierarchy
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from test_GraphAlgo import assert_strategy_matches_dijkstra, grid
+
+
+class TestContractionHierarchy(TestCase):
+    def test_query(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        g = algo.get_graph()
+        g.remove_edge(13, 14)
+        ch = ContractionHierarchy.build(g, float('inf'))
+
+        self.assertEqual(0, ch.core_size)
+        self.assertEqual(g.get_mc(), ch.mc)
+        # The shortcuts are unpacked into edges of the graph.
+        algo.preprocess_contraction_hierarchy(float('inf'))
+        assert_strategy_matches_dijkstra(self, algo, GraphAlgo.SHORTEST_PATH_CH)
+
+    def test_core(self):
+        g = grid(12, False)
+        full = ContractionHierarchy.build(g, float('inf'))
+        cored = ContractionHierarchy.build(g, 4)
+        # Nothing contracted, the query is a bidirectional Dijkstra.
+        uncontracted = ContractionHierarchy.build(g, 0)
+
+        self.assertEqual(0, full.core_size)
+        self.assertTrue(0 < cored.core_size < g.v_size())
+        self.assertEqual((g.v_size(), 0), (uncontracted.core_size, uncontracted.shortcuts))
+        for core_degree in (float('inf'), 4, 0):
+            algo = GraphAlgo(g)
+            algo.preprocess_contraction_hierarchy(core_degree)
+            assert_strategy_matches_dijkstra(self, algo, GraphAlgo.SHORTEST_PATH_CH)
+
+    def test_settles_few_nodes(self):
+        g = grid(30, False)
+        ch = ContractionHierarchy.build(g, float('inf'))
+        algo = GraphAlgo(g)
+        stats = {}
+        ch_stats = {}
+
+        self.assertAlmostEqual(algo.shortest_path(0, 899, stats=stats)[0], ch.query(0, 899, ch_stats)[0])
+        self.assertLess(ch_stats['settled'] * 3, stats['settled'])
+
+    def test_no_path(self):
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(4))
+        g.add_edge(0, 1, 1)
+        g.add_edge(1, 2, 1)
+        stats = {}
+        ch = ContractionHierarchy.build(g)
+
+        self.assertEqual((2, [0, 1, 2]), ch.query(0, 2))
+        self.assertEqual((0, [3]), ch.query(3, 3))
+        self.assertEqual((float('inf'), []), ch.query(2, 0))
+        self.assertEqual((float('inf'), []), ch.query(0, 3))
+        self.assertEqual((float('inf'), []), ch.query(0, 7, stats))
+        self.assertEqual(0, stats['settled'])
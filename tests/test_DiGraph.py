@@ -1,6 +1,9 @@
 from unittest import TestCase
 
 from DiGraph import DiGraph
+from Edge import Edge
+from GraphElement import GraphElement
+from GraphListener import GraphListener
 from Node import Node
 
 
@@ -27,6 +30,27 @@ class TestDiGraph(TestCase):
         self.assertEqual(node.info, "0")
         self.assertEqual(len(g.all_out_edges_of_node(1)), 3)
 
+    def test_from_elements_edges_first(self):
+        elements = [(GraphElement.EDGE, {"src": 0, "dest": 1, "w": 2}),
+                    (GraphElement.NODE, {"id": 0}),
+                    (GraphElement.NODE, {"id": 1}),
+                    (GraphElement.MODE_COUNT, 17)]
+
+        g = DiGraph.from_elements(elements)
+        self.assertEqual(2, g.v_size())
+        self.assertEqual(1, g.e_size())
+        self.assertEqual({1: 2}, g.all_out_edges_of_node(0))
+        self.assertEqual(17, g.get_mc())
+
+    def test_from_elements_unknown_node(self):
+        elements = [(GraphElement.NODE, {"id": 0}),
+                    (GraphElement.NODE, {"id": 1}),
+                    (GraphElement.EDGE, {"src": 0, "dest": 1, "w": 2}),
+                    (GraphElement.EDGE, {"src": 1, "dest": 5, "w": 2})]
+
+        with self.assertRaises(ValueError):
+            DiGraph.from_elements(elements)
+
     def test_to_dict(self):
         g = DiGraph()
         g.add_node(1, (1, 2, 3))
@@ -82,6 +106,29 @@ class TestDiGraph(TestCase):
         self.assertEqual(len(out_e), 1)
         self.assertTrue(2 in out_e)
 
+    def test_in_neighbours(self):
+        g = DiGraph()
+        g.add_node(1, (1, 2, 3))
+        g.add_node(2, (3, 2, 1))
+        g.add_node(3, (3, 2, 1))
+        g.add_edge(1, 2, 4)
+        g.add_edge(3, 2, 5)
+
+        self.assertEqual(g.all_in_edges_of_node(2), dict(g.in_neighbours(2)))
+        self.assertEqual([], list(g.in_neighbours(1)))
+
+    def test_out_neighbours(self):
+        g = DiGraph()
+        g.add_node(1, (1, 2, 3))
+        g.add_node(2, (3, 2, 1))
+        g.add_node(3, (3, 2, 1))
+        g.add_edge(1, 2, 4)
+        g.add_edge(1, 3, 5)
+
+        self.assertEqual([(2, 4), (3, 5)], list(g.out_neighbours(1)))
+        self.assertEqual(g.all_out_edges_of_node(1), dict(g.out_neighbours(1)))
+        self.assertEqual([], list(g.out_neighbours(2)))
+
     def test_get_mc(self):
         g = DiGraph()
         self.assertEqual(0, g.get_mc())
@@ -113,6 +160,56 @@ class TestDiGraph(TestCase):
         added = g.add_node(1, (1, 2, 3))
         self.assertFalse(added)
 
+    def test_add_nodes_from(self):
+        g = DiGraph()
+        g.add_node(1)
+
+        added = g.add_nodes_from([(1, None), (2, (1, 2, 3)), Node(3), (4, None)])
+        self.assertEqual(3, added)
+        self.assertEqual(4, g.v_size())
+        self.assertEqual(2, g.get_mc())
+        self.assertEqual(3, g.get_all_v()[2].geo_location.z)
+
+        self.assertEqual(0, g.add_nodes_from([(4, None)]))
+        self.assertEqual(2, g.get_mc())
+
+        with self.assertRaises(ValueError):
+            g.add_nodes_from([(5, None), (6, (1, 2))])
+        with self.assertRaises(ValueError):
+            g.add_nodes_from([("7", None)])
+        self.assertEqual(4, g.v_size())
+
+    def test_add_edges_from(self):
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(4))
+
+        added = g.add_edges_from([(0, 1, 1.5), (1, 2, 2), (1, 2, 7), (2, 2, 1), (3, 9, 1), Edge(2, 3, 0.5)])
+        self.assertEqual(3, added)
+        self.assertEqual(3, g.e_size())
+        self.assertEqual(2, g.get_mc())
+        self.assertEqual({2: 2}, g.all_out_edges_of_node(1))
+        self.assertEqual({2: 0.5}, g.all_in_edges_of_node(3))
+
+        with self.assertRaises(ValueError):
+            g.add_edges_from([(3, 0, 1), (0, 3)])
+        with self.assertRaises(ValueError):
+            g.add_edges_from([(3, 0, "1")])
+        self.assertEqual(3, g.e_size())
+
+    def test_add_edges_from_listeners(self):
+        events = []
+
+        class Recorder(GraphListener):
+            def on_edge_added(self, id1, id2, weight):
+                events.append((id1, id2, g.e_size(), g.get_mc()))
+
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(3))
+        g.add_listener(Recorder())
+        g.add_edges_from([(0, 1, 1), (1, 2, 1)])
+
+        self.assertEqual([(0, 1, 1, 2), (1, 2, 2, 2)], events)
+
     def test_remove_node(self):
         g = DiGraph()
         g.add_node(1, (1, 2, 3))
@@ -121,6 +218,48 @@ class TestDiGraph(TestCase):
         removed = g.remove_node(1)
         self.assertFalse(removed)
 
+    def test_remove_node_with_edges(self):
+        g = DiGraph()
+        for n in range(3):
+            g.add_node(n)
+        g.add_edge(0, 1, 1)
+        g.add_edge(2, 0, 1)
+
+        self.assertTrue(g.remove_node(0))
+        self.assertEqual(0, g.e_size())
+        self.assertEqual({}, g.all_out_edges_of_node(2))
+        self.assertEqual({}, g.all_in_edges_of_node(1))
+
+    def test_listeners(self):
+        events = []
+
+        class Recorder(GraphListener):
+            def on_node_added(self, node_id):
+                events.append(('node_added', node_id))
+
+            def on_node_removed(self, node_id):
+                events.append(('node_removed', node_id))
+
+            def on_edge_added(self, id1, id2, weight):
+                events.append(('edge_added', id1, id2, weight))
+
+            def on_edge_removed(self, id1, id2):
+                events.append(('edge_removed', id1, id2))
+
+        g = DiGraph()
+        recorder = Recorder()
+        g.add_listener(recorder)
+        g.add_node(1)
+        g.add_node(2)
+        g.add_edge(1, 2, 3)
+        g.add_edge(1, 2, 3)
+        g.remove_node(2)
+        g.remove_listener(recorder)
+        g.add_node(3)
+
+        self.assertEqual([('node_added', 1), ('node_added', 2), ('edge_added', 1, 2, 3),
+                          ('edge_removed', 1, 2), ('node_removed', 2)], events)
+
     def test_remove_edge(self):
         g = DiGraph()
         g.add_node(1, (1, 2, 3))
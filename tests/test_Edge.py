@@ -59,3 +59,10 @@ class TestEdge(TestCase):
         self.assertEqual(e.weight, data.get('weight'))
         self.assertEqual(e.info, data.get('info'))
         self.assertEqual(e.tag, data.get('tag'))
+
+    def test_slots(self):
+        e = Edge(1, 2, 3)
+        self.assertFalse(hasattr(e, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            e.color = "red"
@@ -0,0 +1,74 @@
+import math
+from unittest import TestCase
+
+from DiGraph import DiGraph
+from ForceDirectedLayout import ForceDirectedLayout
+from GraphAlgo import GraphAlgo
+
+
+class TestForceDirectedLayout(TestCase):
+    def test_positions_every_node(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        g = DiGraph()
+        g.add_nodes_from((node_id, None) for node_id in algo.get_graph().get_all_v())
+
+        self.assertEqual(g.v_size(), ForceDirectedLayout(g).run())
+        self.assertTrue(all(n.geo_location is not None for n in g.get_all_v().values()))
+        self.assertEqual(0, ForceDirectedLayout(g).run())
+
+    def test_pinned_nodes_stay(self):
+        g = DiGraph()
+        g.add_node(0, (0, 0, 0))
+        g.add_node(1, (10, 5, 0))
+        for n in range(2, 30):
+            g.add_node(n)
+            g.add_edge(n, n % 2, 1)
+
+        ForceDirectedLayout(g, iterations=20).run()
+
+        self.assertEqual("0.0,0.0,0.0", repr(g.get_all_v()[0].geo_location))
+        self.assertEqual("10.0,5.0,0.0", repr(g.get_all_v()[1].geo_location))
+
+    def test_seed(self):
+        def layout(seed):
+            g = DiGraph()
+            g.add_nodes_from((n, None) for n in range(50))
+            g.add_edges_from((n, (n * 7) % 50, 1) for n in range(50))
+            ForceDirectedLayout(g, seed=seed).run()
+            return [repr(n.geo_location) for n in g.get_all_v().values()]
+
+        self.assertEqual(layout(3), layout(3))
+        self.assertNotEqual(layout(3), layout(4))
+
+    def test_edges_shorter_than_average(self):
+        # Two rings joined by a single edge.
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(40))
+        g.add_edges_from((n, (n + 1) % 20, 1) for n in range(20))
+        g.add_edges_from((20 + n, 20 + (n + 1) % 20, 1) for n in range(20))
+        g.add_edge(0, 20, 1)
+        ForceDirectedLayout(g, iterations=100).run()
+
+        nodes = g.get_all_v()
+        edge_lengths = [nodes[a].geo_location.distance(nodes[b].geo_location)
+                        for a in nodes for b, _ in g.out_neighbours(a)]
+        all_lengths = [nodes[a].geo_location.distance(nodes[b].geo_location)
+                       for a in nodes for b in nodes if a < b]
+
+        self.assertLess(sum(edge_lengths) / len(edge_lengths), sum(all_lengths) / len(all_lengths) / 2)
+        self.assertTrue(all(math.isfinite(n.geo_location.x) for n in nodes.values()))
+
+    def test_long_chain(self):
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(20000))
+        g.add_edges_from((n, n + 1, 1) for n in range(19999))
+
+        GraphAlgo(g).set_missing_positions(GraphAlgo.LAYOUT_FORCE_DIRECTED, iterations=5)
+        self.assertTrue(all(n.geo_location is not None for n in g.get_all_v().values()))
+
+    def test_layout_param(self):
+        with self.assertRaises(ValueError):
+            GraphAlgo(DiGraph()).set_missing_positions("circular")
+        with self.assertRaises(ValueError):
+            ForceDirectedLayout(DiGraph(), iterations=-1)
@@ -1,10 +1,65 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 
 from DiGraph import DiGraph
 from GraphAlgo import GraphAlgo
+from location.GeoLocation import GeoLocation
+
+
+def grid(side: int, positioned: bool) -> DiGraph:
+    '''
+    A side x side grid, like roads: node y * side + x, unit weight edges both ways between the nodes next to each
+    other.
+    :param positioned: If True node y * side + x is at (x, y, 0), o.w. the nodes have no position.
+    '''
+    g = DiGraph()
+    g.add_nodes_from((y * side + x, (x, y, 0) if positioned else None) for y in range(side) for x in range(side))
+    g.add_edges_from((y * side + x, y * side + x + 1, 1) for y in range(side) for x in range(side - 1))
+    g.add_edges_from((y * side + x + 1, y * side + x, 1) for y in range(side) for x in range(side - 1))
+    g.add_edges_from((y * side + x, (y + 1) * side + x, 1) for y in range(side - 1) for x in range(side))
+    g.add_edges_from(((y + 1) * side + x, y * side + x, 1) for y in range(side - 1) for x in range(side))
+    return g
+
+
+def assert_strategy_matches_dijkstra(test: TestCase, algo: GraphAlgo, strategy: str):
+    '''
+    Compares a shortest path strategy with plain Dijkstra from every node to every third node: the same distance,
+    and a path made of edges of the graph that adds up to it.
+    '''
+    g = algo.get_graph()
+    keys = list(g.get_all_v().keys())
+    for src in keys:
+        for dest in keys[::3]:
+            dist, _ = algo.shortest_path(src, dest)
+            strategy_dist, path = algo.shortest_path(src, dest, strategy)
+            test.assertAlmostEqual(dist, strategy_dist)
+            if dist == float('inf'):
+                test.assertEqual([], path)
+                continue
+
+            test.assertEqual((src, dest), (path[0], path[-1]))
+            test.assertAlmostEqual(strategy_dist, sum(g.all_out_edges_of_node(a)[b] for a, b in zip(path, path[1:])))
 
 
 class TestGraphAlgo(TestCase):
+    def test_import_does_not_load_matplotlib(self):
+        # Only src/ on the path, importing must not depend on the working directory either.
+        src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+        env = dict(os.environ, PYTHONPATH=src_dir)
+        res = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import GraphAlgo'],
+                             env=env, cwd=src_dir, stderr=subprocess.PIPE, universal_newlines=True)
+
+        self.assertEqual(0, res.returncode, res.stderr)
+        imported = [line.rsplit('|', 1)[-1].strip() for line in res.stderr.splitlines() if line.startswith('import time:')]
+        self.assertIn('GraphAlgo', imported)
+        self.assertFalse([m for m in imported if m.startswith('matplotlib')])
+
     def test_get_graph(self):
         g = DiGraph()
         algo = GraphAlgo()
@@ -21,6 +76,16 @@ class TestGraphAlgo(TestCase):
         self.assertEqual(11, algo.get_graph().v_size())
         self.assertEqual(22, algo.get_graph().e_size())
 
+    def test_load_from_json_unknown_node(self):
+        algo = GraphAlgo()
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "corrupt.json")
+            with open(file_name, 'w') as f:
+                json.dump({"Nodes": [{"id": 0}, {"id": 1}], "Edges": [{"src": 0, "dest": 1, "w": 1},
+                                                                    {"src": 0, "dest": 2, "w": 1}]}, f)
+
+            self.assertFalse(algo.load_from_json(file_name))
+
     def test_save_to_json(self):
         algo = GraphAlgo()
         loaded = algo.load_from_json("../data/A0")
@@ -45,6 +110,205 @@ class TestGraphAlgo(TestCase):
         self.assertEqual(dist, float('inf'))
         self.assertEqual(path, [])
 
+        dist, path = algo.shortest_path(8888887, 0)
+        self.assertEqual(dist, float('inf'))
+        self.assertEqual(path, [])
+
+    def test_shortest_path_stops_at_target(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        algo.get_graph().remove_edge(13, 14)
+
+        dist, path = algo.shortest_path(47, 19)
+        self.assertAlmostEqual(17.693921758901507, dist)
+        self.assertEqual([47, 46, 44, 43, 42, 41, 40, 39, 15, 16, 17, 18, 19], path)
+
+        dist, path = algo.shortest_path(20, 2)
+        self.assertAlmostEqual(11.51061380461898, dist)
+        self.assertEqual([20, 21, 32, 31, 30, 29, 14, 13, 3, 2], path)
+
+        self.assertEqual((0.0, [5]), algo.shortest_path(5, 5))
+
+    def test_shortest_path_keeps_node_data(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A0")
+        for n in algo.get_graph().get_all_v().values():
+            n.info = "user data"
+            n.tag = 7
+
+        algo.shortest_path(0, 7)
+
+        for n in algo.get_graph().get_all_v().values():
+            self.assertEqual("user data", n.info)
+            self.assertEqual(7, n.tag)
+
+    def test_shortest_path_concurrent(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        queries = [(1, 7), (47, 19), (20, 2), (2, 20)] * 25
+        expected = [algo.shortest_path(*q) for q in queries]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda q: algo.shortest_path(*q), queries))
+
+        self.assertEqual(expected, results)
+
+    def test_shortest_path_bidirectional(self):
+        for file_name in ("../data/A0", "../data/A3", "../data/A5"):
+            algo = GraphAlgo()
+            algo.load_from_json(file_name)
+            algo.get_graph().remove_edge(13, 14)
+            assert_strategy_matches_dijkstra(self, algo, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL)
+
+        self.assertEqual((0.0, [5]), algo.shortest_path(5, 5, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL))
+        self.assertEqual((float('inf'), []), algo.shortest_path(5, 8888887, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL))
+
+        # No path back to a node without in edges.
+        algo.get_graph().add_node(100)
+        algo.get_graph().add_edge(100, 0, 1)
+        self.assertEqual((float('inf'), []), algo.shortest_path(0, 100, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL))
+
+        with self.assertRaises(ValueError):
+            algo.shortest_path(0, 1, "bfs")
+
+    def test_shortest_path_stats(self):
+        # The two searches each cover a disk of half the radius, half the nodes of one search.
+        side = 41
+        algo = GraphAlgo(grid(side, False))
+        src = 20 * side + 5
+        dest = 20 * side + 35
+
+        stats = {}
+        self.assertEqual(30, algo.shortest_path(src, dest, stats=stats)[0])
+        settled = stats['settled']
+        self.assertEqual(30, algo.shortest_path(src, dest, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL, stats)[0])
+        self.assertLess(stats['settled'], settled * 0.75)
+
+    def test_shortest_path_a_star(self):
+        for file_name in ("../data/A0", "../data/A3", "../data/A5"):
+            algo = GraphAlgo()
+            algo.load_from_json(file_name)
+            assert_strategy_matches_dijkstra(self, algo, GraphAlgo.SHORTEST_PATH_A_STAR)
+
+    def test_shortest_path_a_star_settles_less(self):
+        side = 41
+        g = grid(side, True)
+        algo = GraphAlgo(g)
+        src = 20 * side + 5
+        dest = 20 * side + 35
+
+        stats = {}
+        self.assertEqual(30, algo.shortest_path(src, dest, stats=stats)[0])
+        settled = stats['settled']
+        self.assertEqual(30, algo.shortest_path(src, dest, GraphAlgo.SHORTEST_PATH_A_STAR, stats)[0])
+        self.assertLess(stats['settled'], settled / 4)
+
+        # Moved far from its neighbours, the node on the straight path looks far from dest unless the scale is
+        # computed again.
+        g.get_all_v()[src + 1].geo_location = GeoLocation(5, 100, 0)
+        self.assertEqual(30, algo.shortest_path(src, dest, GraphAlgo.SHORTEST_PATH_A_STAR)[0])
+
+        # A node without a position, the heuristic no longer holds and the search is plain Dijkstra again.
+        g.add_node(-1)
+        g.add_edge(src, -1, 0.5)
+        g.add_edge(-1, dest, 0.5)
+        self.assertEqual((1, [src, -1, dest]), algo.shortest_path(src, dest, GraphAlgo.SHORTEST_PATH_A_STAR, stats))
+
+    def test_shortest_path_alt(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        g = algo.get_graph()
+        g.remove_edge(13, 14)
+
+        self.assertEqual(4, len(algo.preprocess_landmarks(4)))
+        assert_strategy_matches_dijkstra(self, algo, GraphAlgo.SHORTEST_PATH_ALT)
+
+        # The tables are built again for the changed graph.
+        g.add_edge(47, 19, 0.5)
+        self.assertEqual((0.5, [47, 19]), algo.shortest_path(47, 19, GraphAlgo.SHORTEST_PATH_ALT))
+
+    def test_shortest_path_ch(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        g = algo.get_graph()
+
+        self.assertGreater(algo.preprocess_contraction_hierarchy(float('inf')), 0)
+        assert_strategy_matches_dijkstra(self, algo, GraphAlgo.SHORTEST_PATH_CH)
+
+        # The hierarchy is built again for the changed graph.
+        g.add_edge(47, 19, 0.5)
+        self.assertEqual((0.5, [47, 19]), algo.shortest_path(47, 19, GraphAlgo.SHORTEST_PATH_CH))
+
+    def test_shortest_path_tree(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        g = algo.get_graph()
+        tree = algo.shortest_path_tree(1)
+        stats = {}
+
+        self.assertIs(tree, algo.shortest_path_tree(1))
+        for dest in g.get_all_v().keys():
+            self.assertEqual((tree.distance_to(dest), tree.path_to(dest)),
+                             algo.shortest_path(1, dest, GraphAlgo.SHORTEST_PATH_BIDIRECTIONAL, stats))
+            # Answered from the tree.
+            self.assertEqual(0, stats['settled'])
+
+        with self.assertRaises(ValueError):
+            algo.shortest_path_tree(100)
+
+        # Only the last few sources are kept, the least recently used goes first.
+        trees = [algo.shortest_path_tree(src) for src in range(2, 10)]
+        self.assertIsNot(tree, algo.shortest_path_tree(1))
+        self.assertIs(trees[-1], algo.shortest_path_tree(9))
+
+        # A changed graph gets new trees.
+        g.add_edge(1, 40, 0.5)
+        self.assertEqual(0.5, algo.shortest_path(1, 40, stats=stats)[0])
+        self.assertGreater(stats['settled'], 0)
+        self.assertEqual([1, 40], algo.shortest_path_tree(1).path_to(40))
+
+    def test_landmarks_next_to_json(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "A5.json")
+            tables = file_name + ".landmarks.npz"
+
+            # Nothing to save before the tables are built.
+            algo.save_to_json(file_name)
+            self.assertFalse(os.path.exists(tables))
+
+            landmarks = algo.preprocess_landmarks(3)
+            algo.save_to_json(file_name)
+            self.assertTrue(os.path.exists(tables))
+
+            loaded = GraphAlgo()
+            loaded.load_from_json(file_name)
+            stats = {}
+            self.assertEqual(algo.shortest_path(1, 40), loaded.shortest_path(1, 40, GraphAlgo.SHORTEST_PATH_ALT, stats))
+            self.assertEqual(landmarks, loaded.preprocess_landmarks(3))
+
+            # Weights edited in the file, its modeCount left as is: the old tables would overestimate.
+            algo.preprocess_landmarks(4)
+            algo.save_to_json(file_name)
+            with open(file_name) as f:
+                data = json.load(f)
+            for links in data['links'].values():
+                for link in links.values():
+                    link['weight'] /= 10
+            with open(file_name, 'w') as f:
+                json.dump(data, f)
+            edited = GraphAlgo()
+            edited.load_from_json(file_name)
+            assert_strategy_matches_dijkstra(self, edited, GraphAlgo.SHORTEST_PATH_ALT)
+
+            # Saving the changed graph drops the tables of the old one.
+            loaded = GraphAlgo()
+            loaded.load_from_json(file_name)
+            loaded.get_graph().remove_node(1)
+            loaded.save_to_json(file_name)
+            self.assertFalse(os.path.exists(tables))
 
     def test_connected_component(self):
         new_id = 123123
@@ -55,6 +319,19 @@ class TestGraphAlgo(TestCase):
         self.assertEqual(1, len(algo.connected_component(new_id)))
         self.assertEqual(48, len(algo.connected_component(1)))
 
+    def test_connected_component_matches_components(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        algo.get_graph().remove_edge(13, 14)
+        algo.get_graph().add_node(123123)
+
+        sccs = algo.connected_components()
+        for scc in sccs:
+            for node_id in scc:
+                self.assertEqual(sorted(scc), sorted(algo.connected_component(node_id)))
+
+        self.assertEqual([], algo.connected_component(8888887))
+
     def test_connected_components(self):
         algo = GraphAlgo()
         loaded = algo.load_from_json("../data/A5")
@@ -63,12 +340,111 @@ class TestGraphAlgo(TestCase):
         sccs = algo.connected_components()
         self.assertEqual(len(sccs), 2)
 
+    def test_connected_components_deep_path(self):
+        num_nodes = 100000
+        g = DiGraph()
+        for n in range(num_nodes):
+            g.add_node(n)
+        for n in range(num_nodes - 1):
+            g.add_edge(n, n + 1, 1)
+
+        algo = GraphAlgo(g)
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(1000)
+        try:
+            sccs = algo.connected_components()
+            self.assertEqual(num_nodes, len(sccs))
+            self.assertEqual([num_nodes - 1], sccs[0])
+
+            g.add_edge(num_nodes - 1, 0, 1)
+            sccs = algo.connected_components()
+            self.assertEqual([list(range(num_nodes))], sccs)
+            self.assertEqual(num_nodes, len(algo.connected_component(num_nodes // 2)))
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+    def test_connected_components_cache(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+
+        sccs = algo.connected_components()
+        self.assertEqual(1, len(sccs))
+        sccs[0].clear()
+        self.assertEqual(48, len(algo.connected_components()[0]))
+
+        algo.get_graph().remove_edge(13, 14)
+        self.assertEqual(2, len(algo.connected_components()))
+
+        algo.get_graph().add_edge(13, 14, 1)
+        self.assertEqual(48, len(algo.connected_component(1)))
+        self.assertEqual(48, len(algo.connected_component(2)))
+
+    def test_is_strongly_connected(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        algo.get_graph().add_node(123123)
+
+        self.assertTrue(algo.is_strongly_connected(1, 47))
+        self.assertFalse(algo.is_strongly_connected(1, 123123))
+        self.assertFalse(algo.is_strongly_connected(1, 8888887))
+
+        algo.get_graph().add_edge(123123, 1, 1)
+        algo.get_graph().add_edge(1, 123123, 1)
+        self.assertTrue(algo.is_strongly_connected(1, 123123))
+
+    def test_condensation(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        algo.get_graph().remove_edge(13, 14)
+        algo.get_graph().add_node(123123)
+        algo.get_graph().add_edge(123123, 1, 5)
+        algo.get_graph().add_edge(123123, 2, 3)
+
+        condensation = algo.condensation()
+        sccs = algo.connected_components()
+
+        self.assertEqual(sccs, condensation.members)
+        self.assertEqual(3, condensation.graph.v_size())
+        self.assertEqual(2, condensation.graph.e_size())
+
+        new_component = condensation.component_of(123123)
+        self.assertEqual([123123], condensation.members_of(new_component))
+        self.assertEqual({condensation.component_of(1): 3}, condensation.graph.all_out_edges_of_node(new_component))
+        self.assertIsNone(condensation.component_of(8888887))
+
+    def test_condensation_min_weights(self):
+        rnd = random.Random(7)
+        g = DiGraph()
+        for n in range(30):
+            g.add_node(n)
+        for _ in range(60):
+            g.add_edge(rnd.randrange(30), rnd.randrange(30), rnd.random())
+
+        condensation = GraphAlgo(g).condensation()
+
+        expected = {}
+        for src in g.get_all_v():
+            for dest, weight in g.out_neighbours(src):
+                c_src, c_dest = condensation.component_of(src), condensation.component_of(dest)
+                if c_src != c_dest:
+                    expected[(c_src, c_dest)] = min(weight, expected.get((c_src, c_dest), float('inf')))
+                    # Tarjan completes successor components first.
+                    self.assertLess(c_dest, c_src)
+
+        actual = {(c, other): w for c in condensation.graph.get_all_v()
+                  for other, w in condensation.graph.out_neighbours(c)}
+        self.assertEqual(expected, actual)
+
     def test_set_missing_positions(self):
         algo = GraphAlgo()
         loaded = algo.load_from_json("../data/A5")
         algo.get_graph().add_node(123123)
         algo.get_graph().add_node(131313)
+        held = algo.get_graph().get_all_v()[0].geo_location
         algo.set_missing_positions()
 
         for n in algo.get_graph().get_all_v().values():
             self.assertIsNotNone(n.geo_location)
+        # The graph is not switched to a position array, the locations held by the caller stay the node ones.
+        self.assertIsNone(algo.get_graph().position_store)
+        self.assertIs(held, algo.get_graph().get_all_v()[0].geo_location)
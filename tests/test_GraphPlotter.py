@@ -0,0 +1,170 @@
+import matplotlib
+
+matplotlib.use('Agg')
+
+import gc
+import matplotlib.pyplot as plt
+import os
+import tempfile
+import tracemalloc
+from unittest import TestCase
+from matplotlib.collections import LineCollection
+from matplotlib.text import Annotation
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from GraphPlotter import GraphPlotter
+from GraphViewport import GraphViewport
+from location.GeoLocation import GeoLocation
+from location.Range import Range
+from location.Range2D import Range2D
+
+
+class TestGraphPlotter(TestCase):
+    def setUp(self) -> None:
+        self.g = DiGraph()
+        for n in range(30):
+            self.g.add_node(n, (n % 6, n // 6, 0))
+        self.g.add_node(30)
+        for n in range(30):
+            self.g.add_edge(n, (n + 1) % 30, 1)
+            self.g.add_edge(n, 0, 1)
+        self.g.add_edge(5, 30, 1)
+
+        self.fig, self.ax = plt.subplots()
+
+    def tearDown(self) -> None:
+        plt.close(self.fig)
+
+    def labels(self) -> list:
+        return [t for t in self.ax.texts if not isinstance(t, Annotation)]
+
+    def test_batched(self):
+        GraphPlotter(self.g, GraphPlotter.RENDER_BATCHED, max_labels=5).draw(self.ax)
+
+        collections = [c for c in self.ax.collections if isinstance(c, LineCollection)]
+        self.assertEqual(1, len(collections))
+        # The edge to the node without a position is skipped.
+        self.assertEqual(self.g.e_size() - 1, len(collections[0].get_segments()))
+        self.assertEqual(5, len(self.ax.texts))
+        # Node 0 has the highest degree.
+        self.assertIn('0', [t.get_text() for t in self.ax.texts])
+        self.fig.canvas.draw()
+
+    def test_detailed(self):
+        GraphPlotter(self.g, GraphPlotter.RENDER_DETAILED).draw(self.ax)
+
+        self.assertEqual(30, len(self.labels()))
+        self.assertEqual(self.g.e_size() - 1, len([t for t in self.ax.texts if isinstance(t, Annotation)]))
+
+    def test_auto_and_no_labels(self):
+        GraphPlotter(self.g, max_labels=0).draw(self.ax)
+        self.assertEqual(30, len(self.labels()))
+
+        self.ax.clear()
+        self.g.enable_position_array()
+        GraphPlotter(self.g, GraphPlotter.RENDER_BATCHED, max_labels=0).draw(self.ax)
+        self.assertEqual(0, len(self.ax.texts))
+
+        with self.assertRaises(ValueError):
+            GraphPlotter(self.g, "3d")
+
+    def test_render_bytes(self):
+        png = GraphPlotter(self.g).render(figsize=(4, 3), dpi=50)
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        # Width and height in the IHDR chunk.
+        self.assertEqual(200, int.from_bytes(png[16:20], 'big'))
+        self.assertEqual(150, int.from_bytes(png[20:24], 'big'))
+
+        svg = GraphPlotter(self.g).render(fmt='svg', region=Range2D(Range(0, 2), Range(0, 2)))
+        self.assertIn(b'<svg', svg)
+
+    def test_render_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "graph.svg")
+            self.assertIsNone(GraphAlgo(self.g).render_graph(file_name))
+            with open(file_name, 'rb') as f:
+                self.assertIn(b'<svg', f.read())
+
+    def test_render_reuses_figure(self):
+        figures = plt.get_fignums()
+        plotter = GraphPlotter(self.g, GraphPlotter.RENDER_BATCHED)
+        plotter.render(figsize=(3, 3), dpi=40)
+
+        tracemalloc.start()
+        plotter.render(figsize=(3, 3), dpi=40)
+        # The cleared artists are reference cycles, collect them before measuring.
+        gc.collect()
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(20):
+            plotter.render(figsize=(3, 3), dpi=40)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # No pyplot figures are opened and memory does not grow with the renders.
+        self.assertEqual(figures, plt.get_fignums())
+        self.assertLess(after - before, 512 * 1024)
+
+    def test_viewport_select(self):
+        viewport = GraphViewport(self.g)
+        # Node 30 has no position.
+        self.assertEqual(30, len(viewport.keys))
+        self.assertEqual(self.g.e_size() - 1, len(viewport.src))
+
+        nodes, edges = viewport.select(Range2D(Range(-0.5, 1.5), Range(-0.5, 0.5)))
+        self.assertEqual([0, 1], [viewport.keys[i] for i in nodes])
+        # The edges into node 0, 0 -> 1 and 1 -> 2. 5 -> 6 has its bounding box in the region, not its line.
+        self.assertEqual(31, len(edges))
+        self.assertNotIn((5, 6), [(viewport.keys[viewport.src[i]], viewport.keys[viewport.dest[i]]) for i in edges])
+
+        self.assertTrue(viewport.is_current())
+        self.g.add_edge(3, 5, 1)
+        self.assertFalse(viewport.is_current())
+
+    def test_draw_region(self):
+        region = Range2D(Range(3.5, 5.5), Range(3.5, 4.5))
+        GraphPlotter(self.g, GraphPlotter.RENDER_BATCHED).draw(self.ax, region)
+
+        self.assertEqual(['28', '29'], sorted(t.get_text() for t in self.ax.texts))
+        self.assertEqual((3.5, 5.5), self.ax.get_xlim())
+        self.assertEqual((3.5, 4.5), self.ax.get_ylim())
+
+    def test_draw_moved_node(self):
+        region = Range2D(Range(3.5, 5.5), Range(3.5, 4.5))
+        plotter = GraphPlotter(self.g, GraphPlotter.RENDER_BATCHED)
+        plotter.draw(self.ax, region)
+        viewport = GraphViewport(self.g)
+
+        # Moving a node leaves the MC as is, the kept viewport is taken again all the same.
+        self.g.get_all_v()[0].geo_location = GeoLocation(5, 4, 0)
+        self.assertFalse(viewport.is_current())
+        self.ax.clear()
+        plotter.draw(self.ax, region)
+
+        self.assertEqual(['0', '28', '29'], sorted(t.get_text() for t in self.ax.texts))
+
+    def test_render_tiles(self):
+        g = DiGraph()
+        # Two far apart clusters, most of the plane is empty.
+        for n in range(20):
+            g.add_node(n, (n % 5 + (0 if n < 10 else 1000), n // 5 + (0 if n < 10 else 1000), 0))
+        for n in range(19):
+            if (n < 10) == (n + 1 < 10):
+                g.add_edge(n, n + 1, 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            written = GraphAlgo(g).render_tiles(tmp, 3, tile_size=64)
+            files = sorted(os.path.relpath(os.path.join(root, f), tmp).replace(os.sep, '/')
+                           for root, _, names in os.walk(tmp) for f in names)
+
+            self.assertEqual(len(files), written)
+            self.assertIn('0/0/0.png', files)
+            # Only the tiles of the two clusters, not the 4 ** 3 tiles of the level.
+            self.assertEqual(2, len([f for f in files if f.startswith('3/')]))
+            with open(os.path.join(tmp, files[0]), 'rb') as f:
+                png = f.read()
+            self.assertEqual(64, int.from_bytes(png[16:20], 'big'))
+
+        with self.assertRaises(ValueError):
+            GraphPlotter(g).render_tiles("tiles", -1)
@@ -0,0 +1,79 @@
+import random
+from unittest import TestCase
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from IncrementalSCC import IncrementalSCC
+
+
+def canonical(sccs: list) -> list:
+    return sorted(sorted(scc) for scc in sccs)
+
+
+class TestIncrementalSCC(TestCase):
+    def test_merge_on_cycle(self):
+        g = DiGraph()
+        for n in range(4):
+            g.add_node(n)
+        inc = IncrementalSCC(g)
+
+        g.add_edge(0, 1, 1)
+        g.add_edge(1, 2, 1)
+        g.add_edge(2, 3, 1)
+        self.assertEqual(4, len(inc.connected_components()))
+        self.assertFalse(inc.is_strongly_connected(0, 2))
+
+        g.add_edge(2, 0, 1)
+        self.assertEqual([[0, 1, 2], [3]], canonical(inc.connected_components()))
+        self.assertTrue(inc.is_strongly_connected(0, 2))
+        self.assertEqual([0, 1, 2], sorted(inc.connected_component(1)))
+        self.assertEqual([3], inc.connected_component(3))
+        self.assertEqual([], inc.connected_component(8888887))
+
+    def test_sinks_first(self):
+        g = DiGraph()
+        for n in range(3):
+            g.add_node(n)
+        inc = IncrementalSCC(g)
+
+        g.add_edge(2, 1, 1)
+        g.add_edge(1, 0, 1)
+        self.assertEqual([[0], [1], [2]], inc.connected_components())
+
+    def test_removal_recomputes(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        inc = IncrementalSCC(algo.get_graph())
+        self.assertEqual(1, len(inc.connected_components()))
+
+        algo.get_graph().remove_edge(13, 14)
+        self.assertEqual(2, len(inc.connected_components()))
+
+        algo.get_graph().add_edge(13, 14, 1)
+        self.assertEqual(1, len(inc.connected_components()))
+
+        algo.get_graph().remove_node(13)
+        self.assertEqual(canonical(algo.connected_components()), canonical(inc.connected_components()))
+
+    def test_matches_tarjan(self):
+        rnd = random.Random(42)
+        g = DiGraph()
+        for n in range(40):
+            g.add_node(n)
+        inc = IncrementalSCC(g)
+
+        for _ in range(150):
+            g.add_edge(rnd.randrange(40), rnd.randrange(40), 1)
+            self.assertEqual(canonical(GraphAlgo(g).connected_components()), canonical(inc.connected_components()))
+
+    def test_detach(self):
+        g = DiGraph()
+        g.add_node(0)
+        g.add_node(1)
+        inc = IncrementalSCC(g)
+        inc.detach()
+
+        g.add_edge(0, 1, 1)
+        g.add_edge(1, 0, 1)
+        # Unreported changes are caught by the MC and fall back to a full recompute.
+        self.assertTrue(inc.is_strongly_connected(0, 1))
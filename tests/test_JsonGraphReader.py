@@ -0,0 +1,46 @@
+import io
+import json
+from unittest import TestCase
+
+from DiGraph import DiGraph
+from GraphElement import GraphElement
+from JsonGraphReader import JsonGraphReader
+
+
+class TestJsonGraphReader(TestCase):
+    def test_edges_nodes_format(self):
+        data = '{"Edges": [{"src": 0, "w": 1.5, "dest": 1}], "Nodes": [{"pos": "1.0,2.0,0.0", "id": 0}, {"id": 1}]}'
+        elements = list(JsonGraphReader(io.StringIO(data)))
+
+        self.assertEqual([(GraphElement.EDGE, {"src": 0, "w": 1.5, "dest": 1}),
+                          (GraphElement.NODE, {"pos": "1.0,2.0,0.0", "id": 0}),
+                          (GraphElement.NODE, {"id": 1})], elements)
+
+    def test_links_format(self):
+        g = DiGraph()
+        g.add_node(1, (1, 2, 3))
+        g.add_node(2, (3, 2, 1))
+        g.add_edge(1, 2, 4)
+        data = json.dumps(g.to_dict())
+
+        elements = list(JsonGraphReader(io.StringIO(data)))
+        kinds = [kind for kind, _ in elements]
+
+        self.assertEqual([GraphElement.MODE_COUNT, GraphElement.EDGE, GraphElement.NODE, GraphElement.NODE], kinds)
+        self.assertEqual(3, elements[0][1])
+        self.assertEqual(4, elements[1][1]['weight'])
+
+    def test_small_chunks(self):
+        with open("../data/A1", 'r') as f:
+            expected = DiGraph.from_dict(json.loads(f.read())).to_dict()
+
+        for chunk_size in (1, 3, 17):
+            with open("../data/A1", 'r') as f:
+                g = DiGraph.from_elements(JsonGraphReader(f, chunk_size))
+            self.assertEqual(json.dumps(expected), json.dumps(g.to_dict()))
+
+    def test_malformed(self):
+        for data in ('', '{}', '[]', '{"Nodes": [{"id": 0}]}', '{"Nodes": [{"id": 0}], "Edges": [',
+                     '{"Nodes": 3, "Edges": []}', '{"Nodes": [] "Edges": []}'):
+            with self.assertRaises(ValueError):
+                list(JsonGraphReader(io.StringIO(data)))
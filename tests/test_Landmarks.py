@@ -0,0 +1,68 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from Landmarks import Landmarks
+
+
+class TestLandmarks(TestCase):
+    def setUp(self) -> None:
+        self.algo = GraphAlgo()
+        self.algo.load_from_json("../data/A5")
+        self.g = self.algo.get_graph()
+
+    def test_bounds(self):
+        landmarks = Landmarks.build(self.g, 4)
+        self.assertEqual(4, len(landmarks.landmarks))
+        self.assertEqual(self.g.get_mc(), landmarks.mc)
+
+        keys = list(self.g.get_all_v().keys())
+        for dest in keys[::5]:
+            estimate = landmarks.estimator(dest)
+            bounds = dict(zip(keys, estimate(keys)))
+            self.assertEqual(0, bounds[dest])
+            for src in keys:
+                # A lower bound of the distance, and consistent along every edge.
+                self.assertLessEqual(bounds[src], self.algo.shortest_path(src, dest)[0] + 1e-9)
+                for other, w in self.g.out_neighbours(src):
+                    self.assertLessEqual(bounds[src], w + bounds[other] + 1e-9)
+
+    def test_farthest_selection(self):
+        # A line: the landmarks go to the two ends first.
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(50))
+        g.add_edges_from((n, n + 1, 1) for n in range(49))
+        g.add_edges_from((n + 1, n, 1) for n in range(49))
+
+        self.assertEqual({0, 49}, set(Landmarks.build(g, 2, seed=3).landmarks))
+        # Never more landmarks than nodes.
+        self.assertEqual(3, len(Landmarks.build(DiGraph.from_dict({'Nodes': [{'id': n} for n in range(3)],
+                                                                    'Edges': []}), 8).landmarks))
+
+        with self.assertRaises(ValueError):
+            Landmarks.build(g, 0)
+
+    def test_unreachable(self):
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(4))
+        g.add_edge(0, 1, 1)
+        g.add_edge(2, 3, 1)
+        estimate = Landmarks.build(g, 4).estimator(1)
+
+        self.assertEqual([1, float('inf'), 0], estimate([0, 2, 1]))
+
+    def test_save_load(self):
+        landmarks = Landmarks.build(self.g, 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "A5.landmarks.npz")
+            landmarks.save(file_name)
+            loaded = Landmarks.load(file_name)
+
+        self.assertEqual(landmarks.landmarks, loaded.landmarks)
+        self.assertTrue(loaded.is_current(self.g))
+        self.assertEqual(landmarks.estimator(7)([30, 31]), loaded.estimator(7)([30, 31]))
+
+        self.g.remove_edge(13, 14)
+        self.assertFalse(loaded.is_current(self.g))
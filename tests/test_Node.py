@@ -52,3 +52,11 @@ class TestNode(TestCase):
         self.assertEqual(data['geoLocation'], {'x': 1.0,
                                                'y': 2.0,
                                                'z': 3.0})
+
+    def test_slots(self):
+        n = Node(1, GeoLocation(1, 2, 3))
+        self.assertFalse(hasattr(n, '__dict__'))
+        self.assertFalse(hasattr(n.geo_location, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            n.color = "red"
@@ -0,0 +1,77 @@
+import math
+from unittest import TestCase
+
+from DiGraph import DiGraph
+from Node import Node
+from location.GeoLocation import GeoLocation
+from location.PositionStore import PositionStore
+
+
+class TestPositionStore(TestCase):
+    def test_attach_and_view(self):
+        store = PositionStore()
+        n1 = Node(1, GeoLocation(1, 2, 3))
+        n2 = Node(2)
+        store.attach(n1)
+        store.attach(n2)
+
+        self.assertIsNone(n2.geo_location)
+        self.assertEqual((1, 2, 3), tuple(store.coords[store.index_of(1)]))
+        self.assertTrue(all(math.isnan(v) for v in store.coords[store.index_of(2)]))
+
+        # The node position and the array row are the same data.
+        n1.geo_location.x = 5
+        self.assertEqual(5, store.coords[store.index_of(1), 0])
+        store.coords[store.index_of(1), 1] = 7
+        self.assertEqual(7, n1.geo_location.y)
+
+        n2.geo_location = GeoLocation(-1, 0, 0)
+        self.assertEqual(-1, store.coords[store.index_of(2), 0])
+        self.assertIsInstance(n2.geo_location, GeoLocation)
+
+    def test_detach(self):
+        store = PositionStore()
+        n = Node(1, GeoLocation(1, 2, 3))
+        store.attach(n)
+        index = store.index_of(1)
+        store.detach(n)
+
+        self.assertNotIn(1, store)
+        self.assertEqual("1.0,2.0,3.0", repr(n.geo_location))
+        n.geo_location = GeoLocation(4, 4, 4)
+        self.assertTrue(math.isnan(store.coords[index, 0]))
+
+    def test_growth(self):
+        store = PositionStore()
+        nodes = [Node(i, GeoLocation(i, -i, 0)) for i in range(1000)]
+        for n in nodes:
+            store.attach(n)
+
+        self.assertEqual(1000, len(store))
+        self.assertEqual(999, nodes[999].geo_location.x)
+        self.assertEqual(-10, nodes[10].geo_location.y)
+
+    def test_bounds_and_distance(self):
+        store = PositionStore()
+        self.assertIsNone(store.bounds())
+
+        for i, pos in enumerate([(0, 0, 0), (4, -2, 0), None, (1, 5, 0)]):
+            store.attach(Node(i, GeoLocation(*pos) if pos else None))
+
+        self.assertEqual((0, 4, -2, 5), store.bounds())
+        self.assertEqual(3, len(store.positioned_xy()))
+
+    def test_graph_position_array(self):
+        g = DiGraph()
+        g.add_node(1, (1, 2, 3))
+        g.add_node(2)
+        self.assertIsNone(g.position_store)
+
+        store = g.enable_position_array()
+        self.assertIs(store, g.enable_position_array())
+        g.add_nodes_from([(3, (3, 3, 3))])
+        self.assertEqual((1, 3, 2, 3), store.bounds())
+
+        g.remove_node(3)
+        self.assertEqual((1, 1, 2, 2), store.bounds())
+        self.assertEqual({'x': 1.0, 'y': 2.0, 'z': 3.0}, g.get_all_v()[1].to_dict()['geoLocation'])
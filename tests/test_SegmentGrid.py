@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+import numpy as np
+
+from location.Range import Range
+from location.Range2D import Range2D
+from location.SegmentGrid import SegmentGrid
+
+
+class TestSegmentGrid(TestCase):
+    @staticmethod
+    def clips(start, end, x, y) -> bool:
+        # Liang-Barsky, the part of the segment (t in [0, 1]) inside the box is not empty.
+        t0, t1 = 0.0, 1.0
+        d = end - start
+        for p, q in ((-d[0], start[0] - x[0]), (d[0], x[1] - start[0]),
+                     (-d[1], start[1] - y[0]), (d[1], y[1] - start[1])):
+            if p == 0:
+                if q < 0:
+                    return False
+            elif p < 0:
+                t0 = max(t0, q / p)
+            else:
+                t1 = min(t1, q / p)
+        return t0 <= t1
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        starts = rng.uniform(-50, 50, (2000, 2))
+        # Mostly short segments and a few long ones.
+        lengths = np.where(rng.random(2000) < 0.05, 60, 2)
+        ends = starts + rng.uniform(-1, 1, (2000, 2)) * lengths[:, None]
+        grid = SegmentGrid(starts, ends, 1.5)
+        low = np.minimum(starts, ends)
+        high = np.maximum(starts, ends)
+
+        for _ in range(200):
+            x = np.sort(rng.uniform(-70, 70, 2))
+            y = np.sort(rng.uniform(-70, 70, 2))
+            boxes = np.flatnonzero((low[:, 0] <= x[1]) & (high[:, 0] >= x[0]) &
+                                   (low[:, 1] <= y[1]) & (high[:, 1] >= y[0]))
+            expected = [i for i in boxes if self.clips(starts[i], ends[i], x, y)]
+            found = grid.in_range(Range2D(Range(x[0], x[1]), Range(y[0], y[1])))
+            self.assertEqual(expected, found.tolist())
+
+    def test_crossing_segment(self):
+        # Both ends far outside the range, the segment crosses it.
+        grid = SegmentGrid(np.array([[-100.0, 0.5], [0.2, 0.2]]), np.array([[100.0, 0.5], [0.3, 0.3]]), 1)
+
+        self.assertEqual([0, 1], grid.in_range(Range2D(Range(0, 1), Range(0, 1))).tolist())
+        self.assertEqual([0], grid.in_range(Range2D(Range(50, 51), Range(0, 1))).tolist())
+        self.assertEqual([], grid.in_range(Range2D(Range(50, 51), Range(2, 3))).tolist())
+
+        # The bounding box overlaps the range, the segment passes by its corner.
+        grid = SegmentGrid(np.array([[0.0, 2.0]]), np.array([[2.0, 0.0]]), 1)
+        self.assertEqual([], grid.in_range(Range2D(Range(0, 0.9), Range(0, 0.9))).tolist())
+        self.assertEqual([0], grid.in_range(Range2D(Range(0, 1), Range(0, 1))).tolist())
+
+    def test_empty(self):
+        grid = SegmentGrid(np.zeros((0, 2)), np.zeros((0, 2)), 1)
+        self.assertEqual(0, len(grid))
+        self.assertEqual([], grid.in_range(Range2D(Range(0, 1), Range(0, 1))).tolist())
+
+        with self.assertRaises(ValueError):
+            SegmentGrid(np.zeros((0, 2)), np.zeros((0, 2)), 0)
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from DiGraph import DiGraph
+from GraphAlgo import GraphAlgo
+from ShortestPathTree import ShortestPathTree
+
+
+class TestShortestPathTree(TestCase):
+    def test_matches_shortest_path(self):
+        algo = GraphAlgo()
+        algo.load_from_json("../data/A5")
+        g = algo.get_graph()
+        g.remove_edge(13, 14)
+        nodes = ShortestPathTree.node_index(g)
+
+        for src in list(g.get_all_v().keys())[::4]:
+            tree = ShortestPathTree.build(g, src, nodes)
+            self.assertEqual((src, g.get_mc()), (tree.src, tree.mc))
+            for dest in g.get_all_v().keys():
+                dist, _ = algo.shortest_path(src, dest)
+                path = tree.path_to(dest)
+                self.assertAlmostEqual(dist, tree.distance_to(dest))
+                if dist == float('inf'):
+                    self.assertEqual([], path)
+                    continue
+                self.assertEqual((src, dest), (path[0], path[-1]))
+                self.assertAlmostEqual(dist, sum(g.all_out_edges_of_node(a)[b] for a, b in zip(path, path[1:])))
+
+    def test_out_of_reach(self):
+        g = DiGraph()
+        g.add_nodes_from((n, None) for n in range(4))
+        g.add_edge(0, 1, 1)
+        g.add_edge(1, 2, 2.5)
+        g.add_edge(3, 0, 1)
+        tree = ShortestPathTree.build(g, 0)
+
+        self.assertEqual((3.5, [0, 1, 2]), (tree.distance_to(2), tree.path_to(2)))
+        self.assertEqual((0, [0]), (tree.distance_to(0), tree.path_to(0)))
+        self.assertEqual((float('inf'), []), (tree.distance_to(3), tree.path_to(3)))
+        self.assertEqual((float('inf'), []), (tree.distance_to(9), tree.path_to(9)))
+
+        with self.assertRaises(ValueError):
+            ShortestPathTree.build(g, 9)
@@ -0,0 +1,56 @@
+import random
+from unittest import TestCase
+
+from location.GeoLocation import GeoLocation
+from location.Range import Range
+from location.Range2D import Range2D
+from location.SpatialGrid import SpatialGrid
+
+
+class TestSpatialGrid(TestCase):
+    def test_any_within(self):
+        grid = SpatialGrid(1)
+        grid.add(1, GeoLocation(0, 0, 0))
+        grid.add(2, GeoLocation(5.5, -3, 0))
+
+        self.assertTrue(grid.any_within(GeoLocation(0.5, 0.5, 0), 1))
+        self.assertFalse(grid.any_within(GeoLocation(1, 1, 0), 1))
+        self.assertTrue(grid.any_within(GeoLocation(3, -3, 0), 2.5))
+        # z counts in the distance.
+        self.assertFalse(grid.any_within(GeoLocation(0, 0, 2), 1))
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(7)
+        points = {i: GeoLocation(rnd.uniform(-50, 50), rnd.uniform(-50, 50), 0) for i in range(500)}
+        grid = SpatialGrid(3)
+        for key, geo in points.items():
+            grid.add(key, geo)
+
+        for _ in range(200):
+            center = GeoLocation(rnd.uniform(-60, 60), rnd.uniform(-60, 60), 0)
+            radius = rnd.uniform(0, 10)
+            expected = sorted(k for k, geo in points.items() if center.distance(geo) <= radius)
+            self.assertEqual(expected, sorted(grid.within(center, radius)))
+            self.assertEqual(bool(expected), grid.any_within(center, radius))
+
+    def test_in_range(self):
+        grid = SpatialGrid(2)
+        for i in range(10):
+            grid.add(i, GeoLocation(i, -i, 0))
+
+        region = Range2D(Range(2, 4.5), Range(-10, 0))
+        self.assertEqual([2, 3, 4], sorted(grid.in_range(region)))
+
+    def test_add_remove(self):
+        grid = SpatialGrid(1)
+        grid.add(1, GeoLocation(0, 0, 0))
+        grid.add(1, GeoLocation(10, 10, 0))
+
+        self.assertEqual(1, len(grid))
+        self.assertFalse(grid.any_within(GeoLocation(0, 0, 0), 0.5))
+        self.assertTrue(grid.remove(1))
+        self.assertFalse(grid.remove(1))
+        self.assertNotIn(1, grid)
+
+        with self.assertRaises(ValueError):
+            SpatialGrid(0)